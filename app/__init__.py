@@ -1,22 +1,77 @@
-#from litestar import Litestar
+from functools import partial
+from typing import TYPE_CHECKING, Any, Optional
 
-#from app.controllers import CategoryController, ItemController, UserController
-#from app.database import db_plugin
+from app.settings import AppSettings
 
-#app = Litestar(
-#    [ItemController, CategoryController, UserController],
-#    debug=True,
-#    plugins=[db_plugin],
-#)
+if TYPE_CHECKING:
+    from litestar import Litestar
 
 
-from litestar import Litestar
+def create_app(settings: Optional[AppSettings] = None) -> "Litestar":
+    """Arma la app según el perfil de ``settings`` (por defecto, el de las variables de entorno).
 
-from app.controllers import UserController, CityController, TransportController, AccommodationController, ActivityController, ExpenseController, TravelController
-from app.database import db_plugin
+    El esquema no se toca al arrancar: lo administran las migraciones (``litestar database upgrade``
+    o ``python -m app --migrate``), así que varios workers pueden arrancar a la vez.
+    """
+    # Importados acá: ``import app.models`` (migraciones, CLI, benchmarks) no paga el armado de la app.
+    from litestar import Litestar
+    from litestar.config.response_cache import ResponseCacheConfig
+    from litestar.di import Provide
 
-app = Litestar(
-    [UserController,CityController, TransportController, AccommodationController, ActivityController, ExpenseController, TravelController],
-    debug=True,
-    plugins=[db_plugin],
-)
+    from app.bulk import provide_bulk_chunk_size
+    from app.cache import cache_key, cacheable, make_cache_store, provide_response_cache
+    from app.cli import AppCLIPlugin
+    from app.compression import make_compression_config
+    from app.controllers import (
+        AccommodationController,
+        ActivityController,
+        CacheController,
+        CityController,
+        ExpenseController,
+        ImportController,
+        RouteController,
+        SearchController,
+        TransportController,
+        TravelController,
+        UserController,
+    )
+    from app.database import db_plugin, engine
+    from app.etag import add_etag_header, not_modified_from_cache
+    from app.events import travel_events
+    from app.http_cache import no_store_writes
+    from app.metrics import MetricsController, MetricsMiddleware, instrument_engine
+    from app.pagination import provide_pagination
+
+    settings = settings or AppSettings()
+    instrument_engine(engine, settings.metrics.slow_query_ms / 1000)
+    return Litestar(
+        [UserController, CityController, TransportController, AccommodationController, ActivityController, ExpenseController, TravelController, SearchController, RouteController, ImportController, CacheController, MetricsController],
+        debug=settings.debug,
+        plugins=[db_plugin, AppCLIPlugin()],
+        middleware=[MetricsMiddleware],
+        dependencies={
+            "pagination": Provide(provide_pagination),
+            "bulk_chunk_size": Provide(provide_bulk_chunk_size),
+            "response_cache": Provide(provide_response_cache, sync_to_thread=False),
+            "search_settings": Provide(lambda: settings.search, sync_to_thread=False),
+            "route_settings": Provide(lambda: settings.routes, sync_to_thread=False),
+        },
+        on_startup=[partial(travel_events.start, settings.events)],
+        on_shutdown=[travel_events.stop],
+        compression_config=make_compression_config(settings.compression),
+        stores={"response_cache": make_cache_store(settings.cache)},
+        response_cache_config=ResponseCacheConfig(
+            default_expiration=settings.cache.ttl, key_builder=cache_key, cache_response_filter=cacheable
+        ),
+        after_request=add_etag_header,
+        before_send=[not_modified_from_cache, no_store_writes],
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # ``app`` se arma la primera vez que se pide (``litestar --app app:app``, ``from app import app``).
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
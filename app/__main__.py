@@ -0,0 +1,49 @@
+"""Sirve la app con uvicorn: ``python -m app [--workers N] [--migrate]``.
+
+Cada worker es un proceso que llama a ``create_app``; el proceso principal no arma la app. Con
+``--migrate`` las migraciones se aplican una sola vez, antes de lanzar los workers.
+"""
+import argparse
+import asyncio
+
+import uvicorn
+
+from app.settings import AppSettings
+
+
+def migrate() -> None:
+    from advanced_alchemy.alembic.commands import AlembicCommands
+
+    from app.database import db_config, dispose_engine
+
+    AlembicCommands(sqlalchemy_config=db_config).upgrade()
+    # Los workers abren sus propias conexiones.
+    asyncio.run(dispose_engine())
+
+
+def main() -> None:
+    settings = AppSettings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.worker_count)
+    parser.add_argument("--migrate", action="store_true", help="aplica las migraciones pendientes antes de servir")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate()
+    uvicorn.run(
+        "app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # Recargar solo tiene sentido en desarrollo y con un proceso.
+        reload=settings.debug and args.workers == 1,
+        access_log=settings.debug,
+        log_level="info" if settings.debug else "warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
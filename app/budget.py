@@ -0,0 +1,189 @@
+"""Presupuesto por viaje (planificado contra gastado) materializado en ``travel_budget``.
+
+Leer el costo de un viaje ya no suma cuatro tablas: cada escritura de alojamientos, transportes,
+actividades o gastos aplica su diferencia a la fila del viaje, en la misma transacción.
+
+- Las escrituras de la ORM (``repo.add``, ``update_if_match``, ``repo.delete``) se registran solas en el
+  evento ``after_flush`` de la sesión, con el historial de ``travel_id`` y del monto de cada fila.
+- Las escrituras por sentencia (bulk, importación) no pasan por el flush: llaman a ``adjust_budget`` con
+  los totales de las filas afectadas antes y después de escribir.
+
+``rebuild_budget`` recalcula todo desde las tablas y corrige las filas desviadas (p. ej. por escrituras
+hechas por fuera de la app).
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.database import commit, execute
+from app.models import Accommodation, Activity, Expense, Transport, Travel, TravelBudget
+
+# Columna de ``travel_budget`` y columna que se suma de cada modelo.
+CATEGORIES: dict[type, tuple[str, str]] = {
+    Accommodation: ("accommodations", "price"),
+    Transport: ("transports", "price"),
+    Activity: ("activities", "price"),
+    Expense: ("expenses", "amount"),
+}
+COLUMNS = [column for column, _ in CATEGORIES.values()]
+# Diferencias menores son redondeo de punto flotante, no desvíos.
+TOLERANCE = 0.005
+
+Totals = dict[int, float]
+
+
+@dataclass
+class Budget:
+    travel_id: int
+    accommodations: float
+    transports: float
+    activities: float
+    planned: float
+    spent: float
+    remaining: float
+
+
+def totals(model: type, rows: Iterable[dict[str, Any]]) -> Totals:
+    """Sumas por viaje de filas que se insertan por sentencia (los valores ya están en memoria)."""
+    if model not in CATEGORIES:
+        return {}
+    field = CATEGORIES[model][1]
+    result: Totals = defaultdict(float)
+    for row in rows:
+        result[row["travel_id"]] += row[field]
+    return result
+
+
+async def stored_totals(session: Any, model: type, ids: Iterable[int], chunk_size: int = 500) -> Totals:
+    """Sumas por viaje de las filas ``ids`` tal como están ahora en la base."""
+    if model not in CATEGORIES:
+        return {}
+    column = getattr(model, CATEGORIES[model][1])
+    ids = list(ids)
+    result: Totals = defaultdict(float)
+    for start in range(0, len(ids), chunk_size):
+        statement = (
+            select(model.travel_id, func.sum(column))
+            .where(model.id.in_(ids[start : start + chunk_size]))
+            .group_by(model.travel_id)
+        )
+        for travel_id, total in (await execute(session, statement)).tuples():
+            result[travel_id] += total
+    return result
+
+
+def _upsert(column: str, increment: bool = True) -> Any:
+    statement = insert(TravelBudget)
+    value = getattr(statement.excluded, column)
+    return statement.on_conflict_do_update(
+        index_elements=[TravelBudget.travel_id],
+        set_={column: getattr(TravelBudget, column) + value if increment else value},
+    )
+
+
+def _delta_rows(column: str, before: Totals, after: Totals) -> list[dict[str, Any]]:
+    rows = []
+    for travel_id in sorted(before.keys() | after.keys()):
+        if delta := after.get(travel_id, 0.0) - before.get(travel_id, 0.0):
+            rows.append({"travel_id": travel_id, column: delta})
+    return rows
+
+
+async def adjust_budget(session: Any, model: type, before: Totals, after: Totals) -> None:
+    """Suma a ``travel_budget`` la diferencia entre los totales de las filas afectadas antes y después."""
+    if model not in CATEGORIES:
+        return
+    column = CATEGORIES[model][0]
+    if rows := _delta_rows(column, before, after):
+        await execute(session, _upsert(column), rows)
+
+
+def _committed(state: Any, key: str) -> Any:
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _: UOWTransaction) -> None:
+    # Acá ``new``, ``dirty`` y ``deleted`` y el historial de atributos todavía muestran lo que se acaba de escribir.
+    before: dict[str, Totals] = defaultdict(lambda: defaultdict(float))
+    after: dict[str, Totals] = defaultdict(lambda: defaultdict(float))
+    new, deleted = set(session.new), set(session.deleted)
+    for instance in (*new, *session.dirty, *deleted):
+        if type(instance) not in CATEGORIES:
+            continue
+        column, field = CATEGORIES[type(instance)]
+        state = inspect(instance)
+        if instance not in new:
+            travel_id, value = _committed(state, "travel_id"), _committed(state, field)
+            if travel_id is not None and value is not None:
+                before[column][travel_id] += value
+        if instance not in deleted:
+            travel_id, value = state.dict.get("travel_id"), state.dict.get(field)
+            if travel_id is not None and value is not None:
+                after[column][travel_id] += value
+    connection = session.connection()
+    for column in before.keys() | after.keys():
+        if rows := _delta_rows(column, before[column], after[column]):
+            connection.execute(_upsert(column), rows)
+
+
+async def travel_budget(session: Any, travel_id: int) -> Budget:
+    columns = [getattr(TravelBudget, column) for column in COLUMNS]
+    row = (await execute(session, select(*columns).where(TravelBudget.travel_id == travel_id))).one_or_none()
+    values = dict(zip(COLUMNS, row or [0.0] * len(COLUMNS)))
+    planned = values["accommodations"] + values["transports"] + values["activities"]
+    return Budget(
+        travel_id=travel_id,
+        accommodations=round(values["accommodations"], 2),
+        transports=round(values["transports"], 2),
+        activities=round(values["activities"], 2),
+        planned=round(planned, 2),
+        spent=round(values["expenses"], 2),
+        remaining=round(planned - values["expenses"], 2),
+    )
+
+
+async def rebuild_budget(session: Any, travel_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> list[int]:
+    """Recalcula los totales desde las tablas y corrige las filas desviadas; devuelve esos viajes.
+
+    Las filas de viajes que ya no existen también cuentan como desviadas y se borran.
+    """
+    travels = select(Travel.id)
+    budgets = select(TravelBudget.travel_id, *[getattr(TravelBudget, column) for column in COLUMNS])
+    if travel_ids is not None:
+        travel_ids = list(travel_ids)
+        travels = travels.where(Travel.id.in_(travel_ids))
+        budgets = budgets.where(TravelBudget.travel_id.in_(travel_ids))
+    fresh = {travel_id: dict.fromkeys(COLUMNS, 0.0) for travel_id in (await execute(session, travels)).scalars()}
+    for model, (column, field) in CATEGORIES.items():
+        statement = (
+            select(model.travel_id, func.sum(getattr(model, field)))
+            .where(model.travel_id.in_(travels.scalar_subquery()))
+            .group_by(model.travel_id)
+        )
+        for travel_id, total in (await execute(session, statement)).tuples():
+            fresh[travel_id][column] = total
+    stored = {travel_id: dict(zip(COLUMNS, values)) for travel_id, *values in (await execute(session, budgets)).tuples()}
+
+    orphans = sorted(stored.keys() - fresh.keys())
+    drifted = [
+        travel_id
+        for travel_id, values in fresh.items()
+        if any(abs(values[column] - stored.get(travel_id, {}).get(column, 0.0)) >= TOLERANCE for column in COLUMNS)
+    ]
+    if not dry_run:
+        if orphans:
+            await execute(session, delete(TravelBudget).where(TravelBudget.travel_id.in_(orphans)))
+        for column in COLUMNS:
+            if drifted:
+                rows = [{"travel_id": travel_id, column: fresh[travel_id][column]} for travel_id in drifted]
+                await execute(session, _upsert(column, increment=False), rows)
+        await commit(session)
+    return sorted([*drifted, *orphans])
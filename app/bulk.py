@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import msgspec
+from litestar.dto import AbstractDTO
+from litestar.exceptions import NotFoundException, ValidationException
+from litestar.params import Parameter
+from sqlalchemy import insert, select
+
+from app.budget import adjust_budget, stored_totals, totals
+from app.cache import CacheStore, affected_travels, invalidate
+from app.database import commit, execute
+from app.events import log_changes, log_moves
+from app.routing import mark_transports
+from app.structs import dto_struct, struct_to_dict
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+MAX_BULK_ITEMS = 50_000
+
+
+@dataclass
+class BulkResult:
+    count: int
+    ids: list[int] = field(default_factory=list)
+
+
+async def provide_bulk_chunk_size(
+    chunk_size: int = Parameter(query="chunk_size", default=DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+) -> int:
+    return chunk_size
+
+
+def _chunks(items: list[Any], size: int) -> list[list[Any]]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def _validate(items: list[Any], struct: type[msgspec.Struct]) -> list[dict[str, Any]]:
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValidationException(detail=f"Máximo {MAX_BULK_ITEMS} elementos por solicitud")
+    values: list[dict[str, Any]] = []
+    errors: list[dict[str, Any]] = []
+    for index, item in enumerate(items):
+        try:
+            values.append(struct_to_dict(msgspec.convert(item, struct, strict=False)))
+        except msgspec.ValidationError as e:
+            errors.append({"index": index, "message": str(e)})
+    if errors:
+        raise ValidationException(detail="Elementos inválidos; no se guardó ninguno", extra=errors)
+    return values
+
+
+async def _versions(repo: Any, ids: list[int], chunk_size: int) -> dict[int, int]:
+    model = repo.model_type
+    found: dict[int, int] = {}
+    for chunk in _chunks(ids, chunk_size):
+        rows = await execute(repo.session, select(model.id, model.version).where(model.id.in_(chunk)))
+        found.update(rows.tuples().all())
+    return found
+
+
+async def bulk_create(
+    repo: Any, items: list[Any], dto: type[AbstractDTO], chunk_size: int, cache: CacheStore
+) -> BulkResult:
+    """Inserta todo en una transacción: un INSERT multi-fila por bloque y un solo commit.
+
+    No usa ``add_many``: en SQLite el unit of work de la ORM emite un INSERT por fila para poder
+    asociar cada id a su instancia, mientras que ``insert().returning(id)`` con una lista de
+    parámetros se agrupa en un solo INSERT ... VALUES por bloque.
+    """
+    values = _validate(items, dto_struct(dto))
+    statement = insert(repo.model_type).returning(repo.model_type.id)
+    ids: list[int] = []
+    for chunk in _chunks(values, chunk_size):
+        ids.extend((await execute(repo.session, statement, chunk)).scalars())
+    await adjust_budget(repo.session, repo.model_type, {}, totals(repo.model_type, values))
+    await log_changes(repo.session, repo.model_type, "created", ids)
+    mark_transports(repo.session, repo.model_type, ids)
+    travel_ids = await affected_travels(repo.session, repo.model_type, ids)
+    await commit(repo.session)
+    await invalidate(cache, repo.model_type, travel_ids)
+    return BulkResult(count=len(ids), ids=ids)
+
+
+async def bulk_update(
+    repo: Any, items: list[Any], dto: type[AbstractDTO], chunk_size: int, cache: CacheStore
+) -> BulkResult:
+    values = _validate(items, dto_struct(dto, (("id", int),)))
+    ids = [value["id"] for value in values]
+    versions = await _versions(repo, ids, chunk_size)
+    if missing := [item_id for item_id in ids if item_id not in versions]:
+        raise NotFoundException(detail="Elementos no encontrados; no se actualizó ninguno", extra={"ids": missing})
+    # El UPDATE por clave primaria exige la versión vigente y la incrementa (ver ``Versioned``).
+    for value in values:
+        value["version"] = versions[value["id"]]
+    # Un hijo puede cambiar de viaje: se invalidan el viaje anterior y el nuevo.
+    travel_ids = await affected_travels(repo.session, repo.model_type, ids)
+    before = await stored_totals(repo.session, repo.model_type, ids, chunk_size)
+    await log_moves(repo.session, repo.model_type, values)
+    for chunk in _chunks(values, chunk_size):
+        await repo.update_many(chunk, auto_commit=False)
+    after = await stored_totals(repo.session, repo.model_type, ids, chunk_size)
+    await adjust_budget(repo.session, repo.model_type, before, after)
+    await log_changes(repo.session, repo.model_type, "updated", ids)
+    mark_transports(repo.session, repo.model_type, ids)
+    travel_ids |= await affected_travels(repo.session, repo.model_type, ids)
+    await commit(repo.session)
+    await invalidate(cache, repo.model_type, travel_ids)
+    return BulkResult(count=len(ids), ids=ids)
+
+
+async def bulk_delete(repo: Any, ids: list[int], chunk_size: int, cache: CacheStore) -> BulkResult:
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BULK_ITEMS:
+        raise ValidationException(detail=f"Máximo {MAX_BULK_ITEMS} elementos por solicitud")
+    versions = await _versions(repo, ids, chunk_size)
+    if missing := [item_id for item_id in ids if item_id not in versions]:
+        raise NotFoundException(detail="Elementos no encontrados; no se eliminó ninguno", extra={"ids": missing})
+    travel_ids = await affected_travels(repo.session, repo.model_type, ids)
+    before = await stored_totals(repo.session, repo.model_type, ids, chunk_size)
+    await log_changes(repo.session, repo.model_type, "deleted", ids)
+    await repo.delete_many(ids, chunk_size=chunk_size, auto_commit=False, auto_expunge=True)
+    await adjust_budget(repo.session, repo.model_type, before, {})
+    mark_transports(repo.session, repo.model_type, ids)
+    await commit(repo.session)
+    await invalidate(cache, repo.model_type, travel_ids)
+    return BulkResult(count=len(ids), ids=ids)
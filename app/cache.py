@@ -0,0 +1,257 @@
+"""Caché de respuestas (read-through) para las lecturas de viajes y ciudades.
+
+Litestar guarda la respuesta serializada de los handlers con ``cache=True`` bajo la clave de
+``cache_key`` (``ruta#query``, más la codificación negociada). Los handlers de escritura invalidan solo las claves afectadas con
+patrones ``ruta#*`` (todas las variantes de una ruta) y ``prefijo/*`` (todo lo que cuelga de un prefijo): el LRU
+en memoria los resuelve con un índice y Redis con ``SCAN MATCH``.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterable
+from urllib.parse import urlencode
+
+from litestar import Request
+from litestar.config.response_cache import default_do_cache_predicate
+from litestar.stores.base import StorageObject, Store
+from litestar.types import HTTPScope
+from sqlalchemy import or_, select
+
+from app.compression import negotiated_encoding
+from app.database import execute
+from app.models import Accommodation, Activity, City, Expense, Transport, Travel, User, UsersTravels
+from app.settings import CacheSettings
+
+# Sub-rutas de /travels/{id} que incluyen cada entidad hija.
+TRAVEL_CHILDREN: dict[type, tuple[str, ...]] = {
+    Accommodation: ("accommodations", "budget", "conflicts"),
+    Transport: ("transports", "budget", "conflicts"),
+    Activity: ("activities", "budget", "conflicts"),
+    Expense: ("expenses", "expenses/summary", "settlement", "budget"),
+    # Los transportes incluyen sus ciudades de origen y destino.
+    City: ("transports",),
+}
+
+
+@dataclass
+class CacheStats:
+    backend: str
+    entries: int | None
+    max_entries: int | None
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+def cacheable(scope: HTTPScope, status_code: int) -> bool:
+    # El middleware de caché envuelve la ruta completa: sin este filtro también guardaría las
+    # respuestas de POST/PATCH/DELETE que comparten ruta con un GET cacheado.
+    return scope["method"] == "GET" and default_do_cache_predicate(scope, status_code)
+
+
+def cache_key(request: Request) -> str:
+    # La caché guarda la respuesta ya comprimida: la codificación negociada va al final de la clave
+    # (``ruta#query@gzip``), así los patrones ``ruta#*`` siguen invalidando todas las variantes.
+    query = sorted(request.query_params.dict().items())
+    key = request.url.path.rstrip("/") + "#" + urlencode(query, doseq=True)
+    if encoding := negotiated_encoding(request):
+        key += "@" + encoding
+    return key
+
+
+class CacheStore(Store, ABC):
+    stats: CacheStats
+
+    @abstractmethod
+    async def delete_matching(self, *patterns: str) -> None:
+        """Borra las claves que coinciden con alguno de los patrones (``ruta#*`` o ``prefijo/*``)."""
+
+    def snapshot(self) -> CacheStats:
+        return self.stats
+
+
+def _groups(key: str) -> list[str]:
+    # Una clave ``/travels/1/budget#...`` está en ``/travels/1/budget`` (patrón ``ruta#*``) y en
+    # ``/travels/``, ``/travels/1/`` (patrones ``prefijo/*``).
+    path = key.partition("#")[0]
+    return [path] + [path[: i + 1] for i, char in enumerate(path) if char == "/" and i > 0]
+
+
+def _pattern_group(pattern: str) -> str:
+    if pattern.endswith("#*"):
+        return pattern[:-2]
+    if pattern.endswith("/*"):
+        return pattern[:-1]
+    raise ValueError(f"Patrón de invalidación no soportado: {pattern}")
+
+
+class LRUStore(CacheStore):
+    """LRU en memoria con TTL por entrada; al llenarse descarta la menos usada.
+
+    Un índice de ruta y prefijos a claves, que se llena en ``set``, hace que invalidar cueste lo que las
+    claves borradas y no lo que la caché entera.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._data: OrderedDict[str, StorageObject] = OrderedDict()
+        self._index: dict[str, set[str]] = {}
+        self.max_entries = max_entries
+        self.stats = CacheStats(backend="memory", entries=0, max_entries=max_entries)
+
+    def _discard(self, key: str) -> None:
+        if self._data.pop(key, None) is None:
+            return
+        for group in _groups(key):
+            keys = self._index[group]
+            keys.discard(key)
+            if not keys:
+                del self._index[group]
+
+    async def set(self, key: str, value: str | bytes, expires_in: int | timedelta | None = None) -> None:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        if key not in self._data:
+            for group in _groups(key):
+                self._index.setdefault(group, set()).add(key)
+        self._data[key] = StorageObject.new(data=value, expires_in=expires_in)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._discard(next(iter(self._data)))
+            self.stats.evictions += 1
+
+    async def get(self, key: str, renew_for: int | timedelta | None = None) -> bytes | None:
+        item = self._data.get(key)
+        if item is not None and item.expired:
+            self._discard(key)
+            self.stats.expirations += 1
+            item = None
+        if item is None:
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if renew_for and item.expires_at:
+            item = self._data[key] = StorageObject.new(data=item.data, expires_in=renew_for)
+        self.stats.hits += 1
+        return item.data
+
+    async def delete(self, key: str) -> None:
+        self._discard(key)
+
+    async def delete_all(self) -> None:
+        self._data.clear()
+        self._index.clear()
+
+    async def exists(self, key: str) -> bool:
+        item = self._data.get(key)
+        return item is not None and not item.expired
+
+    async def expires_in(self, key: str) -> int | None:
+        item = self._data.get(key)
+        return item.expires_in if item is not None else None
+
+    async def delete_matching(self, *patterns: str) -> None:
+        keys = set().union(*(self._index.get(_pattern_group(pattern), ()) for pattern in patterns))
+        for key in keys:
+            self._discard(key)
+        self.stats.invalidations += len(keys)
+
+    def snapshot(self) -> CacheStats:
+        self.stats.entries = len(self._data)
+        return self.stats
+
+
+class RedisCacheStore(CacheStore):
+    """Mismas operaciones sobre un servidor compatible con Redis (requiere el extra ``redis``).
+
+    Redis expira y desaloja por su cuenta (``maxmemory-policy``), así que esos contadores no aplican.
+    """
+
+    def __init__(self, url: str) -> None:
+        from litestar.stores.redis import RedisStore
+        from redis.asyncio import Redis
+
+        # Cliente y prefijo propios: ``delete_matching`` recorre las claves con el mismo cliente que el store.
+        self._redis = Redis.from_url(url)
+        self._prefix = "RESPONSE_CACHE:"
+        self._store = RedisStore(self._redis, namespace=None, handle_client_shutdown=True)
+        self.stats = CacheStats(backend="redis", entries=None, max_entries=None)
+
+    async def set(self, key: str, value: str | bytes, expires_in: int | timedelta | None = None) -> None:
+        await self._store.set(self._prefix + key, value, expires_in)
+
+    async def get(self, key: str, renew_for: int | timedelta | None = None) -> bytes | None:
+        value = await self._store.get(self._prefix + key, renew_for)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def delete(self, key: str) -> None:
+        await self._store.delete(self._prefix + key)
+
+    async def delete_all(self) -> None:
+        await self._delete_scanned(self._prefix + "*")
+
+    async def exists(self, key: str) -> bool:
+        return await self._store.exists(self._prefix + key)
+
+    async def expires_in(self, key: str) -> int | None:
+        return await self._store.expires_in(self._prefix + key)
+
+    async def delete_matching(self, *patterns: str) -> None:
+        for pattern in patterns:
+            self.stats.invalidations += await self._delete_scanned(self._prefix + pattern)
+
+    async def _delete_scanned(self, match: str) -> int:
+        keys = [key async for key in self._redis.scan_iter(match=match)]
+        return await self._redis.delete(*keys) if keys else 0
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self._store.__aexit__(*args)
+
+
+def make_cache_store(settings: CacheSettings) -> CacheStore:
+    if settings.url:
+        return RedisCacheStore(settings.url)
+    return LRUStore(settings.max_entries)
+
+
+def provide_response_cache(request: Request) -> CacheStore:
+    return request.app.response_cache_config.get_store_from_app(request.app)
+
+
+async def affected_travels(session: Any, model: type, ids: Iterable[int]) -> set[int]:
+    """Viajes cuyas respuestas cacheadas incluyen alguna de estas filas."""
+    ids = list(ids)
+    if not ids:
+        return set()
+    if model is Travel:
+        return set(ids)
+    if model is User:
+        statement = select(UsersTravels.travel_id).where(UsersTravels.user_id.in_(ids))
+    elif model is City:
+        statement = select(Transport.travel_id).where(
+            or_(Transport.start_city_id.in_(ids), Transport.end_city_id.in_(ids))
+        )
+    else:
+        statement = select(model.travel_id).where(model.id.in_(ids))
+    return set((await execute(session, statement.distinct())).scalars())
+
+
+async def invalidate(cache: CacheStore, model: type, travel_ids: Iterable[int] = ()) -> None:
+    """Borra las claves de ``model`` en los viajes dados; viajes y usuarios invalidan el viaje completo."""
+    patterns = ["/cities#*"] if model is City else []
+    children = TRAVEL_CHILDREN.get(model)
+    for travel_id in travel_ids:
+        if children is None:
+            patterns += [f"/travels/{travel_id}#*", f"/travels/{travel_id}/*"]
+        else:
+            patterns += [f"/travels/{travel_id}/{child}#*" for child in children]
+    if children is None and (patterns or model is Travel):
+        patterns.append("/travels#*")
+    if patterns:
+        await cache.delete_matching(*patterns)
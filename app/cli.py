@@ -0,0 +1,75 @@
+"""Comandos propios de la CLI de Litestar (``litestar --app app:app <comando>``)."""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import click
+from click import Group
+from litestar.exceptions import ValidationException
+from litestar.plugins import CLIPluginProtocol
+
+from app.budget import rebuild_budget
+from app.cache import make_cache_store
+from app.database import dispose_engine, open_session
+from app.importer import DEFAULT_BATCH_SIZE, IMPORTABLE, ImportReport, import_file
+from app.settings import CacheSettings
+
+
+def _print_progress(report: ImportReport) -> None:
+    click.echo(f"{report.position} registros: {report.inserted} insertados, {report.failed} con error", err=True)
+
+
+class AppCLIPlugin(CLIPluginProtocol):
+    def on_cli_init(self, cli: Group) -> None:
+        @cli.command(name="import-data")
+        @click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+        @click.option("--resource", type=click.Choice(list(IMPORTABLE)), required=True)
+        @click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default=None,
+                      help="Por defecto, según la extensión del archivo")
+        @click.option("--job", default=None, help="Id para reanudar; por defecto, un hash del archivo")
+        @click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+        def import_data(path: Path, resource: str, fmt: Optional[str], job: Optional[str], batch_size: int) -> None:
+            """Importa un archivo NDJSON/CSV por lotes; si se interrumpe, se retoma al volver a ejecutarlo."""
+            fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "ndjson")
+
+            async def run() -> ImportReport:
+                # Con CACHE_URL apuntando a Redis se invalidan las respuestas cacheadas de los workers.
+                cache = make_cache_store(CacheSettings())
+                try:
+                    async with open_session() as session:
+                        with path.open("rb") as file:
+                            return await import_file(
+                                session, file, resource, fmt, job, batch_size, cache, _print_progress
+                            )
+                finally:
+                    await dispose_engine()
+
+            try:
+                report = asyncio.run(run())
+            except ValidationException as e:
+                raise click.ClickException(e.detail) from e
+            if report.resumed_from:
+                click.echo(f"Reanudado desde el registro {report.resumed_from}", err=True)
+            for error in report.errors:
+                click.echo(f"registro {error['row']}: {error['message']}", err=True)
+            click.echo(f"{report.job}: {report.inserted} insertados, {report.failed} con error")
+
+        @cli.command(name="rebuild-budget")
+        @click.option("--travel", "travel_ids", type=int, multiple=True, help="Solo estos viajes; por defecto, todos")
+        @click.option("--check", is_flag=True, help="Solo informa los desvíos, sin corregirlos; termina con error si hay")
+        def rebuild_budget_command(travel_ids: tuple[int, ...], check: bool) -> None:
+            """Recalcula ``travel_budget`` desde alojamientos, transportes, actividades y gastos."""
+
+            async def run() -> list[int]:
+                try:
+                    async with open_session() as session:
+                        return await rebuild_budget(session, travel_ids or None, dry_run=check)
+                finally:
+                    await dispose_engine()
+
+            drifted = asyncio.run(run())
+            if drifted:
+                click.echo("Viajes con desvío: " + ", ".join(map(str, drifted)), err=True)
+            if check and drifted:
+                raise click.ClickException(f"{len(drifted)} viajes con desvío")
+            click.echo(f"{len(drifted)} viajes {'con desvío' if check else 'corregidos'}")
@@ -0,0 +1,44 @@
+"""Compresión de respuestas con gzip o brotli, según ``Accept-Encoding``.
+
+Litestar aplica la compresión dentro de la caché de respuestas, así que lo que se guarda en caché ya viene
+comprimido: ``negotiated_encoding`` forma parte de la clave para que un cliente sin gzip no reciba la entrada
+comprimida de otro.
+"""
+from typing import Optional
+
+from litestar import Request
+from litestar.config.compression import CompressionConfig
+from litestar.enums import CompressionEncoding
+
+from app.settings import CompressionSettings
+
+# Respuestas que siempre son chicas: no vale la pena ni mirar su tamaño.
+SKIP_PATHS = ["^/cache/stats", "^/imports/"]
+# Rutas que comprimen por su cuenta (p. ej. las exportaciones, por bloques): ``opt={SKIP_COMPRESSION: True}``.
+SKIP_COMPRESSION = "skip_compression"
+
+
+def make_compression_config(settings: CompressionSettings) -> Optional[CompressionConfig]:
+    if settings.backend == "none":
+        return None
+    return CompressionConfig(
+        backend=settings.backend,
+        minimum_size=settings.minimum_size,
+        gzip_compress_level=settings.gzip_level,
+        brotli_quality=settings.brotli_quality,
+        exclude=SKIP_PATHS,
+        exclude_opt_key=SKIP_COMPRESSION,
+    )
+
+
+def negotiated_encoding(request: Request) -> str:
+    """La codificación que elegirá el middleware de compresión para esta request ("" = sin comprimir)."""
+    config = request.app.compression_config
+    if config is None or request.route_handler.opt.get(SKIP_COMPRESSION):
+        return ""
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if config.compression_facade.encoding in accept_encoding:
+        return config.compression_facade.encoding
+    if config.gzip_fallback and CompressionEncoding.GZIP in accept_encoding:
+        return CompressionEncoding.GZIP
+    return ""
@@ -0,0 +1,197 @@
+"""Conflictos de agenda de un viaje: horarios que se pisan y actividades sin alojamiento.
+
+- ``overlap``: dos transportes, dos actividades o un transporte y una actividad a la vez (no se puede estar
+  en dos lugares), o dos alojamientos la misma noche.
+- ``uncovered``: una actividad en un día que no cubre ningún alojamiento, contando el de salida. Solo en viajes
+  con alojamientos: los de un día no tienen.
+
+Los intervalos son semiabiertos: llegar a las 10:00 y salir a las 10:00 no se pisa, tampoco dejar un hotel el
+día que se entra en otro. Cada tabla se lee ya ordenada por el índice ``(travel_id, inicio)`` y se barre una vez
+con un heap de los intervalos abiertos: O(n log n + k), con k los conflictos informados, en vez de comparar
+todos los pares.
+"""
+import heapq
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, Literal, Optional
+
+from litestar.exceptions import HTTPException
+from litestar.params import Parameter
+from litestar.status_codes import HTTP_409_CONFLICT
+from sqlalchemy import func, select
+
+from app.database import execute
+from app.models import Accommodation, Activity, Transport
+
+DEFAULT_LIMIT = 100
+MAX_CONFLICTS = 1000
+
+
+@dataclass
+class Slot:
+    kind: str
+    id: Optional[int]
+    start: datetime
+    end: datetime
+
+
+@dataclass
+class Conflict:
+    type: Literal["overlap", "uncovered"]
+    items: list[Slot]
+
+
+@dataclass
+class TravelConflicts:
+    travel_id: int
+    conflicts: list[Conflict]
+    truncated: bool
+
+
+def _transport(id: Optional[int], start: datetime, end: datetime) -> Slot:
+    return Slot("transport", id, start, end)
+
+
+def _activity(id: Optional[int], start: datetime, duration: int) -> Slot:
+    # ``duration`` está en minutos.
+    return Slot("activity", id, start, start + timedelta(minutes=duration))
+
+
+def _accommodation(id: Optional[int], start: date, end: date) -> Slot:
+    return Slot("accommodation", id, datetime.combine(start, time.min), datetime.combine(end, time.min))
+
+
+# Columna de inicio, la que da el fin y cómo armar el intervalo de cada modelo.
+_SOURCES: dict[type, tuple[str, str, Callable[..., Slot]]] = {
+    Transport: ("start_datetime", "end_datetime", _transport),
+    Activity: ("start_datetime", "duration", _activity),
+    Accommodation: ("start_date", "end_date", _accommodation),
+}
+
+
+async def provide_conflict_check(check_conflicts: bool = Parameter(query="check_conflicts", default=False)) -> bool:
+    return check_conflicts
+
+
+def _window(model: type, start: datetime, end: datetime) -> list[Any]:
+    """Condiciones para leer solo las filas de ``model`` que se pisan con ``[start, end)``.
+
+    La del inicio recorta el rango del índice ``(travel_id, inicio)``; la del fin se evalúa en SQLite.
+    """
+    if model is Accommodation:
+        last = end.date() if end.time() == time.min else end.date() + timedelta(days=1)
+        return [Accommodation.start_date < last, Accommodation.end_date > start.date()]
+    if model is Activity:
+        # Un minuto de margen por el redondeo de ``julianday``: el intervalo exacto se compara después.
+        ends = func.julianday(Activity.start_datetime) + (Activity.duration + 1) / 1440.0
+        return [Activity.start_datetime < end, ends > func.julianday(start)]
+    return [Transport.start_datetime < end, Transport.end_datetime > start]
+
+
+async def _slots(session: Any, model: type, travel_id: int, *conditions: Any) -> list[Slot]:
+    start, other, to_slot = _SOURCES[model]
+    column = getattr(model, start)
+    statement = (
+        select(model.id, column, getattr(model, other))
+        .where(model.travel_id == travel_id, *conditions)
+        .order_by(column, model.id)
+    )
+    return [to_slot(*row) for row in (await execute(session, statement)).tuples()]
+
+
+async def _has_accommodations(session: Any, travel_id: int) -> bool:
+    statement = select(Accommodation.id).where(Accommodation.travel_id == travel_id).limit(1)
+    return (await execute(session, statement)).first() is not None
+
+
+def overlaps(slots: Iterable[Slot]) -> Iterator[tuple[Slot, Slot]]:
+    """Pares que se pisan entre ``slots``, que deben venir ordenados por inicio."""
+    active: list[tuple[datetime, int, Slot]] = []
+    for index, slot in enumerate(slots):
+        # Los que terminaron antes de que empiece este ya no pisan a nadie más.
+        while active and active[0][0] <= slot.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            if other.start < slot.end:
+                yield other, slot
+        heapq.heappush(active, (slot.end, index, slot))
+
+
+def stays(accommodations: Iterable[Slot]) -> list[tuple[date, date]]:
+    """Días cubiertos por alojamientos (ordenados por entrada), unidos en rangos disjuntos con extremos incluidos."""
+    ranges: list[tuple[date, date]] = []
+    for slot in accommodations:
+        first, last = slot.start.date(), slot.end.date()
+        if ranges and first <= ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def uncovered(activities: Iterable[Slot], ranges: list[tuple[date, date]]) -> Iterator[Slot]:
+    """Actividades (ordenadas por inicio) con algún día fuera de ``ranges``; las dos listas se recorren una vez."""
+    index = 0
+    for slot in activities:
+        first = slot.start.date()
+        last = max(first, (slot.end - timedelta(microseconds=1)).date())
+        while index < len(ranges) and ranges[index][1] < first:
+            index += 1
+        if index == len(ranges) or ranges[index][0] > first or ranges[index][1] < last:
+            yield slot
+
+
+async def travel_conflicts(session: Any, travel_id: int, limit: int = DEFAULT_LIMIT) -> TravelConflicts:
+    transports = await _slots(session, Transport, travel_id)
+    activities = await _slots(session, Activity, travel_id)
+    accommodations = await _slots(session, Accommodation, travel_id)
+    timeline = heapq.merge(transports, activities, key=lambda slot: slot.start)
+    ranges = stays(accommodations)
+    found = chain(
+        (Conflict("overlap", [*pair]) for pair in overlaps(timeline)),
+        (Conflict("overlap", [*pair]) for pair in overlaps(accommodations)),
+        (Conflict("uncovered", [slot]) for slot in (uncovered(activities, ranges) if ranges else ())),
+    )
+    # Con un límite el barrido se corta al llegar a él, aunque haya muchísimos pares.
+    conflicts = list(islice(found, limit + 1))
+    return TravelConflicts(travel_id=travel_id, conflicts=conflicts[:limit], truncated=len(conflicts) > limit)
+
+
+async def find_conflicts(session: Any, model: type, values: dict[str, Any]) -> list[Conflict]:
+    """Conflictos que tendría con el resto de su viaje la fila ``values`` (nueva, o con sus cambios aplicados).
+
+    Solo lee las filas que caen en su intervalo, no el viaje entero.
+    """
+    start, other, to_slot = _SOURCES[model]
+    slot = to_slot(values.get("id"), values[start], values[other])
+    travel_id = values["travel_id"]
+    conflicts = []
+    for neighbour in (Accommodation,) if model is Accommodation else (Transport, Activity):
+        for existing in await _slots(session, neighbour, travel_id, *_window(neighbour, slot.start, slot.end)):
+            if (existing.kind, existing.id) == (slot.kind, slot.id):
+                continue
+            if existing.start < slot.end and slot.start < existing.end:
+                conflicts.append(Conflict("overlap", [existing, slot]))
+    if model is Activity:
+        # Los alojamientos que tocan alguno de sus días, con extremos incluidos.
+        first = datetime.combine(slot.start.date(), time.min)
+        last = datetime.combine(max(slot.start, slot.end - timedelta(microseconds=1)).date(), time.min)
+        window = _window(Accommodation, first - timedelta(days=1), last + timedelta(days=1))
+        nearby = await _slots(session, Accommodation, travel_id, *window)
+        if nearby or await _has_accommodations(session, travel_id):
+            conflicts += [Conflict("uncovered", [slot]) for slot in uncovered([slot], stays(nearby))]
+    return conflicts
+
+
+async def ensure_no_conflicts(session: Any, instance: Any, changes: Optional[dict[str, Any]] = None) -> None:
+    """Rechaza con 409 el alta o el cambio de ``instance`` si deja conflictos de agenda en su viaje."""
+    start, other, _ = _SOURCES[type(instance)]
+    values = {key: getattr(instance, key) for key in ("id", "travel_id", start, other)}
+    values.update(changes or {})
+    if conflicts := await find_conflicts(session, type(instance), values):
+        raise HTTPException(
+            status_code=HTTP_409_CONFLICT,
+            detail="El cambio genera conflictos de agenda en el viaje",
+            extra={"conflicts": [asdict(conflict) for conflict in conflicts[:DEFAULT_LIMIT]]},
+        )
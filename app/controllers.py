@@ -1,11 +1,23 @@
-from typing import Sequence
+import tempfile
+from datetime import datetime
+from typing import Any, Optional
 
 from advanced_alchemy.exceptions import NotFoundError
 from advanced_alchemy.filters import CollectionFilter
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, MediaType, Request, delete, get, patch, post
 from litestar.dto import DTOData
-from litestar.exceptions import NotFoundException
-
+from litestar.exceptions import NotFoundException, ValidationException
+from litestar.params import Parameter
+from litestar.response import Stream
+from litestar.status_codes import HTTP_200_OK
+from sqlalchemy import select
+
+from app.budget import Budget, travel_budget
+from app.bulk import BulkResult, bulk_create, bulk_delete, bulk_update
+from app.cache import CacheStats, CacheStore, affected_travels, invalidate
+from app.compression import SKIP_COMPRESSION
+from app.conflicts import DEFAULT_LIMIT, MAX_CONFLICTS, TravelConflicts, ensure_no_conflicts, provide_conflict_check, travel_conflicts
+from app.database import DBSession, commit, execute
 from app.dtos import (
     UserCreateDTO,
     UserReadDTO,
@@ -30,8 +42,40 @@ from app.dtos import (
     CityCreateDTO,
     CityReadDTO,
     CityUpdateDTO,
+    UserRow,
+    AccommodationRow,
+    ActivityRow,
+    ExpenseRow,
+    CityRow,
+)
+from app.etag import conditional, update_if_match
+from app.events import travel_events
+from app.filters import (
+    ListQuery,
+    provide_user_filters,
+    provide_travel_filters,
+    provide_accommodation_filters,
+    provide_transport_filters,
+    provide_activity_filters,
+    provide_expense_filters,
+    provide_city_filters,
 )
-from app.models import User, Travel, Accommodation, Transport, Activity, Expense, City
+from app.export import ExportFormat, ExportResource, export_response, export_statement
+from app.http_cache import NO_STORE, PRIVATE_REVALIDATE, PUBLIC_LONG
+from app.importer import (
+    DEFAULT_BATCH_SIZE,
+    MAX_BATCH_SIZE,
+    ImportFormat,
+    ImportReport,
+    ImportResource,
+    import_file,
+    report_for,
+)
+from app.expenses import ExpenseSummary, Settlement, expense_summary, settlement
+from app.itinerary import stream_itinerary
+from app.membership import add_members, remove_member
+from app.models import User, Travel, Accommodation, Transport, Activity, Expense, City, UsersTravels, ImportCheckpoint
+from app.pagination import Page, Pagination, paginate, paginate_rows
 from app.repositories import (
     UserRepository,
     TravelRepository,
@@ -47,266 +91,468 @@ from app.repositories import (
     provide_activity_repo,
     provide_expense_repo,
     provide_city_repo,
+    reload,
 )
+from app.routing import Optimize, Route, find_route
+from app.search import MAX_LIMIT, SearchKind, SearchResults, search
+from app.settings import RouteSettings, SearchSettings
 
 class UserController(Controller):
     path = "/users"
     tags = ["users"]
-    dependencies = {"user_repo": provide_user_repo}
+    cache_control = PRIVATE_REVALIDATE
+    dependencies = {
+        "user_repo": provide_user_repo,
+        "user_filters": provide_user_filters,
+        "travel_repo": provide_travel_repo,
+        "travel_filters": provide_travel_filters,
+    }
     return_dto = UserReadDTO
 
     @post(dto=UserCreateDTO)
     async def add_user(self, user_repo: UserRepository, data: User) -> User:
-        return user_repo.add(data)
+        user = await reload(user_repo, await user_repo.add(data))
+        await commit(user_repo.session)
+        return user
 
     @get("/{user_id:int}")
-    async def get_user(self, user_repo: UserRepository, user_id: int) -> User:
+    async def get_user(self, request: Request, user_repo: UserRepository, user_id: int) -> User:
         try:
-            return user_repo.get(user_id)
+            return conditional(request, await user_repo.get(user_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"User {user_id} not found") from e
 
-    @get()
-    async def list_users(self, user_repo: UserRepository) -> Sequence[User]:
-        return user_repo.list()
+    @get(return_dto=None)
+    async def list_users(self, request: Request, user_repo: UserRepository, pagination: Pagination, user_filters: ListQuery) -> Page[UserRow]:
+        return conditional(request, await paginate_rows(user_repo, UserRow, pagination, *user_filters.filters(), order_by=user_filters.order_by))
+
+    @get("/{user_id:int}/travels", return_dto=TravelReadDTO)
+    async def get_user_travels(
+        self,
+        request: Request,
+        user_repo: UserRepository,
+        travel_repo: TravelRepository,
+        user_id: int,
+        pagination: Pagination,
+        travel_filters: ListQuery,
+    ) -> Page[Travel]:
+        if not await user_repo.exists(id=user_id):
+            raise NotFoundException(detail=f"Usuario {user_id} no encontrado")
+        # Busca por la clave primaria (user_id, travel_id) de users_travels.
+        memberships = select(UsersTravels.travel_id).where(UsersTravels.user_id == user_id)
+        filters = travel_filters.filters(Travel.id.in_(memberships))
+        return conditional(request, await paginate(travel_repo, pagination, *filters, order_by=travel_filters.order_by))
+
+    @get("/{user_id:int}/export", return_dto=None, opt={SKIP_COMPRESSION: True})
+    async def export_user(
+        self,
+        request: Request,
+        user_repo: UserRepository,
+        user_id: int,
+        resource: ExportResource = "travels",
+        fmt: ExportFormat = Parameter(query="format", default="ndjson"),
+    ) -> Stream:
+        if not await user_repo.exists(id=user_id):
+            raise NotFoundException(detail=f"Usuario {user_id} no encontrado")
+        return export_response(request, export_statement(resource, user_id), fmt, f"user-{user_id}-{resource}")
 
     @patch("/{user_id:int}", dto=UserUpdateDTO)
-    async def update_user(self, user_repo: UserRepository, user_id: int, data: DTOData[User]) -> User:
+    async def update_user(self, request: Request, user_repo: UserRepository, user_id: int, data: DTOData[User], response_cache: CacheStore) -> User:
         try:
-            user, _ = user_repo.get_and_update(id=user_id, **data.as_builtins(), match_fields=["id"])
-            return user
+            user = await update_if_match(request, user_repo, user_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Usuario {user_id} no encontrado") from e
+        travel_ids = await affected_travels(user_repo.session, User, [user_id])
+        await commit(user_repo.session)
+        await invalidate(response_cache, User, travel_ids)
+        return user
 
 
     @delete("/{user_id:int}")
-    async def delete_user(self, user_repo: UserRepository, user_id: int) -> None:
+    async def delete_user(self, user_repo: UserRepository, user_id: int, response_cache: CacheStore) -> None:
+        travel_ids = await affected_travels(user_repo.session, User, [user_id])
         try:
-            user_repo.delete(user_id)
+            await user_repo.delete(user_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Usuario {user_id} no encontrado") from e
+        await commit(user_repo.session)
+        await invalidate(response_cache, User, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_users_bulk(self, user_repo: UserRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(user_repo, data, UserCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_users_bulk(self, user_repo: UserRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(user_repo, data, UserUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_users_bulk(self, user_repo: UserRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(user_repo, data, bulk_chunk_size, response_cache)
 # Se pueden definir controladores similares para Travel, Accommodation, Transport, Activity, Expense y City.
 
 
 class CityController(Controller):
     path = "/cities"
     tags = ["cities"]
-    dependencies = {"city_repo": provide_city_repo}
+    # Catálogo compartido que casi no cambia: cualquier caché puede guardarlo.
+    cache_control = PUBLIC_LONG
+    dependencies = {"city_repo": provide_city_repo, "city_filters": provide_city_filters}
     return_dto = CityReadDTO
 
     @post(dto=CityCreateDTO)
-    async def add_city(self, city_repo: CityRepository, data: City) -> City:
-        return city_repo.add(data)
+    async def add_city(self, city_repo: CityRepository, data: City, response_cache: CacheStore) -> City:
+        city = await reload(city_repo, await city_repo.add(data))
+        await commit(city_repo.session)
+        await invalidate(response_cache, City)
+        return city
 
-    @get()
-    async def list_cities(self, city_repo: CityRepository) -> Sequence[City]:
-        return city_repo.list()
+    @get(cache=True, return_dto=None)
+    async def list_cities(self, request: Request, city_repo: CityRepository, pagination: Pagination, city_filters: ListQuery) -> Page[CityRow]:
+        return conditional(request, await paginate_rows(city_repo, CityRow, pagination, *city_filters.filters(), order_by=city_filters.order_by))
 
     @patch("/{city_id:int}", dto=CityUpdateDTO)
-    async def update_city(self, city_repo: CityRepository, city_id: int, data: DTOData[City]) -> City:
+    async def update_city(self, request: Request, city_repo: CityRepository, city_id: int, data: DTOData[City], response_cache: CacheStore) -> City:
         try:
-            city, _ = city_repo.get_and_update(id=city_id, **data.as_builtins(), match_fields=["id"])
-            return city
+            city = await update_if_match(request, city_repo, city_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Ciudad {city_id} no encontrada") from e
+        travel_ids = await affected_travels(city_repo.session, City, [city_id])
+        await commit(city_repo.session)
+        await invalidate(response_cache, City, travel_ids)
+        return city
 
     @delete("/{city_id:int}")
-    async def delete_city(self, city_repo: CityRepository, city_id: int) -> None:
+    async def delete_city(self, city_repo: CityRepository, city_id: int, response_cache: CacheStore) -> None:
+        travel_ids = await affected_travels(city_repo.session, City, [city_id])
         try:
-            city_repo.delete(city_id)
+            await city_repo.delete(city_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Ciudad {city_id} no encontrada") from e
-        
+        await commit(city_repo.session)
+        await invalidate(response_cache, City, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_cities_bulk(self, city_repo: CityRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(city_repo, data, CityCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_cities_bulk(self, city_repo: CityRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(city_repo, data, CityUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_cities_bulk(self, city_repo: CityRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(city_repo, data, bulk_chunk_size, response_cache)
+
 
 class TransportController(Controller):
     path = "/transports"
     tags = ["transports"]
-    dependencies = {"transport_repo": provide_transport_repo}
+    cache_control = PRIVATE_REVALIDATE
+    dependencies = {"transport_repo": provide_transport_repo, "transport_filters": provide_transport_filters, "conflict_check": provide_conflict_check}
     return_dto = TransportReadDTO
 
     @post(dto=TransportCreateDTO)
-    async def add_transport(self, transport_repo: TransportRepository, data: Transport) -> Transport:
-        return transport_repo.add(data)
+    async def add_transport(self, transport_repo: TransportRepository, data: Transport, response_cache: CacheStore, conflict_check: bool) -> Transport:
+        if conflict_check:
+            await ensure_no_conflicts(transport_repo.session, data)
+        transport = await reload(transport_repo, await transport_repo.add(data))
+        await commit(transport_repo.session)
+        await invalidate(response_cache, Transport, [transport.travel_id])
+        return transport
 
     @get("/{transport_id:int}")
-    async def get_transport(self, transport_repo: TransportRepository, transport_id: int) -> Transport:
+    async def get_transport(self, request: Request, transport_repo: TransportRepository, transport_id: int) -> Transport:
         try:
-            return transport_repo.get(transport_id)
+            return conditional(request, await transport_repo.get(transport_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"Transporte {transport_id} no encontrado") from e
 
     @get()
-    async def list_transports(self, transport_repo: TransportRepository) -> Sequence[Transport]:
-        return transport_repo.list()
+    async def list_transports(self, request: Request, transport_repo: TransportRepository, pagination: Pagination, transport_filters: ListQuery) -> Page[Transport]:
+        return conditional(request, await paginate(transport_repo, pagination, *transport_filters.filters(), order_by=transport_filters.order_by))
 
     @patch("/{transport_id:int}", dto=TransportUpdateDTO)
-    async def update_transport(self, transport_repo: TransportRepository, transport_id: int, data: DTOData[Transport]) -> Transport:
+    async def update_transport(self, request: Request, transport_repo: TransportRepository, transport_id: int, data: DTOData[Transport], response_cache: CacheStore, conflict_check: bool) -> Transport:
+        travel_ids = await affected_travels(transport_repo.session, Transport, [transport_id])
         try:
-            transport, _ = transport_repo.get_and_update(id=transport_id, **data.as_builtins(), match_fields=["id"])
-            return transport
+            if conflict_check:
+                await ensure_no_conflicts(transport_repo.session, await transport_repo.get(transport_id), data.as_builtins())
+            transport = await update_if_match(request, transport_repo, transport_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Transporte {transport_id} no encontrado") from e
+        await commit(transport_repo.session)
+        await invalidate(response_cache, Transport, travel_ids | {transport.travel_id})
+        return transport
 
     @delete("/{transport_id:int}")
-    async def delete_transport(self, transport_repo: TransportRepository, transport_id: int) -> None:
+    async def delete_transport(self, transport_repo: TransportRepository, transport_id: int, response_cache: CacheStore) -> None:
+        travel_ids = await affected_travels(transport_repo.session, Transport, [transport_id])
         try:
-            transport_repo.delete(transport_id)
+            await transport_repo.delete(transport_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Transporte {transport_id} no encontrado") from e
+        await commit(transport_repo.session)
+        await invalidate(response_cache, Transport, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_transports_bulk(self, transport_repo: TransportRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(transport_repo, data, TransportCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_transports_bulk(self, transport_repo: TransportRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(transport_repo, data, TransportUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_transports_bulk(self, transport_repo: TransportRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(transport_repo, data, bulk_chunk_size, response_cache)
+
 
 class AccommodationController(Controller):
     path = "/accommodations"
     tags = ["accommodations"]
-    dependencies = {"accommodation_repo": provide_accommodation_repo}
+    cache_control = PRIVATE_REVALIDATE
+    dependencies = {"accommodation_repo": provide_accommodation_repo, "accommodation_filters": provide_accommodation_filters, "conflict_check": provide_conflict_check}
     return_dto = AccommodationReadDTO
 
-    @get("/")
+    @get("/", return_dto=None)
     async def list_accommodations(
-        self, accommodation_repo: AccommodationRepository
-    ) -> Sequence[Accommodation]:
-        return accommodation_repo.list()
-
-    @get("/{accommodation_id:int}", dto=AccommodationReadFullDTO)
+        self, request: Request, accommodation_repo: AccommodationRepository, pagination: Pagination, accommodation_filters: ListQuery
+    ) -> Page[AccommodationRow]:
+        return conditional(
+            request,
+            await paginate_rows(accommodation_repo, AccommodationRow, pagination, *accommodation_filters.filters(), order_by=accommodation_filters.order_by),
+        )
+
+    @get("/{accommodation_id:int}", return_dto=AccommodationReadFullDTO)
     async def get_accommodation(
-        self, accommodation_repo: AccommodationRepository, accommodation_id: int
+        self, request: Request, accommodation_repo: AccommodationRepository, accommodation_id: int
     ) -> Accommodation:
         try:
-            return accommodation_repo.get(accommodation_id)
+            return conditional(request, await accommodation_repo.get(accommodation_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"Alojamiento {accommodation_id} no encontrado") from e
 
     @post(dto=AccommodationCreateDTO)
     async def add_accommodation(
-        self, accommodation_repo: AccommodationRepository, data: Accommodation
+        self, accommodation_repo: AccommodationRepository, data: Accommodation, response_cache: CacheStore, conflict_check: bool
     ) -> Accommodation:
-        return accommodation_repo.add(data)
+        if conflict_check:
+            await ensure_no_conflicts(accommodation_repo.session, data)
+        accommodation = await reload(accommodation_repo, await accommodation_repo.add(data))
+        await commit(accommodation_repo.session)
+        await invalidate(response_cache, Accommodation, [accommodation.travel_id])
+        return accommodation
 
     @patch("/{accommodation_id:int}", dto=AccommodationUpdateDTO)
     async def update_accommodation(
         self,
+        request: Request,
         accommodation_repo: AccommodationRepository,
         accommodation_id: int,
         data: DTOData[Accommodation],
+        response_cache: CacheStore,
+        conflict_check: bool,
     ) -> Accommodation:
+        travel_ids = await affected_travels(accommodation_repo.session, Accommodation, [accommodation_id])
         try:
-            accommodation, _ = accommodation_repo.get_and_update(
-                id=accommodation_id, **data.as_builtins(), match_fields=["id"]
-            )
-            return accommodation
+            if conflict_check:
+                await ensure_no_conflicts(accommodation_repo.session, await accommodation_repo.get(accommodation_id), data.as_builtins())
+            accommodation = await update_if_match(request, accommodation_repo, accommodation_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Alojamiento {accommodation_id} no encontrado") from e
+        await commit(accommodation_repo.session)
+        await invalidate(response_cache, Accommodation, travel_ids | {accommodation.travel_id})
+        return accommodation
 
     @delete("/{accommodation_id:int}")
     async def delete_accommodation(
-        self, accommodation_repo: AccommodationRepository, accommodation_id: int
+        self, accommodation_repo: AccommodationRepository, accommodation_id: int, response_cache: CacheStore
     ) -> None:
+        travel_ids = await affected_travels(accommodation_repo.session, Accommodation, [accommodation_id])
         try:
-            accommodation_repo.delete(accommodation_id)
+            await accommodation_repo.delete(accommodation_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Alojamiento {accommodation_id} no encontrado") from e
+        await commit(accommodation_repo.session)
+        await invalidate(response_cache, Accommodation, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_accommodations_bulk(self, accommodation_repo: AccommodationRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(accommodation_repo, data, AccommodationCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_accommodations_bulk(self, accommodation_repo: AccommodationRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(accommodation_repo, data, AccommodationUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_accommodations_bulk(self, accommodation_repo: AccommodationRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(accommodation_repo, data, bulk_chunk_size, response_cache)
 
 
 class ActivityController(Controller):
     path = "/activities"
     tags = ["activities"]
-    dependencies = {"activity_repo": provide_activity_repo}
+    cache_control = PRIVATE_REVALIDATE
+    dependencies = {"activity_repo": provide_activity_repo, "activity_filters": provide_activity_filters, "conflict_check": provide_conflict_check}
     return_dto = ActivityReadDTO
 
-    @get("/")
+    @get("/", return_dto=None)
     async def list_activities(
-        self, activity_repo: ActivityRepository
-    ) -> Sequence[Activity]:
-        return activity_repo.list()
-
-    @get("/{activity_id:int}", dto=ActivityReadFullDTO)
+        self, request: Request, activity_repo: ActivityRepository, pagination: Pagination, activity_filters: ListQuery
+    ) -> Page[ActivityRow]:
+        return conditional(
+            request,
+            await paginate_rows(activity_repo, ActivityRow, pagination, *activity_filters.filters(), order_by=activity_filters.order_by),
+        )
+
+    @get("/{activity_id:int}", return_dto=ActivityReadFullDTO)
     async def get_activity(
-        self, activity_repo: ActivityRepository, activity_id: int
+        self, request: Request, activity_repo: ActivityRepository, activity_id: int
     ) -> Activity:
         try:
-            return activity_repo.get(activity_id)
+            return conditional(request, await activity_repo.get(activity_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"Actividad {activity_id} no encontrada") from e
 
     @post(dto=ActivityCreateDTO)
     async def add_activity(
-        self, activity_repo: ActivityRepository, data: Activity
+        self, activity_repo: ActivityRepository, data: Activity, response_cache: CacheStore, conflict_check: bool
     ) -> Activity:
-        return activity_repo.add(data)
+        if conflict_check:
+            await ensure_no_conflicts(activity_repo.session, data)
+        activity = await reload(activity_repo, await activity_repo.add(data))
+        await commit(activity_repo.session)
+        await invalidate(response_cache, Activity, [activity.travel_id])
+        return activity
 
     @patch("/{activity_id:int}", dto=ActivityUpdateDTO)
     async def update_activity(
         self,
+        request: Request,
         activity_repo: ActivityRepository,
         activity_id: int,
         data: DTOData[Activity],
+        response_cache: CacheStore,
+        conflict_check: bool,
     ) -> Activity:
+        travel_ids = await affected_travels(activity_repo.session, Activity, [activity_id])
         try:
-            activity, _ = activity_repo.get_and_update(
-                id=activity_id, **data.as_builtins(), match_fields=["id"]
-            )
-            return activity
+            if conflict_check:
+                await ensure_no_conflicts(activity_repo.session, await activity_repo.get(activity_id), data.as_builtins())
+            activity = await update_if_match(request, activity_repo, activity_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Actividad {activity_id} no encontrada") from e
+        await commit(activity_repo.session)
+        await invalidate(response_cache, Activity, travel_ids | {activity.travel_id})
+        return activity
 
     @delete("/{activity_id:int}")
     async def delete_activity(
-        self, activity_repo: ActivityRepository, activity_id: int
+        self, activity_repo: ActivityRepository, activity_id: int, response_cache: CacheStore
     ) -> None:
+        travel_ids = await affected_travels(activity_repo.session, Activity, [activity_id])
         try:
-            activity_repo.delete(activity_id)
+            await activity_repo.delete(activity_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Actividad {activity_id} no encontrada") from e
+        await commit(activity_repo.session)
+        await invalidate(response_cache, Activity, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_activities_bulk(self, activity_repo: ActivityRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(activity_repo, data, ActivityCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_activities_bulk(self, activity_repo: ActivityRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(activity_repo, data, ActivityUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_activities_bulk(self, activity_repo: ActivityRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(activity_repo, data, bulk_chunk_size, response_cache)
 
 
 class ExpenseController(Controller):
     path = "/expenses"
     tags = ["expenses"]
-    dependencies = {"expense_repo": provide_expense_repo}
+    cache_control = PRIVATE_REVALIDATE
+    dependencies = {"expense_repo": provide_expense_repo, "expense_filters": provide_expense_filters}
     return_dto = ExpenseReadDTO
 
     @post(dto=ExpenseCreateDTO)
     async def add_expense(
-        self, expense_repo: ExpenseRepository, data: Expense
+        self, expense_repo: ExpenseRepository, data: Expense, response_cache: CacheStore
     ) -> Expense:
-        return expense_repo.add(data)
-    
+        expense = await reload(expense_repo, await expense_repo.add(data))
+        await commit(expense_repo.session)
+        await invalidate(response_cache, Expense, [expense.travel_id])
+        return expense
+
+    @get(return_dto=None)
+    async def list_expenses(
+        self, request: Request, expense_repo: ExpenseRepository, pagination: Pagination, expense_filters: ListQuery
+    ) -> Page[ExpenseRow]:
+        return conditional(
+            request,
+            await paginate_rows(expense_repo, ExpenseRow, pagination, *expense_filters.filters(), order_by=expense_filters.order_by),
+        )
+
     @get("/{expense_id:int}")
     async def get_expense(
-        self, expense_repo: ExpenseRepository, expense_id: int
+        self, request: Request, expense_repo: ExpenseRepository, expense_id: int
     ) -> Expense:
         try:
-            return expense_repo.get(expense_id)
+            return conditional(request, await expense_repo.get(expense_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"Gasto {expense_id} no encontrado") from e
 
     @patch("/{expense_id:int}", dto=ExpenseUpdateDTO)
     async def update_expense(
         self,
+        request: Request,
         expense_repo: ExpenseRepository,
         expense_id: int,
         data: DTOData[Expense],
+        response_cache: CacheStore,
     ) -> Expense:
+        travel_ids = await affected_travels(expense_repo.session, Expense, [expense_id])
         try:
-            expense, _ = expense_repo.get_and_update(
-                id=expense_id, **data.as_builtins(), match_fields=["id"]
-            )
-            return expense
+            expense = await update_if_match(request, expense_repo, expense_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Gasto {expense_id} no encontrado") from e
+        await commit(expense_repo.session)
+        await invalidate(response_cache, Expense, travel_ids | {expense.travel_id})
+        return expense
 
     @delete("/{expense_id:int}")
     async def delete_expense(
-        self, expense_repo: ExpenseRepository, expense_id: int
+        self, expense_repo: ExpenseRepository, expense_id: int, response_cache: CacheStore
     ) -> None:
+        travel_ids = await affected_travels(expense_repo.session, Expense, [expense_id])
         try:
-            expense_repo.delete(expense_id)
+            await expense_repo.delete(expense_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Gasto {expense_id} no encontrado") from e
+        await commit(expense_repo.session)
+        await invalidate(response_cache, Expense, travel_ids)
+
+    @post("/bulk", return_dto=None)
+    async def add_expenses_bulk(self, expense_repo: ExpenseRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(expense_repo, data, ExpenseCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_expenses_bulk(self, expense_repo: ExpenseRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(expense_repo, data, ExpenseUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_expenses_bulk(self, expense_repo: ExpenseRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(expense_repo, data, bulk_chunk_size, response_cache)
 
 
 class TravelController(Controller):
     path = "/travels"
     tags = ["travels"]
+    cache_control = PRIVATE_REVALIDATE
     return_dto = TravelReadDTO
     dependencies = {
         "travel_repo": provide_travel_repo,
@@ -314,82 +560,253 @@ class TravelController(Controller):
         "accommodation_repo": provide_accommodation_repo,
         "transport_repo": provide_transport_repo,
         "activity_repo": provide_activity_repo,
-        "expense_repo": provide_expense_repo
+        "expense_repo": provide_expense_repo,
+        "travel_filters": provide_travel_filters,
+        "user_filters": provide_user_filters,
+        "accommodation_filters": provide_accommodation_filters,
+        "transport_filters": provide_transport_filters,
+        "activity_filters": provide_activity_filters,
+        "expense_filters": provide_expense_filters,
     }
 
-    @get("/")
-    async def list_travels(self, travel_repo: TravelRepository) -> list[Travel]:
-        return travel_repo.list()
+    @get("/", cache=True)
+    async def list_travels(self, request: Request, travel_repo: TravelRepository, pagination: Pagination, travel_filters: ListQuery) -> Page[Travel]:
+        return conditional(request, await paginate(travel_repo, pagination, *travel_filters.filters(), order_by=travel_filters.order_by))
 
-    @get("/{travel_id:int}")
-    async def get_travel(self, travel_repo: TravelRepository, travel_id: int) -> Travel:
+    @get("/export", return_dto=None, opt={SKIP_COMPRESSION: True})
+    async def export_travels(
+        self,
+        request: Request,
+        resource: ExportResource = "travels",
+        fmt: ExportFormat = Parameter(query="format", default="ndjson"),
+    ) -> Stream:
+        return export_response(request, export_statement(resource), fmt, resource)
+
+    @get("/{travel_id:int}", cache=True)
+    async def get_travel(self, request: Request, travel_repo: TravelRepository, travel_id: int) -> Travel:
         try:
-            return travel_repo.get(travel_id)
+            return conditional(request, await travel_repo.get(travel_id))
         except NotFoundError as e:
             raise NotFoundException(detail=f"Viaje {travel_id} no encontrado") from e
 
     @post(dto=TravelCreateDTO)
-    async def add_travel(self, travel_repo: TravelRepository, data: Travel) -> Travel:
-        return travel_repo.add(data)
+    async def add_travel(self, travel_repo: TravelRepository, data: Travel, response_cache: CacheStore) -> Travel:
+        travel = await reload(travel_repo, await travel_repo.add(data))
+        await commit(travel_repo.session)
+        await invalidate(response_cache, Travel, [travel.id])
+        return travel
 
     @patch("/{travel_id:int}", dto=TravelUpdateDTO)
-    async def update_travel(self, travel_repo: TravelRepository, travel_id: int, data: DTOData[Travel]) -> Travel:
+    async def update_travel(self, request: Request, travel_repo: TravelRepository, travel_id: int, data: DTOData[Travel], response_cache: CacheStore) -> Travel:
         try:
-            travel, _ = travel_repo.get_and_update(id=travel_id, **data.as_builtins(), match_fields=["id"])
-            return travel
+            travel = await update_if_match(request, travel_repo, travel_id, data.as_builtins())
         except NotFoundError as e:
             raise NotFoundException(detail=f"Viaje {travel_id} no encontrado") from e
+        await commit(travel_repo.session)
+        await invalidate(response_cache, Travel, [travel_id])
+        return travel
 
     @delete("/{travel_id:int}")
-    async def delete_travel(self, travel_repo: TravelRepository, travel_id: int) -> None:
+    async def delete_travel(self, travel_repo: TravelRepository, travel_id: int, response_cache: CacheStore) -> None:
         try:
-            travel_repo.delete(travel_id)
+            await travel_repo.delete(travel_id)
         except NotFoundError as e:
             raise NotFoundException(detail=f"Viaje {travel_id} no encontrado") from e
+        await commit(travel_repo.session)
+        await invalidate(response_cache, Travel, [travel_id])
 
-    @get("/{travel_id:int}/users")
-    async def get_travel_users(self, travel_repo: TravelRepository, travel_id: int, user_repo: UserRepository) -> Sequence[User]:
+    @get("/{travel_id:int}/itinerary", return_dto=None)
+    async def get_travel_itinerary(self, travel_repo: TravelRepository, travel_id: int) -> Stream:
         try:
-            travel = travel_repo.get(travel_id)
-            return travel.users
+            travel = await travel_repo.get(travel_id, load=[Travel.users])
         except NotFoundError as e:
             raise NotFoundException(detail=f"Viaje {travel_id} no encontrado") from e
+        return Stream(stream_itinerary(travel), media_type=MediaType.JSON)
+
+    @get("/{travel_id:int}/events", return_dto=None, cache_control=NO_STORE, opt={SKIP_COMPRESSION: True})
+    async def stream_travel_events(
+        self,
+        travel_repo: TravelRepository,
+        travel_id: int,
+        last_event_id: Optional[int] = Parameter(header="Last-Event-ID", default=None, ge=0),
+    ) -> Stream:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        # Sin compresión ni buffer del proxy: cada evento tiene que salir apenas se escribe.
+        return Stream(
+            travel_events.subscribe(travel_id, last_event_id),
+            media_type="text/event-stream",
+            headers={"X-Accel-Buffering": "no"},
+        )
+
+    @get("/{travel_id:int}/users", return_dto=None, cache=True)
+    async def get_travel_users(self, request: Request, travel_repo: TravelRepository, travel_id: int, user_repo: UserRepository, pagination: Pagination, user_filters: ListQuery) -> Page[UserRow]:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        members = select(UsersTravels.user_id).where(UsersTravels.travel_id == travel_id)
+        filters = user_filters.filters(User.id.in_(members))
+        return conditional(request, await paginate_rows(user_repo, UserRow, pagination, *filters, order_by=user_filters.order_by))
 
 
 
     @post("/{travel_id:int}/users")
-    async def add_travel_users(self, travel_repo: TravelRepository, user_repo: UserRepository, travel_id: int, user_ids: list[int]) -> Travel:
-        try:
-            travel = travel_repo.get(travel_id)
-            users = user_repo.list(CollectionFilter(field_name="id", values=user_ids))
-            travel.users.extend(users)
-            travel_repo.update(travel)
-            return travel
-        except NotFoundError as e:
-            raise NotFoundException(detail=f"Viaje {travel_id} o usuarios no encontrados") from e
+    async def add_travel_users(self, travel_repo: TravelRepository, travel_id: int, user_ids: list[int], response_cache: CacheStore) -> Travel:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        await add_members(travel_repo.session, travel_id, user_ids)
+        travel = await travel_repo.get(travel_id)
+        await commit(travel_repo.session)
+        await invalidate(response_cache, Travel, [travel_id])
+        return travel
 
     @delete("/{travel_id:int}/users/{user_id:int}")
-    async def remove_travel_user(self, travel_repo: TravelRepository, travel_id: int, user_id: int) -> None:
-        try:
-            travel = travel_repo.get(travel_id)
-            user = next(user for user in travel.users if user.id == user_id)
-            travel.users.remove(user)
-            travel_repo.update(travel)
-        except (NotFoundError, StopIteration) as e:
-            raise NotFoundException(detail=f"Viaje {travel_id} o usuario {user_id} no encontrado") from e
-
-    @get("/{travel_id:int}/accommodations")
-    async def list_travel_accommodations(self, accommodation_repo: AccommodationRepository, travel_id: int) -> list[Accommodation]:
-        return accommodation_repo.list(CollectionFilter(field_name="travel_id", values=[travel_id]))
-
-    @get("/{travel_id:int}/transports")
-    async def list_travel_transports(self, transport_repo: TransportRepository, travel_id: int) -> list[Transport]:
-        return transport_repo.list(CollectionFilter(field_name="travel_id", values=[travel_id]))
-
-    @get("/{travel_id:int}/activities")
-    async def list_travel_activities(self, activity_repo: ActivityRepository, travel_id: int) -> list[Activity]:
-        return activity_repo.list(CollectionFilter(field_name="travel_id", values=[travel_id]))
-
-    @get("/{travel_id:int}/expenses")
-    async def list_travel_expenses(self, expense_repo: ExpenseRepository, travel_id: int) -> list[Expense]:
-        return expense_repo.list(CollectionFilter(field_name="travel_id", values=[travel_id]))
\ No newline at end of file
+    async def remove_travel_user(self, travel_repo: TravelRepository, travel_id: int, user_id: int, response_cache: CacheStore) -> None:
+        if not await remove_member(travel_repo.session, travel_id, user_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} o usuario {user_id} no encontrado")
+        await commit(travel_repo.session)
+        await invalidate(response_cache, Travel, [travel_id])
+
+    @get("/{travel_id:int}/accommodations", return_dto=None, cache=True)
+    async def list_travel_accommodations(self, request: Request, accommodation_repo: AccommodationRepository, travel_id: int, pagination: Pagination, accommodation_filters: ListQuery) -> Page[AccommodationRow]:
+        filters = accommodation_filters.filters(CollectionFilter(field_name="travel_id", values=[travel_id]))
+        return conditional(request, await paginate_rows(accommodation_repo, AccommodationRow, pagination, *filters, order_by=accommodation_filters.order_by))
+
+    @get("/{travel_id:int}/transports", return_dto=TransportReadDTO, cache=True)
+    async def list_travel_transports(self, request: Request, transport_repo: TransportRepository, travel_id: int, pagination: Pagination, transport_filters: ListQuery) -> Page[Transport]:
+        filters = transport_filters.filters(CollectionFilter(field_name="travel_id", values=[travel_id]))
+        return conditional(request, await paginate(transport_repo, pagination, *filters, order_by=transport_filters.order_by))
+
+    @get("/{travel_id:int}/activities", return_dto=None, cache=True)
+    async def list_travel_activities(self, request: Request, activity_repo: ActivityRepository, travel_id: int, pagination: Pagination, activity_filters: ListQuery) -> Page[ActivityRow]:
+        filters = activity_filters.filters(CollectionFilter(field_name="travel_id", values=[travel_id]))
+        return conditional(request, await paginate_rows(activity_repo, ActivityRow, pagination, *filters, order_by=activity_filters.order_by))
+
+    @get("/{travel_id:int}/expenses", return_dto=None, cache=True)
+    async def list_travel_expenses(self, request: Request, expense_repo: ExpenseRepository, travel_id: int, pagination: Pagination, expense_filters: ListQuery) -> Page[ExpenseRow]:
+        filters = expense_filters.filters(CollectionFilter(field_name="travel_id", values=[travel_id]))
+        return conditional(request, await paginate_rows(expense_repo, ExpenseRow, pagination, *filters, order_by=expense_filters.order_by))
+
+    @get("/{travel_id:int}/expenses/summary", return_dto=None, cache=True)
+    async def get_travel_expense_summary(self, travel_repo: TravelRepository, expense_repo: ExpenseRepository, travel_id: int) -> ExpenseSummary:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        return await expense_summary(expense_repo.session, travel_id)
+
+    @get("/{travel_id:int}/settlement", return_dto=None, cache=True)
+    async def get_travel_settlement(self, travel_repo: TravelRepository, expense_repo: ExpenseRepository, travel_id: int) -> Settlement:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        return await settlement(expense_repo.session, travel_id)
+
+    @get("/{travel_id:int}/budget", return_dto=None, cache=True)
+    async def get_travel_budget(self, travel_repo: TravelRepository, travel_id: int) -> Budget:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        return await travel_budget(travel_repo.session, travel_id)
+
+    @get("/{travel_id:int}/conflicts", return_dto=None, cache=True)
+    async def get_travel_conflicts(
+        self,
+        travel_repo: TravelRepository,
+        travel_id: int,
+        limit: int = Parameter(query="limit", default=DEFAULT_LIMIT, ge=1, le=MAX_CONFLICTS),
+    ) -> TravelConflicts:
+        if not await travel_repo.exists(id=travel_id):
+            raise NotFoundException(detail=f"Viaje {travel_id} no encontrado")
+        return await travel_conflicts(travel_repo.session, travel_id, limit)
+
+    @post("/bulk", return_dto=None)
+    async def add_travels_bulk(self, travel_repo: TravelRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_create(travel_repo, data, TravelCreateDTO, bulk_chunk_size, response_cache)
+
+    @patch("/bulk", return_dto=None)
+    async def update_travels_bulk(self, travel_repo: TravelRepository, data: list[dict[str, Any]], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_update(travel_repo, data, TravelUpdateDTO, bulk_chunk_size, response_cache)
+
+    @delete("/bulk", return_dto=None, status_code=HTTP_200_OK)
+    async def delete_travels_bulk(self, travel_repo: TravelRepository, data: list[int], bulk_chunk_size: int, response_cache: CacheStore) -> BulkResult:
+        return await bulk_delete(travel_repo, data, bulk_chunk_size, response_cache)
+
+
+class SearchController(Controller):
+    path = "/search"
+    tags = ["search"]
+    cache_control = PRIVATE_REVALIDATE
+
+    @get()
+    async def search(
+        self,
+        db_session: DBSession,
+        search_settings: SearchSettings,
+        q: str = Parameter(min_length=1, max_length=200),
+        kind: Optional[list[SearchKind]] = Parameter(default=None),
+        limit: int = Parameter(default=20, ge=1, le=MAX_LIMIT),
+    ) -> SearchResults:
+        return await search(db_session, q, kind, limit, search_settings.budget_ms / 1000)
+
+
+class RouteController(Controller):
+    path = "/routes"
+    tags = ["routes"]
+    cache_control = PRIVATE_REVALIDATE
+
+    @get()
+    async def find_route(
+        self,
+        db_session: DBSession,
+        route_settings: RouteSettings,
+        origin: int = Parameter(query="from"),
+        destination: int = Parameter(query="to"),
+        optimize: Optimize = Parameter(default="price"),
+        depart_after: Optional[datetime] = Parameter(default=None),
+        arrive_before: Optional[datetime] = Parameter(default=None),
+        min_connection: int = Parameter(default=0, ge=0, le=24 * 60),
+    ) -> Route:
+        if origin == destination:
+            raise ValidationException(detail="El origen y el destino son la misma ciudad")
+        route = await find_route(
+            db_session, origin, destination, optimize, route_settings.max_age, depart_after, arrive_before, min_connection
+        )
+        if route is None:
+            raise NotFoundException(detail=f"No hay ruta de la ciudad {origin} a la ciudad {destination}")
+        return route
+
+
+class ImportController(Controller):
+    path = "/imports"
+    tags = ["imports"]
+
+    @post("/{resource:str}")
+    async def import_records(
+        self,
+        request: Request,
+        db_session: DBSession,
+        resource: ImportResource,
+        response_cache: CacheStore,
+        fmt: ImportFormat = Parameter(query="format", default="ndjson"),
+        job: Optional[str] = Parameter(query="job", default=None),
+        batch_size: int = Parameter(query="batch_size", default=DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    ) -> ImportReport:
+        # El cuerpo va a un archivo temporal a medida que llega: se lee dos veces (id del job e importación).
+        with tempfile.TemporaryFile() as upload:
+            async for chunk in request.stream():
+                upload.write(chunk)
+            upload.seek(0)
+            return await import_file(db_session, upload, resource, fmt, job, batch_size, response_cache)
+
+    @get("/{job:str}")
+    async def get_import(self, db_session: DBSession, job: str) -> ImportReport:
+        statement = select(ImportCheckpoint).where(ImportCheckpoint.job == job)
+        checkpoint = (await execute(db_session, statement)).scalar_one_or_none()
+        if checkpoint is None:
+            raise NotFoundException(detail=f"Importación {job} no encontrada")
+        return report_for(checkpoint)
+
+
+class CacheController(Controller):
+    path = "/cache"
+    tags = ["cache"]
+
+    @get("/stats")
+    async def get_cache_stats(self, response_cache: CacheStore) -> CacheStats:
+        return response_cache.snapshot()
@@ -1,9 +1,201 @@
-from litestar.contrib.sqlalchemy.plugins import SQLAlchemySyncConfig, SQLAlchemyPlugin
-from app.models import Base
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
-db_config = SQLAlchemySyncConfig(
-    connection_string="sqlite:///test.sqlite3",
-    metadata=Base.metadata,
-    create_all=True,
+from advanced_alchemy.extensions.litestar import (
+    AlembicAsyncConfig,
+    AlembicSyncConfig,
+    async_default_before_send_handler,
+    sync_default_before_send_handler,
+)
+from litestar.contrib.sqlalchemy.plugins import (
+    AsyncSessionConfig,
+    SQLAlchemyAsyncConfig,
+    SQLAlchemyPlugin,
+    SQLAlchemySyncConfig,
+    SyncSessionConfig,
 )
+from litestar.constants import HTTP_RESPONSE_START
+from litestar.status_codes import HTTP_400_BAD_REQUEST
+from litestar.types import Message, Scope
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.event import listen
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.models import Base
+from app.settings import DatabaseSettings
+
+settings = DatabaseSettings()
+DB_MODE = settings.mode
+
+
+def _apply_pragmas(pragmas: dict[str, str | int]) -> Any:
+    def on_connect(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return on_connect
+
+
+def make_engine(settings: DatabaseSettings) -> Any:
+    """Crea el engine del perfil: pragmas en cada conexión nueva y un pool acotado.
+
+    Con WAL los lectores no esperan al escritor y ``synchronous=NORMAL`` solo sincroniza a disco
+    en los checkpoints, no en cada commit. Las bases en memoria usan su propio pool de una conexión.
+    """
+    url = make_url(settings.database_url)
+    kwargs: dict[str, Any] = {}
+    if settings.profile == "production" and url.database not in (None, "", ":memory:"):
+        kwargs = {
+            "pool_size": settings.pool_size,
+            "max_overflow": settings.max_overflow,
+            "pool_timeout": settings.pool_timeout,
+        }
+    if settings.mode == "sync":
+        new_engine = create_engine(url, **kwargs)
+        listen(new_engine, "connect", _apply_pragmas(settings.pragmas))
+    else:
+        # aiosqlite usa NullPool por defecto en archivos: una conexión (y un hilo) nueva por sesión.
+        if kwargs:
+            kwargs["poolclass"] = AsyncAdaptedQueuePool
+        new_engine = create_async_engine(url, **kwargs)
+        listen(new_engine.sync_engine, "connect", _apply_pragmas(settings.pragmas))
+    return new_engine
+
+
+async def end_request_transaction(message: Message, scope: Scope) -> None:
+    """Hook ``before_send`` de la sesión de la request: lo que el handler no confirmó se deshace.
+
+    Los repositorios no confirman solos: cada handler de escritura es una única transacción que
+    termina con un ``commit`` explícito. Si falla antes, el rollback descarta todos sus pasos (y con
+    ``after_rollback`` los avisos pendientes de eventos y rutas) antes de cerrar la sesión. En las
+    respuestas exitosas solo se cierra: un rollback expiraría las instancias que todavía serializa
+    una respuesta en streaming.
+    """
+    if message["type"] == HTTP_RESPONSE_START and message["status"] >= HTTP_400_BAD_REQUEST:
+        # ``provide_session`` devuelve la sesión de la request (si no la usó, una nueva sin transacción).
+        session = db_config.provide_session(scope["app"].state, scope)
+        if session.in_transaction():
+            await rollback(session)
+    # El cierre es el de siempre del plugin.
+    if DB_MODE == "sync":
+        sync_default_before_send_handler(message, scope)
+    else:
+        await async_default_before_send_handler(message, scope)
+
+
+# Un único engine por proceso: lo comparten las sesiones, las migraciones y los listeners de eventos.
+engine = make_engine(settings)
+# Sin expirar en el commit: la respuesta se serializa con lo ya cargado, sin volver a consultar.
+if DB_MODE == "sync":
+    db_config = SQLAlchemySyncConfig(
+        engine_instance=engine,
+        metadata=Base.metadata,
+        alembic_config=AlembicSyncConfig(script_location="migrations", target_metadata=Base.metadata),
+        session_config=SyncSessionConfig(expire_on_commit=False),
+        before_send_handler=end_request_transaction,
+    )
+    DBSession = Session
+else:
+    db_config = SQLAlchemyAsyncConfig(
+        engine_instance=engine,
+        metadata=Base.metadata,
+        alembic_config=AlembicAsyncConfig(script_location="migrations", target_metadata=Base.metadata),
+        session_config=AsyncSessionConfig(expire_on_commit=False),
+        before_send_handler=end_request_transaction,
+    )
+    DBSession = AsyncSession
 db_plugin = SQLAlchemyPlugin(db_config)
+
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[Any]:
+    """Sesión propia, fuera del ciclo de la request (p. ej. para respuestas en streaming)."""
+    if DB_MODE == "sync":
+        with db_config.get_session() as session:
+            yield session
+    else:
+        async with db_config.get_session() as session:
+            yield session
+
+
+async def dispose_engine() -> None:
+    """Cierra las conexiones del pool; sin esto los hilos de aiosqlite no dejan terminar un comando de la CLI."""
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        engine.dispose()
+
+
+async def execute(session: Any, statement: Any, *args: Any, **kwargs: Any) -> Any:
+    if isinstance(session, AsyncSession):
+        return await session.execute(statement, *args, **kwargs)
+    return session.execute(statement, *args, **kwargs)
+
+
+async def commit(session: Any) -> None:
+    if isinstance(session, AsyncSession):
+        await session.commit()
+    else:
+        session.commit()
+
+
+async def rollback(session: Any) -> None:
+    if isinstance(session, AsyncSession):
+        await session.rollback()
+    else:
+        session.rollback()
+
+
+async def stream_scalars(session: Any, statement: Any) -> AsyncIterator[Any]:
+    """Itera los resultados con un cursor del lado del servidor, sin materializar la lista."""
+    statement = statement.execution_options(yield_per=500)
+    if isinstance(session, AsyncSession):
+        async for item in await session.stream_scalars(statement):
+            yield item
+    else:
+        for item in session.scalars(statement):
+            yield item
+
+
+async def stream_partitions(session: Any, statement: Any, size: int = 500) -> AsyncIterator[list[Any]]:
+    """Filas completas (no solo escalares) en bloques de ``size`` con un cursor del lado del servidor."""
+    statement = statement.execution_options(yield_per=size)
+    if isinstance(session, AsyncSession):
+        async for partition in (await session.stream(statement)).partitions():
+            yield partition
+    else:
+        for partition in session.execute(statement).partitions():
+            yield partition
+
+
+@asynccontextmanager
+async def time_budget(session: Any, seconds: float, steps: int = 1000) -> AsyncIterator[None]:
+    """Corta las consultas de la sesión que sigan corriendo pasados ``seconds`` (``OperationalError: interrupted``).
+
+    SQLite no tiene timeout por sentencia: un progress handler, llamado cada ``steps`` instrucciones de su
+    máquina virtual, interrumpe la consulta en curso cuando se vence el plazo.
+    """
+    deadline = time.perf_counter() + seconds
+
+    def expired() -> int:
+        return int(time.perf_counter() > deadline)
+
+    if isinstance(session, AsyncSession):
+        raw = (await (await session.connection()).get_raw_connection()).driver_connection
+        await raw.set_progress_handler(expired, steps)
+        try:
+            yield
+        finally:
+            await raw.set_progress_handler(None, steps)
+    else:
+        raw = session.connection().connection.driver_connection
+        raw.set_progress_handler(expired, steps)
+        try:
+            yield
+        finally:
+            raw.set_progress_handler(None, steps)
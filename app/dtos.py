@@ -1,26 +1,27 @@
 from advanced_alchemy.extensions.litestar import SQLAlchemyDTO, SQLAlchemyDTOConfig
 
 from app.models import User, Travel, Accommodation, Transport, Activity, Expense, City
+from app.structs import row_struct
 
 
 class UserReadDTO(SQLAlchemyDTO[User]):
     config = SQLAlchemyDTOConfig(exclude={"travels","expenses"})
 
 class UserCreateDTO(SQLAlchemyDTO[User]):
-    config = SQLAlchemyDTOConfig(exclude={"id","travels","expenses"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travels","expenses"})
 
 class UserUpdateDTO(SQLAlchemyDTO[User]):
-    config = SQLAlchemyDTOConfig(exclude={"id","travels","expenses"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travels","expenses"}, partial=True)
 
 
 class TravelReadDTO(SQLAlchemyDTO[Travel]):
     config = SQLAlchemyDTOConfig(exclude={"transports", "accommodations", "activities", "expenses"})
 
 class TravelCreateDTO(SQLAlchemyDTO[Travel]):
-    config = SQLAlchemyDTOConfig(exclude={"id","transports", "accommodations", "activities", "expenses", "users" })
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "transports", "accommodations", "activities", "expenses", "users" })
 
 class TravelUpdateDTO(SQLAlchemyDTO[Travel]):
-    config = SQLAlchemyDTOConfig(exclude={"id"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version"}, partial=True)
 
 
 class AccommodationReadDTO(SQLAlchemyDTO[Accommodation]):
@@ -31,20 +32,20 @@ class AccommodationReadFullDTO(SQLAlchemyDTO[Accommodation]):
     config = SQLAlchemyDTOConfig(exclude={"city_id"})
 
 class AccommodationCreateDTO(SQLAlchemyDTO[Accommodation]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "city"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "city"})
 
 class AccommodationUpdateDTO(SQLAlchemyDTO[Accommodation]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "city"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "city"}, partial=True)
 
 
 class TransportReadDTO(SQLAlchemyDTO[Transport]):
     config = SQLAlchemyDTOConfig(exclude={"travel", "start_city_id", "end_city_id"})
 
 class TransportCreateDTO(SQLAlchemyDTO[Transport]):
-    config = SQLAlchemyDTOConfig(exclude={"id","travel", "start_city", "end_city"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "start_city", "end_city"})
 
 class TransportUpdateDTO(SQLAlchemyDTO[Transport]):
-    config = SQLAlchemyDTOConfig(exclude={"id","travel", "start_city", "end_city"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "start_city", "end_city"}, partial=True)
 
 
 class ActivityReadDTO(SQLAlchemyDTO[Activity]):
@@ -54,27 +55,35 @@ class ActivityReadFullDTO(SQLAlchemyDTO[Activity]):
     pass
 
 class ActivityCreateDTO(SQLAlchemyDTO[Activity]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "city"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "city"})
 
 class ActivityUpdateDTO(SQLAlchemyDTO[Activity]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "city"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "city"}, partial=True)
 
 
 class ExpenseReadDTO(SQLAlchemyDTO[Expense]):
     config = SQLAlchemyDTOConfig(exclude={"travel", "user"})
 
 class ExpenseCreateDTO(SQLAlchemyDTO[Expense]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "user"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "user"})
 
 class ExpenseUpdateDTO(SQLAlchemyDTO[Expense]):
-    config = SQLAlchemyDTOConfig(exclude={"id", "travel", "user"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version", "travel", "user"}, partial=True)
 
 
 class CityReadDTO(SQLAlchemyDTO[City]):
     pass
 
 class CityCreateDTO(SQLAlchemyDTO[City]):
-    config = SQLAlchemyDTOConfig(exclude={"id"})
+    config = SQLAlchemyDTOConfig(exclude={"id", "version"})
 
 class CityUpdateDTO(SQLAlchemyDTO[City]):
-    config = SQLAlchemyDTOConfig(exclude={"id"}, partial=True)
+    config = SQLAlchemyDTOConfig(exclude={"id", "version"}, partial=True)
+
+
+# Filas de los DTOs de lectura sin relaciones, para los listados que leen columnas en vez de entidades.
+UserRow = row_struct(UserReadDTO)
+AccommodationRow = row_struct(AccommodationReadDTO)
+ActivityRow = row_struct(ActivityReadDTO)
+ExpenseRow = row_struct(ExpenseReadDTO)
+CityRow = row_struct(CityReadDTO)
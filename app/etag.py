@@ -0,0 +1,144 @@
+"""ETags fuertes a partir de la columna ``version`` de cada fila incluida en la respuesta.
+
+El ETag de una fila es ``"tabla-id-vN"``, más un digest de las filas relacionadas que vienen cargadas
+(p. ej. los usuarios de un viaje). El de una página es un digest de sus filas y su cursor. Así se
+calcula sin serializar el cuerpo, y un ``If-None-Match`` vigente responde 304 sin serializarlo.
+Los agregados (resumen, liquidación) y los streams no dependen de una versión de fila y no llevan ETag.
+"""
+import hashlib
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import msgspec
+from advanced_alchemy.exceptions import RepositoryError
+from litestar import Request, Response
+from litestar.datastructures import MutableScopeHeaders
+from litestar.exceptions import HTTPException
+from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_412_PRECONDITION_FAILED
+from litestar.types import Message, Scope
+from litestar.utils.scope.state import ScopeState
+from sqlalchemy import inspect
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.pagination import Page
+from app.repositories import reload
+
+T = TypeVar("T")
+
+
+def _row(instance: Any) -> str:
+    # Entidades y filas de ``row_struct`` tienen ``__tablename__``: el mismo ETag por cualquiera de los dos caminos.
+    return f"{instance.__tablename__}-{instance.id}-v{instance.version}"
+
+
+def _related(instance: Any) -> list[str]:
+    if isinstance(instance, msgspec.Struct):
+        return []
+    state = inspect(instance)
+    rows: list[str] = []
+    for relationship in state.mapper.relationships:
+        if relationship.key in state.unloaded:
+            continue
+        value = state.dict.get(relationship.key)
+        for related in value if relationship.uselist else [value]:
+            if related is not None:
+                rows.append(_row(related))
+    return rows
+
+
+def _digest(parts: list[str]) -> str:
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def etag(value: Any) -> str:
+    if isinstance(value, Page):
+        parts = [f"{value.limit}:{value.offset}:{value.next_cursor}:{value.total}"]
+        for item in value.items:
+            parts += [_row(item), *_related(item)]
+        return f'"page-{_digest(parts)}"'
+    related = _related(value)
+    return f'"{_row(value)}-{_digest(related)}"' if related else f'"{_row(value)}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def _none_match(header: str | None, tag: str) -> bool:
+    return header is not None and any(candidate in ("*", tag) for candidate in _tags(header))
+
+
+# ETag de la respuesta en curso: el handler lo calcula y ``add_etag_header`` lo copia a los headers,
+# dentro del ciclo de la ruta para que la caché de respuestas también lo guarde. Con ``If-None-Match``
+# vigente ``add_etag_header`` responde 304 en lugar de la respuesta del handler.
+_current: ContextVar[tuple[str, bool] | None] = ContextVar("etag", default=None)
+
+
+def conditional(request: Request, value: T) -> T:
+    """Marca la respuesta como 304 si el cliente ya tiene esta versión; el cuerpo no se llega a serializar."""
+    tag = etag(value)
+    _current.set((tag, _none_match(request.headers.get("if-none-match"), tag)))
+    return value
+
+
+async def add_etag_header(response: Response) -> Response:
+    if (current := _current.get()) is None:
+        return response
+    _current.set(None)
+    tag, not_modified = current
+    if not_modified:
+        # Los headers de la ruta (``Cache-Control``) se agregan igual: el cliente renueva su copia.
+        return Response(None, status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": tag})
+    response.headers["ETag"] = tag
+    return response
+
+
+def _require_match(header: str, instance: Any) -> None:
+    # Solo cuenta la versión de la fila que se modifica: que cambie un usuario del viaje
+    # no debe impedir editar el viaje.
+    row = _row(instance)
+    for candidate in _tags(header):
+        candidate = candidate.strip('"')
+        if candidate == "*" or candidate == row or candidate.startswith(f"{row}-"):
+            return
+    raise HTTPException(
+        status_code=HTTP_412_PRECONDITION_FAILED,
+        detail=f"{row} fue modificado; vuelva a leerlo antes de actualizar",
+    )
+
+
+async def update_if_match(request: Request, repo: Any, item_id: int, values: dict[str, Any]) -> Any:
+    """``get_and_update`` con bloqueo optimista: 412 si la fila no es la del ``If-Match`` del cliente.
+
+    Si otra escritura gana la carrera entre la lectura y el UPDATE, el ``WHERE version = ...``
+    no encuentra la fila y también termina en 412.
+    """
+    if (header := request.headers.get("if-match")) is not None:
+        _require_match(header, await repo.get(item_id))
+    try:
+        item, _ = await repo.get_and_update(id=item_id, **values, match_fields=["id"])
+    except RepositoryError as e:
+        if isinstance(e.__cause__, StaleDataError):
+            raise HTTPException(
+                status_code=HTTP_412_PRECONDITION_FAILED, detail=f"Elemento {item_id} modificado en paralelo"
+            ) from e
+        raise
+    item = await reload(repo, item)
+    _current.set((etag(item), False))
+    return item
+
+
+async def not_modified_from_cache(message: Message, scope: Scope) -> None:
+    """Hook ``before_send``: las respuestas servidas desde la caché también honran ``If-None-Match``."""
+    if not ScopeState.from_scope(scope).is_cached:
+        return
+    state = scope.setdefault("state", {})
+    if message["type"] == "http.response.start" and message["status"] == HTTP_200_OK:
+        headers = MutableScopeHeaders.from_message(message)
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if (tag := headers.get("etag")) and if_none_match and _none_match(if_none_match.decode(), tag):
+            message["status"] = HTTP_304_NOT_MODIFIED
+            del headers["content-length"]
+            state["not_modified"] = True
+    elif message["type"] == "http.response.body" and state.get("not_modified"):
+        message["body"] = b""
@@ -0,0 +1,399 @@
+"""Cambios de cada viaje en vivo: ``GET /travels/{id}/events`` con Server-Sent Events.
+
+Cada escritura de un viaje, de sus hijos o de sus miembros deja una fila en ``travel_events`` en la misma
+transacción:
+
+- las de la ORM (altas, cambios y bajas de los handlers) en el evento ``after_flush`` de la sesión;
+- las hechas por sentencia (bulk, miembros, importación) llamando a ``log_changes``/``log_events`` antes del
+  commit.
+
+Un solo lector por proceso (``EventFeed.run``) lee del log las filas nuevas y las reparte: enseguida tras cada
+commit de este proceso, y cada ``EVENTS_POLL_MS`` para ver las de otros workers y de la CLI. SQLite escribe de a
+una transacción, así que los ids se confirman en orden y leer ``id > último`` no saltea ninguno.
+
+Repartir cuesta poco por suscriptor: cada viaje con suscriptores tiene un canal con los últimos eventos ya
+codificados y un ``asyncio.Event`` que despierta a todos juntos; cada conexión solo guarda hasta qué id mandó.
+Quien se atrasa más que el buffer, o reanuda con ``Last-Event-ID``, lee lo que le falta del log; si eso ya se
+recortó (``EVENTS_RETENTION_H``) recibe un evento ``reset`` y debe volver a leer el viaje.
+"""
+import asyncio
+import logging
+import time as clock
+from collections import defaultdict, deque
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Iterable, Literal, Optional
+
+from litestar.serialization import encode_json
+from sqlalchemy import DateTime, delete, event, func, insert, inspect, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.database import commit, execute, open_session
+from app.models import Accommodation, Activity, Expense, Transport, Travel, TravelEvent
+from app.settings import EventSettings
+
+logger = logging.getLogger("app.events")
+
+Action = Literal["created", "updated", "deleted", "imported"]
+
+# Nombre de cada modelo en los eventos; los miembros (``users_travels``) son ``member``.
+ENTITIES: dict[type, str] = {
+    Travel: "travel",
+    Accommodation: "accommodation",
+    Transport: "transport",
+    Activity: "activity",
+    Expense: "expense",
+}
+MEMBER = "member"
+# Eventos recientes que guarda cada canal; más atrás se leen del log.
+BUFFER_SIZE = 256
+_CHUNK_SIZE = 500
+_PRUNE_EVERY_S = 3600
+# Clave en ``session.info``: la transacción escribió eventos y hay que despertar al lector al confirmarla.
+_WRITTEN = "travel_events_written"
+_COLUMNS = (
+    TravelEvent.id,
+    TravelEvent.travel_id,
+    TravelEvent.entity,
+    TravelEvent.entity_id,
+    TravelEvent.action,
+    TravelEvent.created_at,
+)
+# Consultas del lector, no de una request: ``QueryCounter`` no las cuenta.
+_BACKGROUND = {"background": True}
+_PING = b": ping\n\n"
+_RESET = b"event: reset\ndata: {}\n\n"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _frame(row: Any) -> bytes:
+    id, travel_id, entity, entity_id, action, created_at = row
+    data = encode_json(
+        {"id": id, "travel_id": travel_id, "entity": entity, "entity_id": entity_id, "action": action, "at": created_at}
+    )
+    return b"id: %d\ndata: %s\n\n" % (id, data)
+
+
+class _Channel:
+    __slots__ = ("frames", "floor", "changed", "subscribers")
+
+    def __init__(self, floor: int) -> None:
+        # ``frames`` tiene todos los eventos del viaje con id mayor que ``floor``.
+        self.frames: deque[tuple[int, bytes]] = deque(maxlen=BUFFER_SIZE)
+        self.floor = floor
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+
+    def publish(self, frames: list[tuple[int, bytes]]) -> None:
+        for frame in frames:
+            if len(self.frames) == BUFFER_SIZE:
+                self.floor = self.frames[0][0]
+            self.frames.append(frame)
+        self.wake()
+
+    def wake(self) -> None:
+        # Un ``Event`` por tanda: los que despiertan esperan al siguiente, sin carreras con ``clear``.
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    @property
+    def newest(self) -> int:
+        """Id del último evento que vio el canal: "desde ahora" para quien se conecta."""
+        return self.frames[-1][0] if self.frames else self.floor
+
+    def since(self, cursor: int) -> list[tuple[int, bytes]]:
+        pending = []
+        for frame in reversed(self.frames):
+            if frame[0] <= cursor:
+                break
+            pending.append(frame)
+        pending.reverse()
+        return pending
+
+
+class EventFeed:
+    def __init__(self) -> None:
+        self._channels: dict[int, _Channel] = {}
+        # Último id leído del log; ``None`` hasta que el lector lo busca al arrancar.
+        self._position: Optional[int] = None
+        self._settings = EventSettings()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+
+    @property
+    def subscribers(self) -> int:
+        return sum(channel.subscribers for channel in self._channels.values())
+
+    async def start(self, settings: EventSettings) -> None:
+        """Arranca el lector (hook ``on_startup``); no consulta la base, así no demora ni traba el arranque."""
+        self._settings = settings
+        self._closed = False
+        self._loop = asyncio.get_running_loop()
+        self._wake, self._ready = asyncio.Event(), asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Corta el lector y cierra los streams abiertos (hook ``on_shutdown``), si no el servidor los espera."""
+        self._closed = True
+        for channel in self._channels.values():
+            channel.wake()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._channels = {}
+        self._position = None
+        self._loop = self._wake = self._ready = None
+
+    def notify(self) -> None:
+        """Hay eventos nuevos confirmados por este proceso; se puede llamar desde cualquier hilo."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self) -> None:
+        assert self._wake is not None and self._ready is not None
+        poll = self._settings.poll_ms / 1000
+        last_beat, last_prune = clock.monotonic(), -float(_PRUNE_EVERY_S)
+        failing = False
+        while True:
+            try:
+                if self._position is None:
+                    # Desde acá se reparte lo que se confirme de ahora en más.
+                    self._position = await self._last_id()
+                    self._ready.set()
+                else:
+                    await self.poll()
+                now = clock.monotonic()
+                if now - last_beat >= self._settings.heartbeat_s:
+                    for channel in self._channels.values():
+                        channel.wake()
+                    last_beat = now
+                if now - last_prune >= _PRUNE_EVERY_S:
+                    await self.prune()
+                    last_prune = now
+                failing = False
+            except SQLAlchemyError:
+                # Una base ocupada, caída o sin migrar no corta el lector: se reintenta en el próximo ciclo,
+                # y se registra una vez por racha de errores.
+                if not failing:
+                    logger.exception("No se pudo leer travel_events")
+                failing = True
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), poll)
+            self._wake.clear()
+
+    async def _last_id(self) -> int:
+        async with open_session() as session:
+            statement = select(func.max(TravelEvent.id)).execution_options(**_BACKGROUND)
+            return (await execute(session, statement)).scalar() or 0
+
+    async def poll(self) -> None:
+        assert self._position is not None
+        async with open_session() as session:
+            while True:
+                statement = (
+                    select(*_COLUMNS)
+                    .where(TravelEvent.id > self._position)
+                    .order_by(TravelEvent.id)
+                    .limit(_CHUNK_SIZE)
+                    .execution_options(**_BACKGROUND)
+                )
+                rows = (await execute(session, statement)).tuples().all()
+                if rows:
+                    self._dispatch(rows)
+                if len(rows) < _CHUNK_SIZE:
+                    return
+
+    def _dispatch(self, rows: list[Any]) -> None:
+        # Solo se codifican los eventos de viajes con suscriptores, una vez para todos.
+        frames: dict[int, list[tuple[int, bytes]]] = defaultdict(list)
+        for row in rows:
+            if row[1] in self._channels:
+                frames[row[1]].append((row[0], _frame(row)))
+        self._position = rows[-1][0]
+        for travel_id, pending in frames.items():
+            self._channels[travel_id].publish(pending)
+
+    async def prune(self) -> None:
+        """Borra los eventos más viejos que ``EVENTS_RETENTION_H``; el último siempre queda (ver ``_expired``)."""
+        cutoff = _now() - timedelta(hours=self._settings.retention_h)
+        # Los ids crecen con el tiempo: el primero que se conserva marca hasta dónde borrar.
+        kept = select(TravelEvent.id).where(TravelEvent.created_at >= cutoff).order_by(TravelEvent.id).limit(1)
+        last = select(func.max(TravelEvent.id))
+        async with open_session() as session:
+            statement = (
+                delete(TravelEvent)
+                .where(TravelEvent.id < func.coalesce(kept.scalar_subquery(), last.scalar_subquery()))
+                .execution_options(**_BACKGROUND)
+            )
+            await execute(session, statement)
+            await commit(session)
+
+    async def _expired(self, last_id: int) -> bool:
+        """El cliente se perdió eventos que ya no están en el log, o trae un id que el log no conoce."""
+        async with open_session() as session:
+            oldest, newest = (await execute(session, select(func.min(TravelEvent.id), func.max(TravelEvent.id)))).one()
+        if newest is None:
+            return last_id > 0
+        return last_id < oldest - 1 or last_id > newest
+
+    async def _backfill(self, travel_id: int, cursor: int, until: int) -> list[Any]:
+        statement = (
+            select(*_COLUMNS)
+            .where(TravelEvent.travel_id == travel_id, TravelEvent.id > cursor, TravelEvent.id <= until)
+            .order_by(TravelEvent.id)
+            .limit(_CHUNK_SIZE)
+        )
+        async with open_session() as session:
+            return (await execute(session, statement)).tuples().all()
+
+    async def subscribe(self, travel_id: int, last_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream SSE de un viaje: lo posterior a ``last_id``, o desde ahora si no hay, y un latido cada tanto."""
+        assert self._ready is not None, "el lector no arrancó (``EventFeed.start``)"
+        await self._ready.wait()
+        assert self._position is not None
+        channel = self._channels.get(travel_id)
+        if channel is None:
+            channel = self._channels[travel_id] = _Channel(self._position)
+        channel.subscribers += 1
+        try:
+            # Sin ``last_id`` no se repite lo que el canal ya tenía en el buffer por otros suscriptores.
+            cursor = channel.newest if last_id is None else last_id
+            if last_id is not None and await self._expired(last_id):
+                # El cliente se resincroniza por REST: lo anterior a la reconexión ya lo tiene.
+                yield _RESET
+                cursor = channel.newest
+            while not self._closed:
+                changed = channel.changed
+                if cursor < channel.floor:
+                    until = channel.floor
+                    rows = await self._backfill(travel_id, cursor, until)
+                    if rows:
+                        yield b"".join(_frame(row) for row in rows)
+                    cursor = rows[-1][0] if len(rows) == _CHUNK_SIZE else until
+                    continue
+                # Sin eventos nuevos es el latido (o recién se conectó): un comentario, que el cliente ignora.
+                pending = channel.since(cursor)
+                if pending:
+                    yield b"".join(frame for _, frame in pending)
+                    cursor = pending[-1][0]
+                else:
+                    yield _PING
+                await changed.wait()
+        finally:
+            channel.subscribers -= 1
+            if not channel.subscribers and self._channels.get(travel_id) is channel:
+                del self._channels[travel_id]
+
+
+# Un lector por proceso, como el engine.
+travel_events = EventFeed()
+
+
+async def log_events(session: Any, rows: Iterable[dict[str, Any]]) -> None:
+    """Anota eventos (``travel_id``, ``entity``, ``entity_id``, ``action``) en la transacción en curso."""
+    now = _now()
+    rows = [{**row, "created_at": now} for row in rows]
+    if rows:
+        await execute(session, insert(TravelEvent), rows)
+        session.info[_WRITTEN] = True
+
+
+async def log_changes(session: Any, model: type, action: Action, ids: Iterable[int]) -> None:
+    """Eventos de filas escritas por sentencia (bulk); para las bajas, antes de borrarlas."""
+    if model not in ENTITIES:
+        return
+    travel_id = model.id if model is Travel else model.travel_id
+    columns = [TravelEvent.travel_id, TravelEvent.entity, TravelEvent.entity_id, TravelEvent.action, TravelEvent.created_at]
+    ids = list(ids)
+    for start in range(0, len(ids), _CHUNK_SIZE):
+        rows = (
+            select(travel_id, literal(ENTITIES[model]), model.id, literal(action), literal(_now(), DateTime()))
+            .where(model.id.in_(ids[start : start + _CHUNK_SIZE]))
+            .order_by(model.id)
+        )
+        await execute(session, insert(TravelEvent).from_select(columns, rows))
+    if ids:
+        session.info[_WRITTEN] = True
+
+
+async def log_moves(session: Any, model: type, values: list[dict[str, Any]]) -> None:
+    """Antes de un UPDATE por sentencia (bulk): avisa al viaje que deja cada hijo que cambia de viaje.
+
+    ``log_changes`` después del UPDATE solo ve el viaje nuevo; el ORM avisa a los dos (ver ``_track_flush``).
+    """
+    if model not in ENTITIES or model is Travel:
+        return
+    targets = {value["id"]: value["travel_id"] for value in values if value.get("travel_id") is not None}
+    ids = sorted(targets)
+    rows = []
+    for start in range(0, len(ids), _CHUNK_SIZE):
+        statement = select(model.id, model.travel_id).where(model.id.in_(ids[start : start + _CHUNK_SIZE])).order_by(model.id)
+        rows += [
+            {"travel_id": travel_id, "entity": ENTITIES[model], "entity_id": item_id, "action": "updated"}
+            for item_id, travel_id in (await execute(session, statement)).tuples()
+            if travel_id != targets[item_id]
+        ]
+    await log_events(session, rows)
+
+
+async def log_import(session: Any, model: type, rows: list[dict[str, Any]]) -> None:
+    """Un evento ``imported`` por viaje y lote: los INSERT de la importación no devuelven ids."""
+    if model in ENTITIES:
+        travel_ids = sorted({row["travel_id"] for row in rows if "travel_id" in row})
+        await log_events(
+            session,
+            [{"travel_id": travel_id, "entity": ENTITIES[model], "entity_id": None, "action": "imported"} for travel_id in travel_ids],
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _: UOWTransaction) -> None:
+    now = _now()
+    rows = []
+    new, deleted = set(session.new), set(session.deleted)
+    for instance in (*new, *session.dirty, *deleted):
+        entity = ENTITIES.get(type(instance))
+        if entity is None:
+            continue
+        if instance in new:
+            action = "created"
+        elif instance in deleted:
+            action = "deleted"
+        elif session.is_modified(instance, include_collections=False):
+            action = "updated"
+        else:
+            continue
+        # Del estado en memoria: una fila borrada ya no se puede recargar.
+        state = inspect(instance)
+        if isinstance(instance, Travel):
+            travel_ids = {state.dict["id"]}
+        else:
+            # Un hijo que cambia de viaje avisa a los dos.
+            travel_ids = {state.dict.get("travel_id"), *state.attrs.travel_id.history.deleted} - {None}
+        rows += [
+            {"travel_id": travel_id, "entity": entity, "entity_id": state.dict["id"], "action": action, "created_at": now}
+            for travel_id in sorted(travel_ids)
+        ]
+    if rows:
+        session.connection().execute(insert(TravelEvent), rows)
+        session.info[_WRITTEN] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    if session.info.pop(_WRITTEN, False):
+        travel_events.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_WRITTEN, None)
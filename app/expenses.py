@@ -0,0 +1,129 @@
+import heapq
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Date, func, select
+
+from app.database import execute
+from app.models import Expense, UsersTravels
+
+
+@dataclass
+class UserTotal:
+    user_id: int
+    total: float
+    count: int
+
+
+@dataclass
+class DayTotal:
+    day: date
+    total: float
+    count: int
+
+
+@dataclass
+class ExpenseSummary:
+    travel_id: int
+    total: float
+    count: int
+    per_user: list[UserTotal]
+    per_day: list[DayTotal]
+
+
+@dataclass
+class Transfer:
+    from_user_id: int
+    to_user_id: int
+    amount: float
+
+
+@dataclass
+class Settlement:
+    travel_id: int
+    total: float
+    share: float
+    balances: dict[int, float]
+    transfers: list[Transfer]
+
+
+async def _totals_per_user(session: Any, travel_id: int) -> list[UserTotal]:
+    statement = (
+        select(Expense.user_id, func.sum(Expense.amount), func.count(Expense.id))
+        .where(Expense.travel_id == travel_id)
+        .group_by(Expense.user_id)
+        .order_by(Expense.user_id)
+    )
+    rows = (await execute(session, statement)).all()
+    return [UserTotal(user_id=user_id, total=round(total, 2), count=count) for user_id, total, count in rows]
+
+
+async def expense_summary(session: Any, travel_id: int) -> ExpenseSummary:
+    per_user = await _totals_per_user(session, travel_id)
+    day = func.date(Expense.datetime, type_=Date)
+    statement = (
+        select(day, func.sum(Expense.amount), func.count(Expense.id))
+        .where(Expense.travel_id == travel_id)
+        .group_by(day)
+        .order_by(day)
+    )
+    rows = (await execute(session, statement)).all()
+    per_day = [DayTotal(day=value, total=round(total, 2), count=count) for value, total, count in rows]
+    # El total general sale de los grupos por usuario: no hace falta otra pasada sobre la tabla.
+    return ExpenseSummary(
+        travel_id=travel_id,
+        total=round(sum(item.total for item in per_user), 2),
+        count=sum(item.count for item in per_user),
+        per_user=per_user,
+        per_day=per_day,
+    )
+
+
+def minimal_transfers(balances: dict[int, int]) -> list[tuple[int, int, int]]:
+    """Salda los balances (en centavos) emparejando siempre al mayor deudor con el mayor acreedor.
+
+    Con dos heaps es O(n log n) y genera como máximo n - 1 transferencias.
+    """
+    creditors = [(-amount, user_id) for user_id, amount in balances.items() if amount > 0]
+    debtors = [(amount, user_id) for user_id, amount in balances.items() if amount < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+    transfers: list[tuple[int, int, int]] = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor, creditor, amount))
+        if (remaining := -credit - amount) > 0:
+            heapq.heappush(creditors, (-remaining, creditor))
+        if (remaining := -debt - amount) > 0:
+            heapq.heappush(debtors, (-remaining, debtor))
+    return transfers
+
+
+async def settlement(session: Any, travel_id: int) -> Settlement:
+    """Reparte los gastos en partes iguales entre los miembros del viaje (y quien haya pagado)."""
+    paid = {item.user_id: round(item.total * 100) for item in await _totals_per_user(session, travel_id)}
+    members = (await execute(session, select(UsersTravels.user_id).where(UsersTravels.travel_id == travel_id))).scalars()
+    participants = sorted(set(members) | set(paid))
+    total = sum(paid.values())
+    if not participants:
+        return Settlement(travel_id=travel_id, total=0.0, share=0.0, balances={}, transfers=[])
+
+    share, remainder = divmod(total, len(participants))
+    # Los centavos que no se reparten exacto se asignan a los primeros participantes.
+    balances = {
+        user_id: paid.get(user_id, 0) - share - (1 if index < remainder else 0)
+        for index, user_id in enumerate(participants)
+    }
+    return Settlement(
+        travel_id=travel_id,
+        total=total / 100,
+        share=round(total / len(participants) / 100, 2),
+        balances={user_id: amount / 100 for user_id, amount in balances.items()},
+        transfers=[
+            Transfer(from_user_id=debtor, to_user_id=creditor, amount=amount / 100)
+            for debtor, creditor, amount in minimal_transfers(balances)
+        ],
+    )
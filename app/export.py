@@ -0,0 +1,86 @@
+"""Exportación en streaming (NDJSON o CSV) de viajes y sus entidades, para la contabilidad nocturna.
+
+Las filas salen de un cursor del lado del servidor (``yield_per``) como tuplas de columnas, sin pasar por
+la ORM ni por el DTO, y se escriben por bloques; con ``Accept-Encoding: gzip`` cada bloque se comprime al
+vuelo. La memoria queda acotada por el tamaño del bloque, no por el de la tabla.
+"""
+import csv
+import io
+import zlib
+from datetime import date
+from typing import Any, AsyncIterator, Literal, Optional
+
+from litestar import Request
+from litestar.response import Stream
+from litestar.serialization import encode_json
+from sqlalchemy import select
+
+from app.database import open_session, stream_partitions
+from app.models import Accommodation, Activity, Expense, Transport, Travel, UsersTravels
+
+EXPORTABLE: dict[str, type] = {
+    "travels": Travel,
+    "accommodations": Accommodation,
+    "transports": Transport,
+    "activities": Activity,
+    "expenses": Expense,
+}
+ExportResource = Literal["travels", "accommodations", "transports", "activities", "expenses"]
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_CHUNK_ROWS = 500
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def export_statement(resource: str, user_id: Optional[int] = None) -> Any:
+    """Todas las filas de ``resource``; con ``user_id``, las de sus viajes (y los gastos que pagó)."""
+    model = EXPORTABLE[resource]
+    # ``version`` es del bloqueo optimista, no un dato del negocio.
+    statement = select(*(column for column in model.__table__.columns if column.key != "version"))
+    if user_id is not None:
+        if model is Expense:
+            statement = statement.where(Expense.user_id == user_id)
+        else:
+            travels = select(UsersTravels.travel_id).where(UsersTravels.user_id == user_id)
+            statement = statement.where((Travel.id if model is Travel else model.travel_id).in_(travels))
+    return statement.order_by(model.id)
+
+
+def _ndjson(rows: list[Any]) -> bytes:
+    return b"".join(encode_json(row._asdict()) + b"\n" for row in rows)
+
+
+def _csv(rows: list[Any]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(value.isoformat() if isinstance(value, date) else value for value in row)
+    return buffer.getvalue().encode()
+
+
+async def _export_rows(statement: Any, fmt: str) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(column.name for column in statement.selected_columns)
+        yield header.getvalue().encode()
+    encode = _csv if fmt == "csv" else _ndjson
+    async with open_session() as session:
+        async for rows in stream_partitions(session, statement, EXPORT_CHUNK_ROWS):
+            yield encode(rows)
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_response(request: Request, statement: Any, fmt: str, filename: str) -> Stream:
+    chunks = _export_rows(statement, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return Stream(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,193 @@
+"""Filtros y orden de los listados, limitados a columnas con índice.
+
+Cada recurso tiene un provider con sus parámetros de query: rango de fechas (``BeforeAfter``, exclusivo),
+igualdad contra claves foráneas (``CollectionFilter``, admite el parámetro repetido) y ``order_by``
+(``campo`` o ``-campo``). Todas esas columnas están en ``FILTERABLE`` y al importar se comprueba que
+encabecen un índice, así ningún filtro recorre la tabla entera. Los rangos de precio no tienen índice:
+solo se aceptan junto con otro filtro indexado o dentro de un viaje, que acotan las filas candidatas.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from advanced_alchemy.filters import BeforeAfter, CollectionFilter, OrderBy
+from litestar.exceptions import ValidationException
+from litestar.params import Parameter
+
+from app.models import Accommodation, Activity, City, Expense, Transport, Travel, User
+
+FILTERABLE: dict[type, tuple[str, ...]] = {
+    User: ("id", "email"),
+    Travel: ("id", "start_date"),
+    Accommodation: ("id", "start_date", "city_id"),
+    Transport: ("id", "start_datetime", "start_city_id", "end_city_id"),
+    Activity: ("id", "start_datetime", "city_id"),
+    Expense: ("id", "datetime", "user_id"),
+    City: ("id", "country"),
+}
+
+
+def _leading_columns(model: type) -> set[str]:
+    table = model.__table__
+    columns = {column.name for column in table.primary_key.columns}
+    columns |= {column.name for column in table.columns if column.unique}
+    columns |= {next(iter(index.columns)).name for index in table.indexes}
+    return columns
+
+
+for _model, _fields in FILTERABLE.items():
+    if _missing := set(_fields) - _leading_columns(_model):
+        raise RuntimeError(f"{_model.__name__}: {sorted(_missing)} no encabezan ningún índice")
+
+
+@dataclass
+class ListQuery:
+    order_by: OrderBy
+    indexed: list[Any] = field(default_factory=list)
+    # Predicados sobre columnas sin índice; necesitan otro filtro que acote la búsqueda.
+    residual: list[Any] = field(default_factory=list)
+
+    def filters(self, *scope: Any) -> list[Any]:
+        """Filtros para ``paginate``; ``scope`` son los filtros indexados que impone la ruta (p. ej. el viaje)."""
+        if self.residual and not (self.indexed or scope):
+            raise ValidationException(
+                detail="Los rangos de precio o monto requieren otro filtro (fechas, ciudad, usuario o viaje)"
+            )
+        return [*scope, *self.indexed, *self.residual]
+
+
+def _indexed(model: type, field_name: str) -> str:
+    if field_name not in FILTERABLE[model]:
+        raise ValueError(f"{model.__name__}.{field_name} no está en FILTERABLE")
+    return field_name
+
+
+def _order_by(model: type, value: Optional[str], fields: tuple[str, ...]) -> OrderBy:
+    field_name = (value or "id").removeprefix("-")
+    if field_name not in ("id", *fields):
+        allowed = ", ".join(f"{name}, -{name}" for name in ("id", *fields))
+        raise ValidationException(detail=f"order_by admite: {allowed}")
+    sort_order = "desc" if value and value.startswith("-") else "asc"
+    return OrderBy(field_name=_indexed(model, field_name), sort_order=sort_order)
+
+
+def _query(
+    model: type,
+    order_by: Optional[str],
+    dates: Optional[tuple[str, Any, Any]] = None,
+    collections: Optional[dict[str, Optional[List[Any]]]] = None,
+    ranges: Optional[dict[str, tuple[Optional[float], Optional[float]]]] = None,
+) -> ListQuery:
+    query = ListQuery(order_by=_order_by(model, order_by, (dates[0],) if dates else ()))
+    if dates is not None:
+        field_name, after, before = dates
+        if after is not None and before is not None and after >= before:
+            raise ValidationException(detail="after debe ser anterior a before")
+        if after is not None or before is not None:
+            query.indexed.append(BeforeAfter(field_name=_indexed(model, field_name), before=before, after=after))
+    for field_name, values in (collections or {}).items():
+        if values:
+            query.indexed.append(CollectionFilter(field_name=_indexed(model, field_name), values=values))
+    for field_name, (low, high) in (ranges or {}).items():
+        column = getattr(model, field_name)
+        if low is not None and high is not None and low > high:
+            raise ValidationException(detail=f"El mínimo de {field_name} supera al máximo")
+        if low is not None:
+            query.residual.append(column >= low)
+        if high is not None:
+            query.residual.append(column <= high)
+    return query
+
+
+ORDER_BY = Parameter(query="order_by", default=None, description="Campo de orden; con '-' delante, descendente")
+
+
+async def provide_user_filters(
+    email: Optional[List[str]] = Parameter(query="email", default=None),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(User, order_by, collections={"email": email})
+
+
+async def provide_travel_filters(
+    after: Optional[date] = Parameter(query="after", default=None),
+    before: Optional[date] = Parameter(query="before", default=None),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(Travel, order_by, dates=("start_date", after, before))
+
+
+async def provide_accommodation_filters(
+    after: Optional[date] = Parameter(query="after", default=None),
+    before: Optional[date] = Parameter(query="before", default=None),
+    city_id: Optional[List[int]] = Parameter(query="city_id", default=None),
+    min_price: Optional[float] = Parameter(query="min_price", default=None, ge=0),
+    max_price: Optional[float] = Parameter(query="max_price", default=None, ge=0),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(
+        Accommodation,
+        order_by,
+        dates=("start_date", after, before),
+        collections={"city_id": city_id},
+        ranges={"price": (min_price, max_price)},
+    )
+
+
+async def provide_transport_filters(
+    after: Optional[datetime] = Parameter(query="after", default=None),
+    before: Optional[datetime] = Parameter(query="before", default=None),
+    start_city_id: Optional[List[int]] = Parameter(query="start_city_id", default=None),
+    end_city_id: Optional[List[int]] = Parameter(query="end_city_id", default=None),
+    min_price: Optional[float] = Parameter(query="min_price", default=None, ge=0),
+    max_price: Optional[float] = Parameter(query="max_price", default=None, ge=0),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(
+        Transport,
+        order_by,
+        dates=("start_datetime", after, before),
+        collections={"start_city_id": start_city_id, "end_city_id": end_city_id},
+        ranges={"price": (min_price, max_price)},
+    )
+
+
+async def provide_activity_filters(
+    after: Optional[datetime] = Parameter(query="after", default=None),
+    before: Optional[datetime] = Parameter(query="before", default=None),
+    city_id: Optional[List[int]] = Parameter(query="city_id", default=None),
+    min_price: Optional[float] = Parameter(query="min_price", default=None, ge=0),
+    max_price: Optional[float] = Parameter(query="max_price", default=None, ge=0),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(
+        Activity,
+        order_by,
+        dates=("start_datetime", after, before),
+        collections={"city_id": city_id},
+        ranges={"price": (min_price, max_price)},
+    )
+
+
+async def provide_expense_filters(
+    after: Optional[datetime] = Parameter(query="after", default=None),
+    before: Optional[datetime] = Parameter(query="before", default=None),
+    user_id: Optional[List[int]] = Parameter(query="user_id", default=None),
+    min_amount: Optional[float] = Parameter(query="min_amount", default=None),
+    max_amount: Optional[float] = Parameter(query="max_amount", default=None),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(
+        Expense,
+        order_by,
+        dates=("datetime", after, before),
+        collections={"user_id": user_id},
+        ranges={"amount": (min_amount, max_amount)},
+    )
+
+
+async def provide_city_filters(
+    country: Optional[List[str]] = Parameter(query="country", default=None),
+    order_by: Optional[str] = ORDER_BY,
+) -> ListQuery:
+    return _query(City, order_by, collections={"country": country})
@@ -0,0 +1,20 @@
+"""Políticas de ``Cache-Control`` por controlador.
+
+Las ciudades casi no cambian y no son de nadie: cualquier caché puede guardarlas una hora. El resto son datos
+de los usuarios: solo el navegador los guarda y los revalida siempre con el ETag (un 304 es barato). Las
+escrituras nunca se guardan, tenga la política que tenga su controlador.
+"""
+from litestar.datastructures import CacheControlHeader, MutableScopeHeaders
+from litestar.types import Message, Scope
+
+PUBLIC_LONG = CacheControlHeader(public=True, max_age=3600)
+PRIVATE_REVALIDATE = CacheControlHeader(private=True, no_cache=True)
+NO_STORE = CacheControlHeader(no_store=True)
+
+_NO_STORE_HEADER = NO_STORE.to_header()
+
+
+async def no_store_writes(message: Message, scope: Scope) -> None:
+    """Hook ``before_send``: la política del controlador es para lecturas; las escrituras van con ``no-store``."""
+    if message["type"] == "http.response.start" and scope["method"] not in ("GET", "HEAD"):
+        MutableScopeHeaders.from_message(message)["Cache-Control"] = _NO_STORE_HEADER
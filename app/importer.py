@@ -0,0 +1,242 @@
+"""Importación masiva de archivos NDJSON/CSV (p. ej. de agencias asociadas) con reanudación.
+
+El archivo se lee registro a registro y cada bloque de ``batch_size`` filas válidas se inserta con un
+INSERT ``executemany``. El bloque se confirma en la misma transacción que su checkpoint
+(``import_checkpoints``), así que tras una caída se retoma en el primer registro no confirmado, sin
+duplicar ni perder filas. Las referencias (``city_id``, ``travel_id``, ``user_id``...) se validan contra
+una caché en memoria que solo consulta la base por los ids que todavía no vio. Las filas inválidas no
+detienen la importación: se cuentan y se informan con su número de registro.
+"""
+import csv
+import hashlib
+import io
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, Optional
+
+import msgspec
+from litestar.dto import AbstractDTO
+from litestar.exceptions import ValidationException
+from sqlalchemy import insert, select
+
+from app.budget import adjust_budget, totals
+from app.cache import CacheStore, invalidate
+from app.database import commit, execute
+from app.events import log_import
+from app.routing import mark_transports
+from app.dtos import (
+    AccommodationCreateDTO,
+    ActivityCreateDTO,
+    CityCreateDTO,
+    ExpenseCreateDTO,
+    TransportCreateDTO,
+    TravelCreateDTO,
+    UserCreateDTO,
+)
+from app.models import City, ImportCheckpoint, Travel, User
+from app.structs import dto_struct, struct_to_dict
+
+IMPORTABLE: dict[str, type[AbstractDTO]] = {
+    "cities": CityCreateDTO,
+    "users": UserCreateDTO,
+    "travels": TravelCreateDTO,
+    "accommodations": AccommodationCreateDTO,
+    "transports": TransportCreateDTO,
+    "activities": ActivityCreateDTO,
+    "expenses": ExpenseCreateDTO,
+}
+ImportResource = Literal["cities", "users", "travels", "accommodations", "transports", "activities", "expenses"]
+ImportFormat = Literal["ndjson", "csv"]
+
+# Columna de cada fila -> columna única a la que debe apuntar.
+REFERENCES: dict[str, Any] = {
+    "city_id": City.id,
+    "start_city_id": City.id,
+    "end_city_id": City.id,
+    "travel_id": Travel.id,
+    "user_id": User.id,
+}
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10_000
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class ImportReport:
+    job: str
+    resource: str
+    # Registros leídos y confirmados, contando los de ejecuciones anteriores del mismo job.
+    position: int
+    inserted: int
+    failed: int
+    completed: bool
+    resumed_from: int = 0
+    # Solo los de esta ejecución, como mucho ``MAX_REPORTED_ERRORS``.
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+
+def report_for(checkpoint: ImportCheckpoint) -> ImportReport:
+    return ImportReport(
+        job=checkpoint.job,
+        resource=checkpoint.resource,
+        position=checkpoint.position,
+        inserted=checkpoint.inserted,
+        failed=checkpoint.failed,
+        completed=checkpoint.completed,
+    )
+
+
+def file_digest(file: IO[bytes]) -> str:
+    """Id de job por defecto: el mismo archivo retoma su importación aunque se suba de nuevo."""
+    digest = hashlib.blake2b(digest_size=12)
+    for chunk in iter(lambda: file.read(1 << 16), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Any]:
+    """Registros en orden, sin cargar el archivo: dicts en CSV, líneas sin decodificar en NDJSON."""
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            # Las celdas vacías son nulos; ``None`` en una columna que no está en el encabezado, filas de más.
+            yield {key: value if value != "" else None for key, value in row.items()}
+    else:
+        for line in lines:
+            if line.strip():
+                yield line
+
+
+def _validate(record: Any, struct: type[msgspec.Struct]) -> dict[str, Any]:
+    if isinstance(record, str):
+        record = msgspec.json.decode(record)
+    return struct_to_dict(msgspec.convert(record, struct, strict=False))
+
+
+class ReferenceCache:
+    """Valores existentes por columna única; un SELECT ... IN por bloque con los que aún no se vieron."""
+
+    def __init__(self) -> None:
+        self._known: dict[Any, set[Any]] = defaultdict(set)
+        self._missing: dict[Any, set[Any]] = defaultdict(set)
+
+    async def load(self, session: Any, column: Any, values: set[Any]) -> None:
+        if unknown := values - self._known[column] - self._missing[column]:
+            found = set((await execute(session, select(column).where(column.in_(unknown)))).scalars())
+            self._known[column] |= found
+            self._missing[column] |= unknown - found
+
+    def exists(self, column: Any, value: Any) -> bool:
+        return value in self._known[column]
+
+    def add(self, column: Any, value: Any) -> None:
+        self._known[column].add(value)
+        self._missing[column].discard(value)
+
+
+async def _checkpoint(session: Any, job: str, resource: str) -> ImportCheckpoint:
+    found = (await execute(session, select(ImportCheckpoint).where(ImportCheckpoint.job == job))).scalar_one_or_none()
+    if found is None:
+        found = ImportCheckpoint(job=job, resource=resource, position=0, inserted=0, failed=0, completed=False)
+        session.add(found)
+    elif found.resource != resource:
+        raise ValidationException(detail=f"El job {job} importa {found.resource}, no {resource}")
+    return found
+
+
+async def run_import(
+    session: Any,
+    records: Iterable[Any],
+    resource: str,
+    job: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cache: Optional[CacheStore] = None,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    dto = IMPORTABLE[resource]
+    model = dto.model_type
+    struct = dto_struct(dto)
+    statement = insert(model)
+    checkpoint = await _checkpoint(session, job, resource)
+    report = report_for(checkpoint)
+    report.resumed_from = checkpoint.position
+    references = ReferenceCache()
+    batch: list[tuple[int, dict[str, Any]]] = []
+    failed: list[dict[str, Any]] = []
+
+    def fail(row: int, message: str) -> None:
+        failed.append({"row": row, "message": message})
+
+    async def flush(position: int) -> None:
+        # Primero las referencias, en bloque: una fila que apunta a algo inexistente es un error de fila.
+        for name, target in REFERENCES.items():
+            if values := {value[name] for _, value in batch if name in value}:
+                await references.load(session, target, values)
+        if model is User:
+            await references.load(session, User.email, {value["email"] for _, value in batch})
+        rows: list[dict[str, Any]] = []
+        for row, value in batch:
+            missing = [
+                name for name, target in REFERENCES.items() if name in value and not references.exists(target, value[name])
+            ]
+            if missing:
+                fail(row, "Referencias inexistentes: " + ", ".join(f"{name}={value[name]}" for name in missing))
+            elif model is User and references.exists(User.email, value["email"]):
+                fail(row, f"El email {value['email']} ya existe")
+            else:
+                rows.append(value)
+                if model is User:
+                    references.add(User.email, value["email"])
+        if rows:
+            await execute(session, statement, rows)
+            await adjust_budget(session, model, {}, totals(model, rows))
+            await log_import(session, model, rows)
+            # Los INSERT del lote no devuelven ids: el grafo de rutas se recarga entero.
+            mark_transports(session, model)
+        checkpoint.position = position
+        checkpoint.inserted += len(rows)
+        checkpoint.failed += len(failed)
+        await commit(session)
+        if cache is not None and rows:
+            await invalidate(cache, model, {row["travel_id"] for row in rows if "travel_id" in row})
+        report.position, report.inserted, report.failed = checkpoint.position, checkpoint.inserted, checkpoint.failed
+        report.errors.extend(failed[: MAX_REPORTED_ERRORS - len(report.errors)])
+        batch.clear()
+        failed.clear()
+        if on_progress is not None:
+            on_progress(report)
+
+    position = 0
+    for position, record in enumerate(records, start=1):
+        if position <= report.resumed_from:
+            continue
+        try:
+            batch.append((position, _validate(record, struct)))
+        except (msgspec.ValidationError, msgspec.DecodeError) as e:
+            fail(position, str(e))
+        if len(batch) + len(failed) >= batch_size:
+            await flush(position)
+    if not checkpoint.completed:
+        checkpoint.completed = True
+        await flush(max(position, checkpoint.position))
+    report.completed = True
+    return report
+
+
+async def import_file(
+    session: Any,
+    file: IO[bytes],
+    resource: str,
+    fmt: str,
+    job: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cache: Optional[CacheStore] = None,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    job = job or f"{resource}-{file_digest(file)}"
+    lines = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        return await run_import(session, read_records(lines, fmt), resource, job, batch_size, cache, on_progress)
+    finally:
+        lines.detach()
@@ -0,0 +1,103 @@
+import heapq
+from datetime import datetime, time
+from typing import Any, AsyncIterator
+
+from litestar.serialization import encode_json
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload
+
+from app.database import open_session, stream_scalars
+from app.models import Accommodation, Activity, Transport, Travel
+
+
+def _columns(instance: Any) -> dict[str, Any]:
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs}
+
+
+def _transport_entry(transport: Transport) -> dict[str, Any]:
+    return {
+        "kind": "transport",
+        "start": transport.start_datetime,
+        "end": transport.end_datetime,
+        **_columns(transport),
+        "start_city": _columns(transport.start_city),
+        "end_city": _columns(transport.end_city),
+    }
+
+
+def _accommodation_entry(accommodation: Accommodation) -> dict[str, Any]:
+    return {
+        "kind": "accommodation",
+        "start": datetime.combine(accommodation.start_date, time.min),
+        "end": datetime.combine(accommodation.end_date, time.min),
+        **_columns(accommodation),
+        "city": _columns(accommodation.city),
+    }
+
+
+def _activity_entry(activity: Activity) -> dict[str, Any]:
+    return {
+        "kind": "activity",
+        "start": activity.start_datetime,
+        "end": None,
+        **_columns(activity),
+        "city": _columns(activity.city),
+    }
+
+
+async def _entries(session: Any, statement: Any, to_entry: Any) -> AsyncIterator[dict[str, Any]]:
+    async for item in stream_scalars(session, statement):
+        yield to_entry(item)
+
+
+async def _merge_by_start(*streams: AsyncIterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """Mezcla k-vías de flujos ya ordenados por ``start``; solo retiene un elemento por flujo."""
+    heap: list[tuple[datetime, int, dict[str, Any]]] = []
+    for index, stream in enumerate(streams):
+        if (entry := await anext(stream, None)) is not None:
+            heapq.heappush(heap, (entry["start"], index, entry))
+    while heap:
+        _, index, entry = heapq.heappop(heap)
+        yield entry
+        if (entry := await anext(streams[index], None)) is not None:
+            heapq.heappush(heap, (entry["start"], index, entry))
+
+
+async def stream_itinerary(travel: Travel) -> AsyncIterator[bytes]:
+    """Genera el JSON del itinerario por partes: viaje, miembros y la línea de tiempo.
+
+    Son tres consultas (transportes, alojamientos y actividades), cada una ordenada por el
+    índice ``(travel_id, fecha de inicio)`` y con sus ciudades en el mismo SELECT.
+    """
+    header = {**_columns(travel), "users": [_columns(user) for user in travel.users]}
+    yield b'{"travel":' + encode_json(header) + b',"timeline":['
+
+    async with open_session() as session:
+        transports = (
+            select(Transport)
+            .where(Transport.travel_id == travel.id)
+            .order_by(Transport.start_datetime, Transport.id)
+            .options(joinedload(Transport.start_city), joinedload(Transport.end_city))
+        )
+        accommodations = (
+            select(Accommodation)
+            .where(Accommodation.travel_id == travel.id)
+            .order_by(Accommodation.start_date, Accommodation.id)
+            .options(joinedload(Accommodation.city))
+        )
+        activities = (
+            select(Activity)
+            .where(Activity.travel_id == travel.id)
+            .order_by(Activity.start_datetime, Activity.id)
+            .options(joinedload(Activity.city))
+        )
+        separator = b""
+        async for entry in _merge_by_start(
+            _entries(session, transports, _transport_entry),
+            _entries(session, accommodations, _accommodation_entry),
+            _entries(session, activities, _activity_entry),
+        ):
+            yield separator + encode_json(entry)
+            separator = b","
+
+    yield b"]}"
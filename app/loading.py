@@ -0,0 +1,58 @@
+from functools import cache
+from typing import Any, Optional
+
+from litestar import Request
+from litestar.dto import AbstractDTO
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+
+def _is_included(path: str, include: frozenset[str], exclude: frozenset[str]) -> bool:
+    if path in exclude:
+        return False
+    if not include:
+        return True
+    return any(name == path or name.startswith(f"{path}.") for name in include)
+
+
+def _relationship_options(
+    model: type, prefix: str, depth: int, include: frozenset[str], exclude: frozenset[str]
+) -> list[_AbstractLoad]:
+    options: list[_AbstractLoad] = []
+    if depth <= 0:
+        return options
+    for relationship in inspect(model).relationships:
+        path = f"{prefix}{relationship.key}"
+        if not _is_included(path, include, exclude):
+            continue
+        attribute = getattr(model, relationship.key)
+        # Las colecciones van en un SELECT ... IN aparte para no multiplicar filas con LIMIT;
+        # las many-to-one se resuelven en el mismo SELECT con un JOIN.
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        nested = _relationship_options(relationship.mapper.class_, f"{path}.", depth - 1, include, exclude)
+        options.append(loader.options(*nested) if nested else loader)
+    return options
+
+
+@cache
+def dto_load_options(dto: type[AbstractDTO]) -> tuple[_AbstractLoad, ...]:
+    """Opciones de carga para las relaciones que el DTO realmente serializa."""
+    config = dto.config
+    return tuple(
+        _relationship_options(
+            dto.model_type,
+            prefix="",
+            depth=config.max_nested_depth,
+            include=frozenset(config.include),
+            exclude=frozenset(config.exclude),
+        )
+    )
+
+
+def request_load_options(request: Request, model: type) -> Optional[list[Any]]:
+    """Opciones de carga derivadas del ``return_dto`` de la ruta, si serializa ``model``."""
+    dto = request.route_handler.resolve_return_dto()
+    if dto is None or dto.model_type is not model:
+        return None
+    return list(dto_load_options(dto)) or None
@@ -0,0 +1,38 @@
+"""Altas y bajas de miembros de un viaje directamente sobre ``users_travels``, sin cargar la colección.
+
+No confirman: el commit lo hace el handler, en la misma transacción que el resto de la request.
+"""
+from typing import Any, Iterable
+
+from litestar.exceptions import NotFoundException
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.database import execute
+from app.events import MEMBER, log_events
+from app.models import User, UsersTravels
+
+
+async def add_members(session: Any, travel_id: int, user_ids: Iterable[int]) -> None:
+    """Un solo ``INSERT ... ON CONFLICT DO NOTHING``: volver a agregar a un miembro no es un error."""
+    user_ids = set(user_ids)
+    found = set((await execute(session, select(User.id).where(User.id.in_(user_ids)))).scalars())
+    if missing := sorted(user_ids - found):
+        raise NotFoundException(detail="Usuarios no encontrados", extra={"ids": missing})
+    if user_ids:
+        rows = [{"travel_id": travel_id, "user_id": user_id} for user_id in sorted(user_ids)]
+        statement = insert(UsersTravels).values(rows).on_conflict_do_nothing().returning(UsersTravels.user_id)
+        # RETURNING solo trae las filas insertadas: un miembro que ya estaba no genera evento.
+        added = sorted((await execute(session, statement)).scalars())
+        await log_events(
+            session,
+            [{"travel_id": travel_id, "entity": MEMBER, "entity_id": user_id, "action": "created"} for user_id in added],
+        )
+
+
+async def remove_member(session: Any, travel_id: int, user_id: int) -> bool:
+    statement = delete(UsersTravels).where(UsersTravels.travel_id == travel_id, UsersTravels.user_id == user_id)
+    removed = (await execute(session, statement)).rowcount > 0
+    if removed:
+        await log_events(session, [{"travel_id": travel_id, "entity": MEMBER, "entity_id": user_id, "action": "deleted"}])
+    return removed
@@ -0,0 +1,209 @@
+"""Métricas por ruta en formato de texto de Prometheus y log de consultas lentas.
+
+``MetricsMiddleware`` mide cada request (latencia, bytes recibidos y enviados) y, con los eventos
+``before/after_cursor_execute`` del engine, cuántas consultas hizo y cuánto tiempo pasó en la base.
+Los valores viven en la memoria del proceso: con varios workers, cada uno expone los suyos.
+"""
+import logging
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from litestar import Controller, Response, get
+from litestar.enums import ScopeType
+from litestar.middleware import AbstractMiddleware
+from litestar.types import Message, Receive, Scope, Send
+from litestar.utils import join_paths
+from sqlalchemy import event
+
+logger = logging.getLogger("app.sql")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+MAX_LOGGED_PARAMETERS = 500
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # Por serie: conteo de cada bucket (no acumulado; se acumula al exportar), suma y total.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        with self._lock:
+            counts, totals = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0, 0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = (*self.label_names, "le")
+        for labels, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels(names, (*labels, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count:g}")
+        return lines
+
+
+ROUTE = ("method", "route")
+
+requests_total = Counter("http_requests_total", "Requests atendidas.", (*ROUTE, "status"))
+request_duration = Histogram(
+    "http_request_duration_seconds", "Latencia de la request, hasta el último byte.", ROUTE, LATENCY_BUCKETS
+)
+request_size = Histogram("http_request_size_bytes", "Bytes del cuerpo recibido.", ROUTE, SIZE_BUCKETS)
+response_size = Histogram("http_response_size_bytes", "Bytes del cuerpo enviado.", ROUTE, SIZE_BUCKETS)
+db_queries = Histogram("db_queries_per_request", "Consultas SQL por request.", ROUTE, QUERY_BUCKETS)
+db_time = Histogram("db_time_per_request_seconds", "Tiempo en la base de datos por request.", ROUTE, LATENCY_BUCKETS)
+db_query_duration = Histogram("db_query_duration_seconds", "Duración de cada consulta SQL.", (), LATENCY_BUCKETS)
+slow_queries = Counter("db_slow_queries_total", "Consultas por encima del umbral de consulta lenta.")
+
+REGISTRY = (requests_total, request_duration, request_size, response_size, db_queries, db_time, db_query_duration, slow_queries)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Contadores de la request en curso; los eventos del engine los ven porque corren en su mismo contexto.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _route(scope: Scope) -> str:
+    # La plantilla de la ruta, no el path concreto, para que la cantidad de series no crezca con los ids.
+    handler = scope.get("route_handler")
+    if handler is None:
+        return "<sin ruta>"
+    # ``paths`` es relativo al controlador: se antepone el path de cada capa (app, router).
+    prefixes = [layer.path for layer in handler.ownership_layers[:-1] if isinstance(getattr(layer, "path", None), str)]
+    return join_paths([*prefixes, min(handler.paths)])
+
+
+class MetricsMiddleware(AbstractMiddleware):
+    scopes = {ScopeType.HTTP}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stats = RequestStats()
+        token = _current.set(stats)
+        received = sent = 0
+        status = 500
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            labels = (scope["method"], _route(scope))
+            requests_total.inc((*labels, str(status)))
+            request_duration.observe(labels, elapsed)
+            request_size.observe(labels, received)
+            response_size.observe(labels, sent)
+            db_queries.observe(labels, stats.queries)
+            db_time.observe(labels, stats.db_seconds)
+
+
+# Engines ya instrumentados: ``create_app`` puede llamarse más de una vez en el mismo proceso.
+_instrumented: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def instrument_engine(engine: Any, slow_query_seconds: float) -> None:
+    """Mide cada consulta del engine y registra con sus parámetros las que superan ``slow_query_seconds``."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine in _instrumented:
+        return
+    _instrumented.add(sync_engine)
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration.observe((), elapsed)
+        if (stats := _current.get()) is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if elapsed >= slow_query_seconds:
+            slow_queries.inc()
+            shown = repr(parameters)
+            if len(shown) > MAX_LOGGED_PARAMETERS:
+                shown = shown[:MAX_LOGGED_PARAMETERS] + "…"
+            logger.warning("Consulta lenta (%.1f ms): %s | parámetros: %s", elapsed * 1000, statement, shown)
+
+    def handle_error(context: Any) -> None:
+        # Una consulta que falla no llega a ``after_cursor_execute``.
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
+
+
+class MetricsController(Controller):
+    path = "/metrics"
+    include_in_schema = False
+
+    @get()
+    async def get_metrics(self) -> Response[str]:
+        return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,13 +1,22 @@
 from typing import Optional, List
 from datetime import date, datetime
-from sqlalchemy import ForeignKey, Column, Integer, String, Float
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import DDL, ForeignKey, Column, Index, Integer, String, Float, event
+from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
     pass
 
-class User(Base):
+class Versioned:
+    """Versión por fila: SQLAlchemy la incrementa en cada UPDATE y la exige en el WHERE (bloqueo optimista)."""
+
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"version_id_col": cls.__table__.c.version}
+
+class User(Versioned, Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -19,13 +28,13 @@ class User(Base):
         secondary="users_travels", back_populates="users"
     )
 
-class Travel(Base):
+class Travel(Versioned, Base):
     __tablename__ = "travels"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]]
-    start_date: Mapped[date]
+    start_date: Mapped[date] = mapped_column(index=True)
     end_date: Mapped[date]
 
     accommodations: Mapped[List["Accommodation"]] = relationship(
@@ -38,80 +47,186 @@ class Travel(Base):
         secondary="users_travels", back_populates="travels"
     )
 
-class Accommodation(Base):
+class Accommodation(Versioned, Base):
     __tablename__ = "accommodations"
+    __table_args__ = (Index("ix_accommodations_travel_id_start_date", "travel_id", "start_date"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]]
     location: Mapped[str]
     price: Mapped[float]
-    start_date: Mapped[date]
+    start_date: Mapped[date] = mapped_column(index=True)
     end_date: Mapped[date]
     observations: Mapped[Optional[str]]
 
     travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"))
     travel: Mapped["Travel"] = relationship(back_populates="accommodations")
-    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
+    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), index=True)
     city: Mapped["City"] = relationship()
 
-class Transport(Base):
+class Transport(Versioned, Base):
     __tablename__ = "transports"
+    __table_args__ = (Index("ix_transports_travel_id_start_datetime", "travel_id", "start_datetime"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     type: Mapped[str]
     company: Mapped[str]
     price: Mapped[float]
-    start_datetime: Mapped[datetime]
+    start_datetime: Mapped[datetime] = mapped_column(index=True)
     start_location: Mapped[str]
     end_datetime: Mapped[datetime]
     end_location: Mapped[str]
 
     travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"))
     travel: Mapped["Travel"] = relationship(back_populates="transports")
-    start_city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
+    start_city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), index=True)
     start_city: Mapped["City"] = relationship(foreign_keys=[start_city_id])
-    end_city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
+    end_city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), index=True)
     end_city: Mapped["City"] = relationship(foreign_keys=[end_city_id])
 
-class Activity(Base):
+class Activity(Versioned, Base):
     __tablename__ = "activities"
+    __table_args__ = (Index("ix_activities_travel_id_start_datetime", "travel_id", "start_datetime"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]]
     location: Mapped[str]
-    start_datetime: Mapped[datetime]
+    start_datetime: Mapped[datetime] = mapped_column(index=True)
     price: Mapped[float]
     duration: Mapped[int]
 
     travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"))
     travel: Mapped["Travel"] = relationship(back_populates="activities")
-    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
+    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), index=True)
     city: Mapped["City"] = relationship()
 
-class Expense(Base):
+class Expense(Versioned, Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_travel_id_datetime", "travel_id", "datetime"),
+        # ``datetime`` es también el nombre de la columna: ``mapped_column(index=True)`` taparía el tipo.
+        Index("ix_expenses_datetime", "datetime"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     description: Mapped[str]
     amount: Mapped[float]
     datetime: Mapped[datetime]
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     user: Mapped["User"] = relationship(back_populates="expenses")
     travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"))
     travel: Mapped["Travel"] = relationship(back_populates="expenses")
 
-class City(Base):
+class City(Versioned, Base):
     __tablename__ = "cities"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str]
-    country: Mapped[str]
+    country: Mapped[str] = mapped_column(index=True)
 
 class UsersTravels(Base):
     __tablename__ = "users_travels"
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"), primary_key=True, index=True)
+
+class TravelBudget(Base):
+    """Totales de un viaje mantenidos en cada escritura (ver ``app.budget``); se pueden reconstruir."""
+
+    __tablename__ = "travel_budget"
+
     travel_id: Mapped[int] = mapped_column(ForeignKey("travels.id"), primary_key=True)
+    # Planificado: suma de ``price`` de cada categoría.
+    accommodations: Mapped[float] = mapped_column(default=0, server_default="0")
+    transports: Mapped[float] = mapped_column(default=0, server_default="0")
+    activities: Mapped[float] = mapped_column(default=0, server_default="0")
+    # Gastado: suma de ``amount`` de los gastos.
+    expenses: Mapped[float] = mapped_column(default=0, server_default="0")
+
+class TravelEvent(Base):
+    """Log de cambios de un viaje para ``GET /travels/{id}/events`` (ver ``app.events``); se recorta por antigüedad."""
+
+    __tablename__ = "travel_events"
+    # AUTOINCREMENT: los ids son los ``Last-Event-ID`` de los clientes y no se pueden reusar tras recortar.
+    __table_args__ = (Index("ix_travel_events_travel_id_id", "travel_id", "id"), {"sqlite_autoincrement": True})
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Sin clave foránea: el evento de la baja de un viaje sobrevive al viaje.
+    travel_id: Mapped[int]
+    entity: Mapped[str]
+    entity_id: Mapped[Optional[int]]
+    action: Mapped[str]
+    created_at: Mapped[datetime]
+
+class ImportCheckpoint(Base):
+    """Avance de una importación; se confirma en la misma transacción que cada bloque insertado."""
+
+    __tablename__ = "import_checkpoints"
+
+    job: Mapped[str] = mapped_column(String, primary_key=True)
+    resource: Mapped[str]
+    position: Mapped[int] = mapped_column(default=0)
+    inserted: Mapped[int] = mapped_column(default=0)
+    failed: Mapped[int] = mapped_column(default=0)
+    completed: Mapped[bool] = mapped_column(default=False)
+
+
+
+# Índice de búsqueda (ver ``app.search``): una tabla FTS5 con ciudades, actividades y alojamientos, con
+# ``rowid = id * 3 + tipo``. La mantienen triggers, así también la siguen los INSERT en bloque y las
+# importaciones. ``place`` incluye la ciudad de la fila: "actividades en Kioto" encuentra las de esa ciudad.
+SEARCH_KINDS = {"city": 0, "activity": 1, "accommodation": 2}
+
+# Valores de (rowid, kind, name, place, body) de una fila ``{r}`` cuya ciudad es ``{city}`` ("nombre país").
+_SEARCH_ROWS = {
+    "cities": "{r}.id * 3, 'city', {r}.name, {r}.country, ''",
+    "activities": "{r}.id * 3 + 1, 'activity', {r}.name, {r}.location || ' ' || {city}, coalesce({r}.description, '')",
+    "accommodations": (
+        "{r}.id * 3 + 2, 'accommodation', {r}.name, {r}.location || ' ' || {city}, "
+        "coalesce({r}.description, '') || ' ' || coalesce({r}.observations, '')"
+    ),
+}
+_SEARCH_COLUMNS = {
+    "cities": "name, country",
+    "activities": "name, description, location, city_id",
+    "accommodations": "name, description, location, observations, city_id",
+}
+
+
+def _search_triggers(table: str) -> list[str]:
+    old_rowid = _SEARCH_ROWS[table].split(", ")[0].format(r="old")
+    values = _SEARCH_ROWS[table].format(
+        r="new", city="coalesce((SELECT name || ' ' || country FROM cities WHERE id = new.city_id), '')"
+    )
+    insert = f"INSERT INTO search_index (rowid, kind, name, place, body) VALUES ({values});"
+    delete = f"DELETE FROM search_index WHERE rowid = {old_rowid};"
+    update = delete + " " + insert
+    if table == "cities":
+        # Renombrar una ciudad cambia el ``place`` de sus actividades y alojamientos.
+        for child in ("activities", "accommodations"):
+            child_values = _SEARCH_ROWS[child].format(r="c", city="new.name || ' ' || new.country")
+            child_rowid = _SEARCH_ROWS[child].split(", ")[0].format(r="c")
+            update += (
+                f" DELETE FROM search_index WHERE rowid IN (SELECT {child_rowid} FROM {child} c WHERE c.city_id = new.id);"
+                f" INSERT INTO search_index (rowid, kind, name, place, body)"
+                f" SELECT {child_values} FROM {child} c WHERE c.city_id = new.id;"
+            )
+    return [
+        f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF {_SEARCH_COLUMNS[table]} ON {table} BEGIN {update} END",
+        f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+    ]
+
+
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE search_index USING fts5("
+    "kind, name, place, body, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3')",
+    # Orden por relevancia: BM25 con más peso para el nombre que para el lugar o la descripción.
+    "INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(0.0, 10.0, 4.0, 1.0)')",
+    *(statement for table in _SEARCH_ROWS for statement in _search_triggers(table)),
+]
+for _statement in SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
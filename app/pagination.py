@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from advanced_alchemy.filters import LimitOffset, OrderBy, StatementFilter
+from litestar.exceptions import ValidationException
+from litestar.params import Parameter
+from sqlalchemy import select, tuple_
+
+from app.database import execute
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    limit: int
+    offset: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+@dataclass
+class Pagination:
+    limit: int
+    offset: Optional[int] = None
+    after_id: Optional[int] = None
+    # Orden con el que se emitió el cursor ("campo" o "-campo") y valor de ese campo en la última fila.
+    after_sort: str = "id"
+    after_key: Any = None
+    with_total: bool = False
+
+
+def _sort_token(order_by: OrderBy) -> str:
+    return ("-" if order_by.sort_order == "desc" else "") + order_by.field_name
+
+
+def encode_cursor(last_id: int, sort: str = "id", key: Any = None) -> str:
+    payload: dict[str, Any] = {"id": last_id}
+    if sort != "id":
+        payload.update(sort=sort, key=key.isoformat() if isinstance(key, (date, datetime)) else key)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return int(payload["id"]), str(payload.get("sort", "id")), payload.get("key")
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValidationException(detail="Cursor inválido") from e
+
+
+async def provide_pagination(
+    limit: int = Parameter(query="limit", default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    offset: Optional[int] = Parameter(query="offset", default=None, ge=0),
+    cursor: Optional[str] = Parameter(query="cursor", default=None),
+    with_total: bool = Parameter(query="total", default=False),
+) -> Pagination:
+    if offset is not None and cursor is not None:
+        raise ValidationException(detail="Use offset o cursor, no ambos")
+    if cursor is None:
+        return Pagination(limit=limit, offset=offset, with_total=with_total)
+    after_id, after_sort, after_key = decode_cursor(cursor)
+    return Pagination(
+        limit=limit, after_id=after_id, after_sort=after_sort, after_key=after_key, with_total=with_total
+    )
+
+
+def _after_cursor(model: Any, order_by: OrderBy, pagination: Pagination) -> Any:
+    if pagination.after_sort != _sort_token(order_by):
+        raise ValidationException(detail="El cursor se generó con otro order_by")
+    descending = order_by.sort_order == "desc"
+    if order_by.field_name == "id":
+        return model.id < pagination.after_id if descending else model.id > pagination.after_id
+    column = getattr(model, order_by.field_name)
+    key = pagination.after_key
+    try:
+        if column.type.python_type in (date, datetime):
+            key = column.type.python_type.fromisoformat(key)
+    except (TypeError, ValueError) as e:
+        raise ValidationException(detail="Cursor inválido") from e
+    # Comparación de tuplas (campo, id): el id desempata filas con el mismo valor del campo.
+    row = tuple_(column, model.id)
+    return row < (key, pagination.after_id) if descending else row > (key, pagination.after_id)
+
+
+def _page_filters(model: Any, pagination: Pagination, filters: tuple[Any, ...], order_by: OrderBy) -> list[Any]:
+    statement_filters: list[Any] = [*filters, order_by]
+    if order_by.field_name != "id":
+        statement_filters.append(OrderBy(field_name="id", sort_order=order_by.sort_order))
+    if pagination.offset is not None:
+        statement_filters.append(LimitOffset(limit=pagination.limit + 1, offset=pagination.offset))
+    else:
+        if pagination.after_id is not None:
+            statement_filters.append(_after_cursor(model, order_by, pagination))
+        statement_filters.append(LimitOffset(limit=pagination.limit + 1, offset=0))
+    return statement_filters
+
+
+async def _page(repo: Any, items: list[Any], pagination: Pagination, filters: tuple[Any, ...], order_by: OrderBy) -> Page[Any]:
+    next_cursor = None
+    if len(items) > pagination.limit:
+        items = items[: pagination.limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.id, _sort_token(order_by), getattr(last, order_by.field_name))
+
+    total = await repo.count(*filters) if pagination.with_total else None
+    return Page(
+        items=items,
+        limit=pagination.limit,
+        offset=pagination.offset,
+        next_cursor=next_cursor,
+        total=total,
+    )
+
+
+async def paginate(repo: Any, pagination: Pagination, *filters: Any, order_by: Optional[OrderBy] = None) -> Page[Any]:
+    """Pagina por keyset (``(orden, id) > cursor``) o, si se pide ``offset``, con ``LimitOffset``.
+
+    El orden por defecto es ``id``; cualquier otro campo se desempata por ``id`` en el mismo sentido
+    para que el cursor identifique una posición única. Se pide una fila extra para saber si hay
+    página siguiente sin un ``COUNT(*)``, que solo se ejecuta cuando el cliente lo solicita con
+    ``total=true``.
+    """
+    order_by = order_by or OrderBy(field_name="id", sort_order="asc")
+    items = list(await repo.list(*_page_filters(repo.model_type, pagination, filters, order_by)))
+    return await _page(repo, items, pagination, filters, order_by)
+
+
+async def paginate_rows(
+    repo: Any, row: type[Any], pagination: Pagination, *filters: Any, order_by: Optional[OrderBy] = None
+) -> Page[Any]:
+    """Como ``paginate``, pero lee solo las columnas de ``row`` (un ``row_struct``) y no arma entidades.
+
+    Sin identity map, carga de relaciones ni DTO: cada fila del SELECT se convierte en un ``row`` que
+    msgspec codifica directo. La página, el cursor y el ETag son los mismos que con ``paginate``.
+    """
+    model = repo.model_type
+    order_by = order_by or OrderBy(field_name="id", sort_order="asc")
+    statement = select(*(getattr(model, name) for name in row.__struct_fields__))
+    for statement_filter in _page_filters(model, pagination, filters, order_by):
+        if isinstance(statement_filter, StatementFilter):
+            statement = statement_filter.append_to_statement(statement, model)
+        else:
+            statement = statement.where(statement_filter)
+    items = [row(*values) for values in await execute(repo.session, statement)]
+    return await _page(repo, items, pagination, filters, order_by)
@@ -0,0 +1,39 @@
+from types import TracebackType
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Registra las sentencias SQL que emite un engine mientras el contexto está activo.
+
+    Pensado para pruebas: ``with QueryCounter(engine) as queries: ...`` y luego
+    ``assert queries.count == 2`` sin importar cuántas filas haya. No cuenta las sentencias con
+    ``execution_options(background=True)``, que no son de ninguna request (p. ej. el lector de ``app.events``).
+    """
+
+    def __init__(self, engine: Engine | AsyncEngine) -> None:
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if not context.execution_options.get("background"):
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
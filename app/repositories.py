@@ -1,53 +1,126 @@
-from advanced_alchemy.repository import SQLAlchemySyncRepository
-from sqlalchemy.orm import Session
+import inspect
+from functools import cache
+from typing import Any
 
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository, SQLAlchemySyncRepository
+from litestar import Request
+
+from app.database import DB_MODE, DBSession
+from app.loading import request_load_options
 from app.models import User, Travel, Accommodation, Transport, Activity, Expense, City
 
 
-class UserRepository(SQLAlchemySyncRepository[User]):
+class SyncRepositoryAdapter:
+    """Expone un repositorio sync con la misma interfaz awaitable que los repositorios async."""
+
+    def __init__(self, repository: SQLAlchemySyncRepository[Any]) -> None:
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repository, name)
+        if not inspect.ismethod(attr):
+            return attr
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return attr(*args, **kwargs)
+
+        return call
+
+
+@cache
+def _adapter_type(interface: type) -> type[SyncRepositoryAdapter]:
+    # Litestar valida la dependencia con isinstance(): el adaptador se registra como subclase virtual
+    # del repositorio async que declara el handler.
+    adapter = type(f"{interface.__name__}SyncAdapter", (SyncRepositoryAdapter,), {})
+    interface.register(adapter)
+    return adapter
+
+
+async def reload(repo: Any, instance: Any) -> Any:
+    """Vuelve a leer una fila recién escrita con las opciones de carga del repositorio (``load=``).
+
+    ``populate_existing`` pisa la instancia del identity map, así las relaciones que serializa el DTO
+    quedan cargadas tras ``add``/``get_and_update``, que se llaman sin ``auto_refresh``.
+    """
+    return await repo.get(instance.id, execution_options={"populate_existing": True})
+
+
+def _build_repo(async_repo: type, sync_repo: type, db_session: DBSession, request: Request, **kwargs: Any) -> Any:
+    # Sin auto_commit: los repositorios de una request comparten la sesión y el handler confirma una
+    # sola vez al final (ver ``end_request_transaction``). Sin auto_refresh: el ``refresh`` de la
+    # sesión no aplica ``load``; las escrituras se releen con ``reload``.
+    kwargs.setdefault("load", request_load_options(request, async_repo.model_type))
+    kwargs.update(auto_commit=False, auto_refresh=False)
+    if DB_MODE != "sync":
+        return async_repo(session=db_session, **kwargs)
+    return _adapter_type(async_repo)(sync_repo(session=db_session, **kwargs))
+
+
+class UserRepository(SQLAlchemyAsyncRepository[User]):
     model_type = User
 
-async def provide_user_repo(db_session: Session) -> UserRepository:
-    return UserRepository(session=db_session, auto_commit=True)
+class UserSyncRepository(SQLAlchemySyncRepository[User]):
+    model_type = User
+
+async def provide_user_repo(db_session: DBSession, request: Request) -> UserRepository:
+    return _build_repo(UserRepository, UserSyncRepository, db_session, request)
 
 
-class TravelRepository(SQLAlchemySyncRepository[Travel]):
+class TravelRepository(SQLAlchemyAsyncRepository[Travel]):
+    model_type = Travel
+
+class TravelSyncRepository(SQLAlchemySyncRepository[Travel]):
     model_type = Travel
 
-async def provide_travel_repo(db_session: Session) -> TravelRepository:
-    return TravelRepository(session=db_session, auto_commit=True)
+async def provide_travel_repo(db_session: DBSession, request: Request) -> TravelRepository:
+    return _build_repo(TravelRepository, TravelSyncRepository, db_session, request)
 
 
-class AccommodationRepository(SQLAlchemySyncRepository[Accommodation]):
+class AccommodationRepository(SQLAlchemyAsyncRepository[Accommodation]):
     model_type = Accommodation
 
-async def provide_accommodation_repo(db_session: Session) -> AccommodationRepository:
-    return AccommodationRepository(session=db_session, auto_commit=True)
+class AccommodationSyncRepository(SQLAlchemySyncRepository[Accommodation]):
+    model_type = Accommodation
+
+async def provide_accommodation_repo(db_session: DBSession, request: Request) -> AccommodationRepository:
+    return _build_repo(AccommodationRepository, AccommodationSyncRepository, db_session, request)
+
 
+class TransportRepository(SQLAlchemyAsyncRepository[Transport]):
+    model_type = Transport
 
-class TransportRepository(SQLAlchemySyncRepository[Transport]):
+class TransportSyncRepository(SQLAlchemySyncRepository[Transport]):
     model_type = Transport
 
-async def provide_transport_repo(db_session: Session) -> TransportRepository:
-    return TransportRepository(session=db_session, auto_commit=True)
+async def provide_transport_repo(db_session: DBSession, request: Request) -> TransportRepository:
+    return _build_repo(TransportRepository, TransportSyncRepository, db_session, request)
+
 
+class ActivityRepository(SQLAlchemyAsyncRepository[Activity]):
+    model_type = Activity
 
-class ActivityRepository(SQLAlchemySyncRepository[Activity]):
+class ActivitySyncRepository(SQLAlchemySyncRepository[Activity]):
     model_type = Activity
 
-async def provide_activity_repo(db_session: Session) -> ActivityRepository:
-    return ActivityRepository(session=db_session, auto_commit=True)
+async def provide_activity_repo(db_session: DBSession, request: Request) -> ActivityRepository:
+    return _build_repo(ActivityRepository, ActivitySyncRepository, db_session, request)
 
 
-class ExpenseRepository(SQLAlchemySyncRepository[Expense]):
+class ExpenseRepository(SQLAlchemyAsyncRepository[Expense]):
     model_type = Expense
 
-async def provide_expense_repo(db_session: Session) -> ExpenseRepository:
-    return ExpenseRepository(session=db_session, auto_commit=True)
+class ExpenseSyncRepository(SQLAlchemySyncRepository[Expense]):
+    model_type = Expense
 
+async def provide_expense_repo(db_session: DBSession, request: Request) -> ExpenseRepository:
+    return _build_repo(ExpenseRepository, ExpenseSyncRepository, db_session, request)
+
+
+class CityRepository(SQLAlchemyAsyncRepository[City]):
+    model_type = City
 
-class CityRepository(SQLAlchemySyncRepository[City]):
+class CitySyncRepository(SQLAlchemySyncRepository[City]):
     model_type = City
 
-async def provide_city_repo(db_session: Session) -> CityRepository:
-    return CityRepository(session=db_session, auto_commit=True)
+async def provide_city_repo(db_session: DBSession, request: Request) -> CityRepository:
+    return _build_repo(CityRepository, CitySyncRepository, db_session, request)
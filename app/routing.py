@@ -0,0 +1,359 @@
+"""Planificador de rutas entre ciudades sobre los tramos de ``transports``.
+
+Cada transporte es un tramo ``start_city_id -> end_city_id`` con horario y precio. El grafo vive en memoria
+del proceso (``route_graph``) y no se consulta la base en cada request:
+
+- se carga entero la primera vez y de nuevo cada ``ROUTES_MAX_AGE_S`` segundos, que es lo que tardan en verse
+  las escrituras de otros workers o hechas por fuera de la app;
+- las escrituras de este proceso lo actualizan de a una fila: al confirmar la transacción se releen solo los
+  transportes que cambiaron (los de la ORM se registran solos en el flush; las escrituras por sentencia llaman
+  a ``mark_transports``).
+
+La búsqueda es A* sobre tramos (no sobre ciudades): un tramo solo sigue a otro si sale después de que el
+anterior llega (más ``min_connection``), y tiene que entrar en la ventana ``depart_after``/``arrive_before``.
+La cota de lo que falta sale de un Dijkstra inverso desde el destino sobre el tramo más barato (o más corto)
+de cada par de ciudades, sin horarios. Se guarda por destino y se corrige con cada cambio del grafo, así que
+solo la primera consulta a un destino después de cada carga completa la paga.
+"""
+import time as clock
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from heapq import heappop, heappush
+from itertools import count
+from math import inf
+from typing import Any, Iterable, Literal, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.database import execute
+from app.models import Transport
+
+Optimize = Literal["price", "time"]
+
+# Cotas por destino que se guardan entre cambios del grafo.
+MAX_BOUNDS = 256
+_CHUNK_SIZE = 500
+_EPOCH = datetime(1970, 1, 1)
+# Clave en ``session.info``: ids de transportes escritos en la transacción, o ``None`` para recargar todo.
+_CHANGED = "transports_changed"
+
+
+@dataclass(frozen=True)
+class Leg:
+    transport_id: int
+    start_city_id: int
+    end_city_id: int
+    start_datetime: datetime
+    end_datetime: datetime
+    price: float
+    # Segundos desde 1970 para comparar y sumar sin armar ``timedelta`` en el bucle de la búsqueda.
+    departs: float
+    arrives: float
+
+
+@dataclass
+class RouteLeg:
+    transport_id: int
+    start_city_id: int
+    end_city_id: int
+    start_datetime: datetime
+    end_datetime: datetime
+    price: float
+
+
+@dataclass
+class Route:
+    origin: int
+    destination: int
+    optimize: Optimize
+    price: float
+    departure: datetime
+    arrival: datetime
+    legs: list[RouteLeg]
+
+
+def _seconds(moment: datetime) -> float:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - _EPOCH).total_seconds()
+
+
+_COLUMNS = (
+    Transport.id,
+    Transport.start_city_id,
+    Transport.end_city_id,
+    Transport.start_datetime,
+    Transport.end_datetime,
+    Transport.price,
+)
+
+
+def _leg(id: int, start_city_id: int, end_city_id: int, start: datetime, end: datetime, price: float) -> Leg:
+    return Leg(id, start_city_id, end_city_id, start, end, price, _seconds(start), _seconds(end))
+
+
+class RouteGraph:
+    def __init__(self) -> None:
+        self._legs: dict[int, Leg] = {}
+        # Por ciudad de origen, ``(salida, id)`` ordenados: los tramos que salen después de X son un sufijo.
+        self._departures: dict[int, list[tuple[float, int]]] = defaultdict(list)
+        # Por par de ciudades, sus tramos; por objetivo y ciudad de llegada, el menor precio (o la menor duración)
+        # desde cada ciudad de salida. Es el grafo sin horarios sobre el que se calculan las cotas.
+        self._pairs: dict[tuple[int, int], dict[int, Leg]] = defaultdict(dict)
+        self._incoming: dict[Optimize, dict[int, dict[int, float]]] = {"price": defaultdict(dict), "time": defaultdict(dict)}
+        self._bounds: dict[tuple[Optimize, int], dict[int, float]] = {}
+        self._loaded_at: Optional[float] = None
+        self._pending: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._legs)
+
+    def touch(self, ids: Optional[Iterable[int]]) -> None:
+        """Marca transportes a releer en la próxima consulta; ``None`` fuerza a recargar todo."""
+        if ids is None:
+            self._loaded_at = None
+        else:
+            self._pending.update(ids)
+
+    async def refresh(self, session: Any, max_age: float) -> None:
+        now = clock.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= max_age:
+            # Lo que se marque mientras se lee queda pendiente y se relee después: aplicarlo dos veces no cambia nada.
+            self._pending.clear()
+            self._load((await execute(session, select(*_COLUMNS))).tuples())
+            self._loaded_at = now
+        elif self._pending:
+            ids, self._pending = sorted(self._pending), set()
+            try:
+                rows = []
+                for start in range(0, len(ids), _CHUNK_SIZE):
+                    statement = select(*_COLUMNS).where(Transport.id.in_(ids[start : start + _CHUNK_SIZE]))
+                    rows += (await execute(session, statement)).tuples()
+            except Exception:
+                self._pending.update(ids)
+                raise
+            self._apply(ids, rows)
+
+    def _load(self, rows: Iterable[tuple[Any, ...]]) -> None:
+        self._legs, self._departures, self._pairs = {}, defaultdict(list), defaultdict(dict)
+        self._incoming = {"price": defaultdict(dict), "time": defaultdict(dict)}
+        self._bounds = {}
+        for row in rows:
+            leg = _leg(*row)
+            if leg.arrives < leg.departs:
+                continue
+            self._legs[leg.transport_id] = leg
+            self._departures[leg.start_city_id].append((leg.departs, leg.transport_id))
+            self._pairs[(leg.start_city_id, leg.end_city_id)][leg.transport_id] = leg
+        for departures in self._departures.values():
+            departures.sort()
+        self._update_pairs(list(self._pairs))
+
+    def _apply(self, ids: Iterable[int], rows: Iterable[tuple[Any, ...]]) -> None:
+        touched: set[tuple[int, int]] = set()
+        for transport_id in ids:
+            if (leg := self._legs.pop(transport_id, None)) is not None:
+                departures = self._departures[leg.start_city_id]
+                del departures[bisect_left(departures, (leg.departs, leg.transport_id))]
+                pair = (leg.start_city_id, leg.end_city_id)
+                del self._pairs[pair][transport_id]
+                touched.add(pair)
+        for row in rows:
+            leg = _leg(*row)
+            if leg.arrives < leg.departs:
+                continue
+            self._legs[leg.transport_id] = leg
+            insort(self._departures[leg.start_city_id], (leg.departs, leg.transport_id))
+            pair = (leg.start_city_id, leg.end_city_id)
+            self._pairs[pair][leg.transport_id] = leg
+            touched.add(pair)
+        self._update_pairs(touched)
+
+    def _update_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        # Las cotas guardadas se corrigen en vez de descartarse. Si un par se encarece o desaparece siguen siendo
+        # válidas (quedan por debajo de lo real, solo podan menos); si se abarata o aparece, se propaga la baja.
+        lowered: dict[Optimize, list[tuple[int, int, float]]] = {"price": [], "time": []}
+        for pair in pairs:
+            origin, city = pair
+            legs = self._pairs.get(pair)
+            if not legs:
+                self._pairs.pop(pair, None)
+                for incoming in self._incoming.values():
+                    incoming[city].pop(origin, None)
+                continue
+            weights = {
+                "price": min(leg.price for leg in legs.values()),
+                "time": min(leg.arrives - leg.departs for leg in legs.values()),
+            }
+            for optimize, weight in weights.items():
+                previous = self._incoming[optimize][city].get(origin, inf)
+                self._incoming[optimize][city][origin] = weight
+                if weight < previous:
+                    lowered[optimize].append((origin, city, weight))
+        for (optimize, _), bounds in self._bounds.items():
+            heap = []
+            for origin, city, weight in lowered[optimize]:
+                if city in bounds and bounds[city] + weight < bounds.get(origin, inf):
+                    bounds[origin] = bounds[city] + weight
+                    heappush(heap, (bounds[origin], origin))
+            self._propagate(optimize, bounds, heap)
+
+    def _propagate(self, optimize: Optimize, bounds: dict[int, float], heap: list[tuple[float, int]]) -> None:
+        """Dijkstra inverso sobre el grafo sin horarios desde las ciudades de ``heap``."""
+        incoming = self._incoming[optimize]
+        while heap:
+            cost, city = heappop(heap)
+            if cost > bounds[city]:
+                continue
+            for origin, weight in incoming.get(city, {}).items():
+                candidate = cost + weight
+                if candidate < bounds.get(origin, inf):
+                    bounds[origin] = candidate
+                    heappush(heap, (candidate, origin))
+
+    def _lower_bounds(self, destination: int, optimize: Optimize) -> dict[int, float]:
+        """Lo mínimo que falta desde cada ciudad hasta ``destination``, ignorando horarios; sin la ciudad, no llega."""
+        if (bounds := self._bounds.get((optimize, destination))) is not None:
+            return bounds
+        bounds = {destination: 0.0}
+        self._propagate(optimize, bounds, [(0.0, destination)])
+        if len(self._bounds) >= MAX_BOUNDS:
+            self._bounds.clear()
+        self._bounds[(optimize, destination)] = bounds
+        return bounds
+
+    def plan(
+        self,
+        origin: int,
+        destination: int,
+        optimize: Optimize = "price",
+        depart_after: Optional[datetime] = None,
+        arrive_before: Optional[datetime] = None,
+        min_connection: int = 0,
+    ) -> Optional[list[Leg]]:
+        """Tramos de la mejor ruta (el menor precio o la llegada más temprana), o ``None`` si no hay ninguna."""
+        bounds = self._lower_bounds(destination, optimize)
+        if origin not in bounds:
+            return None
+        latest = _seconds(arrive_before) if arrive_before is not None else inf
+        connection = min_connection * 60
+        best: dict[int, float] = {}
+        previous: dict[int, Optional[int]] = {}
+        # Por ciudad, la hora desde la que ya se expandieron sus salidas. Como se expande en orden de costo, una
+        # llegada posterior a la misma ciudad solo encontraría esos mismos tramos, más caros: se salta.
+        expanded: dict[int, float] = {}
+        # ``(f, desempate, costo, tramo o tramo padre, cursor)``; ver ``expand``.
+        heap: list[tuple[float, int, float, Optional[int], Optional[tuple[list[tuple[float, int]], int, int]]]] = []
+        tiebreak = count()
+
+        def relax(leg: Leg, cost: float, parent: Optional[int]) -> None:
+            bound = bounds.get(leg.end_city_id)
+            if bound is None or leg.arrives > latest:
+                return
+            total = cost + leg.price if optimize == "price" else leg.arrives
+            if total < best.get(leg.transport_id, inf):
+                best[leg.transport_id] = total
+                previous[leg.transport_id] = parent
+                heappush(heap, (total + bound, next(tiebreak), total, leg.transport_id, None))
+
+        def expand(city: int, ready: float, cost: float, parent: Optional[int]) -> None:
+            until = expanded.get(city, inf)
+            if ready >= until:
+                return
+            expanded[city] = ready
+            departures = self._departures.get(city, [])
+            start = bisect_left(departures, (ready,))
+            end = bisect_left(departures, (until,)) if until < inf else len(departures)
+            if optimize == "price":
+                for _, transport_id in departures[start:end]:
+                    relax(self._legs[transport_id], cost, parent)
+            elif start < end:
+                # Ningún tramo llega antes de salir: las salidas se recorren de a una, en orden, con un cursor que
+                # vuelve al heap con la hora de la siguiente. Así no se cargan los días de salidas que no hacen falta.
+                heappush(heap, (departures[start][0], next(tiebreak), cost, parent, (departures, start, end)))
+
+        expand(origin, _seconds(depart_after) if depart_after is not None else -inf, 0.0, None)
+        while heap:
+            _, _, cost, transport_id, cursor = heappop(heap)
+            if cursor is not None:
+                departures, index, end = cursor
+                relax(self._legs[departures[index][1]], cost, transport_id)
+                if index + 1 < end:
+                    heappush(heap, (departures[index + 1][0], next(tiebreak), cost, transport_id, (departures, index + 1, end)))
+                continue
+            assert transport_id is not None
+            if cost > best[transport_id]:
+                continue
+            leg = self._legs[transport_id]
+            if leg.end_city_id == destination:
+                legs = [leg]
+                while (parent := previous[legs[-1].transport_id]) is not None:
+                    legs.append(self._legs[parent])
+                return legs[::-1]
+            expand(leg.end_city_id, leg.arrives + connection, cost, transport_id)
+        return None
+
+
+# Un grafo por proceso, como el engine.
+route_graph = RouteGraph()
+
+
+async def find_route(
+    session: Any,
+    origin: int,
+    destination: int,
+    optimize: Optimize,
+    max_age: float,
+    depart_after: Optional[datetime] = None,
+    arrive_before: Optional[datetime] = None,
+    min_connection: int = 0,
+) -> Optional[Route]:
+    await route_graph.refresh(session, max_age)
+    legs = route_graph.plan(origin, destination, optimize, depart_after, arrive_before, min_connection)
+    if legs is None:
+        return None
+    return Route(
+        origin=origin,
+        destination=destination,
+        optimize=optimize,
+        price=round(sum(leg.price for leg in legs), 2),
+        departure=legs[0].start_datetime,
+        arrival=legs[-1].end_datetime,
+        legs=[
+            RouteLeg(leg.transport_id, leg.start_city_id, leg.end_city_id, leg.start_datetime, leg.end_datetime, leg.price)
+            for leg in legs
+        ],
+    )
+
+
+def mark_transports(session: Any, model: type, ids: Optional[Iterable[int]] = None) -> None:
+    """Anota transportes escritos por sentencia (bulk, importación); sin ``ids``, el grafo se recarga entero."""
+    if model is not Transport:
+        return
+    info = session.info
+    if ids is None or (_CHANGED in info and info[_CHANGED] is None):
+        info[_CHANGED] = None
+    else:
+        info.setdefault(_CHANGED, set()).update(ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _: UOWTransaction) -> None:
+    ids = [instance.id for instance in (*session.new, *session.dirty, *session.deleted) if isinstance(instance, Transport)]
+    if ids:
+        mark_transports(session, Transport, ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    # Recién confirmados: antes, otra request podría releerlos sin los cambios y darlos por aplicados.
+    if _CHANGED in session.info:
+        route_graph.touch(session.info.pop(_CHANGED))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
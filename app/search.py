@@ -0,0 +1,99 @@
+"""Búsqueda de texto sobre ciudades, actividades y alojamientos (tabla FTS5 ``search_index``, ver ``app.models``).
+
+La consulta se parte en palabras y se buscan todas, la última como prefijo para autocompletar; si ninguna
+fila las tiene todas, alcanza con cualquiera. El tokenizador reduce cada palabra a su raíz (``hotels`` encuentra
+``hotel``) e ignora los acentos (``kyoto`` encuentra ``Kyōto``).
+
+Ordenar por relevancia (BM25) obliga a puntuar todas las coincidencias, lo que con términos muy comunes y
+millones de filas puede tardar. Esa consulta corre con un presupuesto de tiempo: si se vence, se devuelven las
+primeras coincidencias del índice sin ordenar (``ranked=False``), que no requieren recorrerlas todas.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Literal, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.database import execute, time_budget
+from app.models import SEARCH_KINDS
+
+SearchKind = Literal["city", "activity", "accommodation"]
+
+MAX_TERMS = 8
+MAX_LIMIT = 50
+
+_RANKED = text(
+    "SELECT rowid, kind, name, snippet(search_index, -1, '<mark>', '</mark>', '…', 12), rank FROM search_index "
+    "WHERE search_index MATCH :match ORDER BY rank LIMIT :limit"
+)
+_UNRANKED = text(
+    "SELECT rowid, kind, name, snippet(search_index, -1, '<mark>', '</mark>', '…', 12), NULL FROM search_index "
+    "WHERE search_index MATCH :match LIMIT :limit"
+)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    id: int
+    name: str
+    snippet: str
+    # BM25 (más alto = más relevante); ``None`` si los resultados no se ordenaron.
+    score: Optional[float]
+
+
+@dataclass
+class SearchResults:
+    query: str
+    ranked: bool
+    items: list[SearchHit]
+
+
+def match_expression(query: str, kinds: Optional[list[str]] = None, any_term: bool = False) -> Optional[str]:
+    """Expresión MATCH de FTS5 para el texto libre ``query``; sus palabras van entre comillas, sin operadores."""
+    terms = re.findall(r"\w+", query.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    expression = "{name place body} : (" + (" OR " if any_term else " AND ").join(phrases) + ")"
+    if kinds:
+        expression = f"kind : ({' OR '.join(kinds)}) AND {expression}"
+    return expression
+
+
+async def _hits(session: Any, statement: Any, match: str, limit: int) -> list[SearchHit]:
+    rows = (await execute(session, statement, {"match": match, "limit": limit})).tuples()
+    return [
+        SearchHit(
+            kind=kind,
+            id=rowid // len(SEARCH_KINDS),
+            name=name,
+            snippet=snippet,
+            score=None if rank is None else round(-rank, 4),
+        )
+        for rowid, kind, name, snippet, rank in rows
+    ]
+
+
+async def _search(session: Any, query: str, match: str, limit: int, budget: float) -> SearchResults:
+    try:
+        async with time_budget(session, budget):
+            return SearchResults(query=query, ranked=True, items=await _hits(session, _RANKED, match, limit))
+    except OperationalError as e:
+        if "interrupted" not in str(e.orig):
+            raise
+    return SearchResults(query=query, ranked=False, items=await _hits(session, _UNRANKED, match, limit))
+
+
+async def search(
+    session: Any, query: str, kinds: Optional[list[str]] = None, limit: int = 20, budget: float = 0.1
+) -> SearchResults:
+    if (match := match_expression(query, kinds)) is None:
+        return SearchResults(query=query, ranked=True, items=[])
+    results = await _search(session, query, match, limit, budget)
+    # Con una sola palabra "todas" y "cualquiera" son la misma consulta.
+    if not results.items and (any_match := match_expression(query, kinds, any_term=True)) != match:
+        results = await _search(session, query, any_match, limit, budget)
+    return results
@@ -0,0 +1,115 @@
+import os
+from dataclasses import dataclass, field
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    # "async" (aiosqlite) por defecto; "sync" mantiene el motor bloqueante para comparar ambos modos.
+    mode: str = field(default_factory=lambda: os.getenv("DB_MODE", "async"))
+    url: str = field(default_factory=lambda: os.getenv("DATABASE_URL", ""))
+    # "production" aplica WAL y los pragmas de abajo en cada conexión; "default" deja SQLite como viene.
+    profile: str = field(default_factory=lambda: os.getenv("DB_PROFILE", "production"))
+    busy_timeout_ms: int = field(default_factory=lambda: _env_int("DB_BUSY_TIMEOUT_MS", 5000))
+    mmap_size: int = field(default_factory=lambda: _env_int("DB_MMAP_SIZE", 256 * 1024 * 1024))
+    # Negativo = KiB (convención de SQLite): 64 MiB de caché de páginas por conexión.
+    cache_size: int = field(default_factory=lambda: _env_int("DB_CACHE_SIZE", -64_000))
+    pool_size: int = field(default_factory=lambda: _env_int("DB_POOL_SIZE", 10))
+    max_overflow: int = field(default_factory=lambda: _env_int("DB_MAX_OVERFLOW", 10))
+    pool_timeout: int = field(default_factory=lambda: _env_int("DB_POOL_TIMEOUT", 30))
+
+    @property
+    def database_url(self) -> str:
+        if self.url:
+            return self.url
+        return "sqlite:///test.sqlite3" if self.mode == "sync" else "sqlite+aiosqlite:///test.sqlite3"
+
+    @property
+    def pragmas(self) -> dict[str, str | int]:
+        if self.profile != "production":
+            return {}
+        return {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": self.busy_timeout_ms,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "temp_store": "MEMORY",
+        }
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    # Vacío = LRU en memoria del proceso; "redis://host:6379/0" comparte la caché entre workers.
+    url: str = field(default_factory=lambda: os.getenv("CACHE_URL", ""))
+    max_entries: int = field(default_factory=lambda: _env_int("CACHE_MAX_ENTRIES", 10_000))
+    ttl: int = field(default_factory=lambda: _env_int("CACHE_TTL", 60))
+
+
+@dataclass(frozen=True)
+class MetricsSettings:
+    # Consultas que tardan al menos esto se registran con sus parámetros en el logger "app.sql".
+    slow_query_ms: int = field(default_factory=lambda: _env_int("SLOW_QUERY_MS", 200))
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    # "gzip", "brotli" (requiere el extra ``brotli``; cae a gzip si el cliente no lo acepta) o "none".
+    backend: str = field(default_factory=lambda: os.getenv("COMPRESSION_BACKEND", "gzip"))
+    # Por debajo de esto comprimir cuesta más CPU de lo que ahorra en bytes.
+    minimum_size: int = field(default_factory=lambda: _env_int("COMPRESSION_MIN_SIZE", 500))
+    gzip_level: int = field(default_factory=lambda: _env_int("COMPRESSION_GZIP_LEVEL", 6))
+    brotli_quality: int = field(default_factory=lambda: _env_int("COMPRESSION_BROTLI_QUALITY", 4))
+
+
+@dataclass(frozen=True)
+class SearchSettings:
+    # Tiempo máximo para ordenar por relevancia; pasado esto se devuelven coincidencias sin ordenar.
+    budget_ms: int = field(default_factory=lambda: _env_int("SEARCH_BUDGET_MS", 100))
+
+
+@dataclass(frozen=True)
+class RouteSettings:
+    # Cada cuánto se recarga entero el grafo de rutas en memoria: lo que tardan en verse las escrituras de otros
+    # workers. Las de este proceso se aplican al confirmarse.
+    max_age: int = field(default_factory=lambda: _env_int("ROUTES_MAX_AGE_S", 60))
+
+
+@dataclass(frozen=True)
+class EventSettings:
+    # Cada cuánto se leen de ``travel_events`` los cambios de otros workers y de la CLI; los de este proceso se
+    # reparten al confirmarse.
+    poll_ms: int = field(default_factory=lambda: _env_int("EVENTS_POLL_MS", 1000))
+    # Un comentario SSE cada tanto para que proxies y clientes no corten una conexión sin cambios.
+    heartbeat_s: int = field(default_factory=lambda: _env_int("EVENTS_HEARTBEAT_S", 15))
+    # Cuánto se guarda el log: la ventana para reanudar con ``Last-Event-ID``.
+    retention_h: int = field(default_factory=lambda: _env_int("EVENTS_RETENTION_H", 72))
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    # "dev": debug (trazas en las respuestas de error) y un solo worker; "prod": sin debug y un worker por CPU.
+    profile: str = field(default_factory=lambda: os.getenv("APP_PROFILE", "dev"))
+    host: str = field(default_factory=lambda: os.getenv("HOST", "127.0.0.1"))
+    port: int = field(default_factory=lambda: _env_int("PORT", 8000))
+    # 0 = según el perfil.
+    workers: int = field(default_factory=lambda: _env_int("WEB_WORKERS", 0))
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    metrics: MetricsSettings = field(default_factory=MetricsSettings)
+    compression: CompressionSettings = field(default_factory=CompressionSettings)
+    search: SearchSettings = field(default_factory=SearchSettings)
+    routes: RouteSettings = field(default_factory=RouteSettings)
+    events: EventSettings = field(default_factory=EventSettings)
+
+    @property
+    def debug(self) -> bool:
+        return self.profile != "prod"
+
+    @property
+    def worker_count(self) -> int:
+        if self.workers:
+            return self.workers
+        return 1 if self.debug else os.cpu_count() or 1
@@ -0,0 +1,61 @@
+from functools import cache
+from typing import Any
+
+import msgspec
+from litestar.dto import AbstractDTO
+from litestar.types import Empty
+from sqlalchemy import inspect
+
+
+@cache
+def dto_struct(dto: type[AbstractDTO], extra_fields: tuple[tuple[str, type], ...] = ()) -> type[msgspec.Struct]:
+    """``msgspec.Struct`` con los campos de columna que expone ``dto`` según su config.
+
+    Valida elemento por elemento sin pasar por el handler completo del DTO; con ``partial``
+    los campos omitidos quedan como ``msgspec.UNSET``.
+    """
+    config = dto.config
+    relationships = set(inspect(dto.model_type).relationships.keys())
+    fields: list[Any] = list(extra_fields)
+    for field in dto.generate_field_definitions(dto.model_type):
+        if field.name in relationships or field.name in config.exclude:
+            continue
+        if config.include and field.name not in config.include:
+            continue
+        if config.partial:
+            fields.append((field.name, field.annotation | msgspec.UnsetType, msgspec.UNSET))
+        elif field.default is not Empty:
+            fields.append((field.name, field.annotation, field.default))
+        else:
+            fields.append((field.name, field.annotation))
+    return msgspec.defstruct(f"{dto.__name__}Struct", fields, kw_only=True, forbid_unknown_fields=True)
+
+
+@cache
+def row_struct(dto: type[AbstractDTO]) -> type[msgspec.Struct]:
+    """``msgspec.Struct`` de lectura con los campos que expone ``dto``, en su orden, para armarlo desde una fila.
+
+    Es la forma de salida del DTO sin pasar por él: se construye posicionalmente con las columnas de un
+    SELECT (``Row(*fila)``) y msgspec lo codifica directo. Solo admite DTOs sin relaciones.
+    """
+    config = dto.config
+    relationships = set(inspect(dto.model_type).relationships.keys())
+    fields: list[Any] = []
+    for field in dto.generate_field_definitions(dto.model_type):
+        if field.name in config.exclude or (config.include and field.name not in config.include):
+            continue
+        if field.name in relationships:
+            raise ValueError(f"{dto.__name__} incluye la relación {field.name}; no se puede leer como fila")
+        fields.append((field.name, field.annotation))
+    # ``__tablename__`` identifica la fila igual que el modelo (lo usan los ETags); sin ciclos, no necesita GC.
+    return msgspec.defstruct(
+        f"{dto.model_type.__name__}Row", fields, namespace={"__tablename__": dto.model_type.__tablename__}, gc=False
+    )
+
+
+def struct_to_dict(value: msgspec.Struct) -> dict[str, Any]:
+    return {
+        name: item
+        for name in value.__struct_fields__
+        if (item := getattr(value, name)) is not msgspec.UNSET
+    }
@@ -0,0 +1,93 @@
+"""Presupuesto de un viaje leído de ``travel_budget`` contra sumado en el momento sobre las cuatro tablas.
+
+Mide la mediana de cada forma de obtener los totales de un viaje al azar, para distintas cantidades de
+filas por viaje, y verifica que las dos den lo mismo.
+
+Uso: python -m benchmarks.budget [--requests 500] [--items 10 100 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks.dataset import seed
+
+
+async def _summed(session: Any, travel_id: int) -> list[float]:
+    from app.budget import CATEGORIES
+    from app.database import execute
+
+    values = []
+    for model, (_, field) in CATEGORIES.items():
+        statement = select(func.coalesce(func.sum(getattr(model, field)), 0)).where(model.travel_id == travel_id)
+        values.append((await execute(session, statement)).scalar_one())
+    return values
+
+
+async def _stored(session: Any, travel_id: int) -> list[float]:
+    from app.budget import travel_budget
+
+    budget = await travel_budget(session, travel_id)
+    return [budget.accommodations, budget.transports, budget.activities, budget.spent]
+
+
+async def _median_ms(fn: Any, travels: int, requests: int) -> float:
+    from app.database import open_session
+
+    rng = random.Random(7)
+    samples = []
+    async with open_session() as session:
+        for _ in range(requests):
+            travel_id = rng.randint(1, travels)
+            started = time.perf_counter()
+            await fn(session, travel_id)
+            samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+async def run(travels: int, requests: int) -> dict[str, Any]:
+    from app.database import dispose_engine, open_session
+
+    async with open_session() as session:
+        for travel_id in (1, travels):
+            summed = [round(value, 2) for value in await _summed(session, travel_id)]
+            assert summed == await _stored(session, travel_id), travel_id
+    summed_ms = await _median_ms(_summed, travels, requests)
+    stored_ms = await _median_ms(_stored, travels, requests)
+    await dispose_engine()
+    return {"summed_ms": summed_ms, "stored_ms": stored_ms, "speedup": round(summed_ms / stored_ms, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--travels", type=int, default=50)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    from app.models import Base
+
+    report: dict[str, Any] = {}
+    # Un solo directorio: el engine de la app fija la ruta absoluta de ``test.sqlite3`` al crearse.
+    os.chdir(tempfile.mkdtemp())
+    for items in args.items:
+        if os.path.exists("test.sqlite3"):
+            os.remove("test.sqlite3")
+        Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+        conn = sqlite3.connect("test.sqlite3")
+        seed(conn, travels=args.travels, items=items)
+        conn.close()
+        report[f"items={items}"] = asyncio.run(run(args.travels, args.requests))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
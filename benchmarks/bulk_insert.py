@@ -0,0 +1,63 @@
+"""Compara POST fila por fila contra POST /bulk (una transacción, INSERT por bloques).
+
+Uso: python -m benchmarks.bulk_insert [--rows 2000] [--chunk-size 500]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+
+def expense(index: int) -> dict[str, object]:
+    return {
+        "description": f"gasto {index}",
+        "amount": index % 100 + 0.5,
+        "datetime": "2024-01-02T12:00:00",
+        "user_id": 1,
+        "travel_id": 1,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    from litestar.testing import TestClient
+
+    from app import app
+    from app.database import engine
+    from app.models import Base
+    from app.query_counter import QueryCounter
+
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    rows = [expense(index) for index in range(args.rows)]
+    report: dict[str, dict[str, float]] = {}
+    with TestClient(app) as client:
+        client.post("/users", json={"name": "bench", "email": "bench@example.com"}).raise_for_status()
+        client.post("/travels", json={"name": "bench", "start_date": "2024-01-01", "end_date": "2024-01-10"}).raise_for_status()
+
+        with QueryCounter(engine) as queries:
+            started = time.perf_counter()
+            for row in rows:
+                client.post("/expenses", json=row).raise_for_status()
+            single = time.perf_counter() - started
+        report["single"] = {"seconds": round(single, 3), "rows_per_s": round(args.rows / single), "statements": queries.count, "commits": args.rows}
+
+        with QueryCounter(engine) as queries:
+            started = time.perf_counter()
+            client.post("/expenses/bulk", json=rows, params={"chunk_size": args.chunk_size}).raise_for_status()
+            bulk = time.perf_counter() - started
+        report["bulk"] = {"seconds": round(bulk, 3), "rows_per_s": round(args.rows / bulk), "statements": queries.count, "commits": 1}
+
+    report["speedup"] = {"x": round(single / bulk, 1)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Bytes por respuesta sin comprimir, con gzip y con brotli (si está instalado el extra ``brotli``).
+
+Pide cada listado con distintos ``Accept-Encoding`` y mide el tamaño del cuerpo tal como viaja (antes de
+que el cliente lo descomprima) y la mediana de la request completa, con la caché de respuestas apagada
+para que cada request pague la compresión.
+
+Uso: python -m benchmarks.compression [--requests 30] [--limit 100]
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import seed
+
+ENCODINGS = {"gzip": "gzip", "brotli": "br"}
+PATHS = ["/cities", "/users", "/travels", "/accommodations", "/activities", "/expenses", "/travels/1/expenses"]
+
+
+def _measure(client: Any, path: str, limit: int, accept_encoding: str, requests: int) -> dict[str, Any]:
+    headers = {"Accept-Encoding": accept_encoding}
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, params={"limit": limit}, headers=headers)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return {
+        "bytes": response.num_bytes_downloaded,
+        "encoding": response.headers.get("content-encoding", "identity"),
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from litestar.testing import TestClient
+
+    from app import create_app
+    from app.models import Base
+    from app.settings import AppSettings, CacheSettings, CompressionSettings
+
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    conn = sqlite3.connect("test.sqlite3")
+    seed(conn, travels=args.limit, items=10)
+    conn.close()
+
+    backends = ["gzip"] + (["brotli"] if importlib.util.find_spec("brotli") else [])
+    report: dict[str, dict[str, Any]] = {path: {} for path in PATHS}
+    for backend in backends:
+        settings = AppSettings(
+            profile="prod", cache=CacheSettings(max_entries=0), compression=CompressionSettings(backend=backend)
+        )
+        with TestClient(create_app(settings)) as client:
+            for path in PATHS:
+                if "identity" not in report[path]:
+                    report[path]["identity"] = _measure(client, path, args.limit, "identity", args.requests)
+                result = _measure(client, path, args.limit, ENCODINGS[backend], args.requests)
+                result["ratio"] = round(report[path]["identity"]["bytes"] / result["bytes"], 1)
+                report[path][backend] = result
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Conflictos de agenda de un viaje grande: barrido ordenado contra comparar todos los pares.
+
+Siembra un viaje con ``--items`` transportes, actividades y alojamientos (dos transportes y dos actividades
+por día, así la densidad de conflictos no cambia con el tamaño) y mide:
+``sweep_ms``, todos los conflictos con ``travel_conflicts`` (lectura incluida); ``pairs_ms``, los mismos
+comparando cada par (solo hasta ``--pairs-max`` filas, y se verifica que den lo mismo); ``endpoint_ms``,
+``GET /travels/1/conflicts`` con el límite por defecto; ``check_ms``, la validación de un alta con
+``check_conflicts``.
+
+Uso: python -m benchmarks.conflicts [--items 1000 2000 10000 50000] [--pairs-max 2000] [--requests 20]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import create_engine
+
+# Filas de cada tabla por día de viaje.
+PER_DAY = 2
+
+
+def seed_schedule(conn: sqlite3.Connection, items: int) -> None:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    conn.execute("INSERT INTO cities (id, name, country) VALUES (1, 'c', 'XX')")
+    days = max(1, items // PER_DAY)
+    conn.execute(
+        "INSERT INTO travels (id, name, start_date, end_date) VALUES (1, 't', ?, ?)",
+        (str(start.date()), str((start + timedelta(days=days)).date())),
+    )
+
+    def moment() -> datetime:
+        return start + timedelta(minutes=rng.randrange(days * 24 * 60))
+
+    transports = []
+    for _ in range(items):
+        departure = moment()
+        transports.append((departure, departure + timedelta(minutes=rng.randint(30, 360))))
+    conn.executemany(
+        "INSERT INTO transports (type, company, price, start_datetime, start_location, end_datetime, end_location,"
+        " travel_id, start_city_id, end_city_id) VALUES ('train', 'co', 10, ?, 'a', ?, 'b', 1, 1, 1)",
+        [(str(a), str(b)) for a, b in transports],
+    )
+    conn.executemany(
+        "INSERT INTO activities (name, location, start_datetime, price, duration, travel_id, city_id)"
+        " VALUES ('act', 'loc', ?, 1, ?, 1, 1)",
+        [(str(moment()), rng.randint(30, 180)) for _ in range(items)],
+    )
+    # Estadías seguidas con algún hueco, y algunas que se pisan con la anterior.
+    stays, day = [], start.date()
+    while day < start.date() + timedelta(days=days):
+        nights = rng.randint(1, 3)
+        stays.append((day, day + timedelta(days=nights)))
+        day += timedelta(days=nights + rng.choice([-1, 0, 0, 0, 1]))
+    conn.executemany(
+        "INSERT INTO accommodations (name, location, price, start_date, end_date, travel_id, city_id)"
+        " VALUES ('hotel', 'loc', 1, ?, ?, 1, 1)",
+        [(str(a), str(b)) for a, b in stays],
+    )
+    conn.commit()
+
+
+def _all_pairs(slots: list[Any]) -> list[tuple[Any, Any]]:
+    return [
+        (a, b)
+        for i, a in enumerate(slots)
+        for b in slots[i + 1 :]
+        if a.start < b.end and b.start < a.end
+    ]
+
+
+def _key(pair: Any) -> tuple[Any, ...]:
+    return tuple(sorted((slot.kind, slot.id) for slot in pair))
+
+
+async def _measure(items: int, pairs_max: int, requests: int) -> dict[str, Any]:
+    from litestar.testing import AsyncTestClient
+
+    from app import create_app
+    from app.conflicts import _slots, find_conflicts, travel_conflicts
+    from app.database import dispose_engine, open_session
+    from app.models import Accommodation, Activity, Transport
+    from app.settings import AppSettings, CacheSettings
+
+    result: dict[str, Any] = {}
+    async with open_session() as session:
+        await travel_conflicts(session, 1)  # conexión y caché de páginas calientes
+        started = time.perf_counter()
+        found = await travel_conflicts(session, 1, limit=10**9)
+        result["sweep_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["conflicts"] = len(found.conflicts)
+
+        if items <= pairs_max:
+            started = time.perf_counter()
+            timeline = await _slots(session, Transport, 1) + await _slots(session, Activity, 1)
+            pairs = _all_pairs(timeline) + _all_pairs(await _slots(session, Accommodation, 1))
+            result["pairs_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["speedup"] = round(result["pairs_ms"] / result["sweep_ms"], 1)
+            overlaps = {_key(conflict.items) for conflict in found.conflicts if conflict.type == "overlap"}
+            assert overlaps == {_key(pair) for pair in pairs}, "el barrido y los pares no coinciden"
+
+        samples = []
+        middle = datetime(2024, 1, 1) + timedelta(days=items // PER_DAY // 2)
+        for hour in range(0, 24 * 20, 24):
+            values = {"id": None, "travel_id": 1, "start_datetime": middle + timedelta(hours=hour), "duration": 60}
+            started = time.perf_counter()
+            await find_conflicts(session, Activity, values)
+            samples.append(time.perf_counter() - started)
+        result["check_ms"] = round(statistics.median(samples) * 1000, 2)
+
+    # Sin caché de respuestas: se mide el barrido, no el LRU.
+    settings = AppSettings(profile="prod", cache=CacheSettings(max_entries=0))
+    async with AsyncTestClient(create_app(settings)) as client:
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            (await client.get("/travels/1/conflicts")).raise_for_status()
+            samples.append(time.perf_counter() - started)
+    result["endpoint_ms"] = round(statistics.median(samples) * 1000, 1)
+    # En el mismo event loop que el cliente, antes de borrar la base para el próximo tamaño.
+    await dispose_engine()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 2000, 10000, 50000])
+    parser.add_argument("--pairs-max", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from app.models import Base
+
+    report: dict[str, Any] = {}
+    # Un solo directorio: el engine de la app fija la ruta absoluta de ``test.sqlite3`` al crearse.
+    os.chdir(tempfile.mkdtemp())
+    for items in args.items:
+        if os.path.exists("test.sqlite3"):
+            os.remove("test.sqlite3")
+        Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+        conn = sqlite3.connect("test.sqlite3")
+        seed_schedule(conn, items)
+        conn.close()
+        result = asyncio.run(_measure(items, args.pairs_max, args.requests))
+        report[f"items={items}"] = result
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
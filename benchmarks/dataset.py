@@ -0,0 +1,71 @@
+"""Dataset sintético compartido por los benchmarks."""
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+# Mismo formato de texto que usan los tipos Date/DateTime de SQLAlchemy en SQLite.
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+
+def seed(conn: sqlite3.Connection, travels: int, items: int) -> None:
+    rng = random.Random(42)
+    users = travels // 2 + 1
+    cities = max(travels // 10, 10)
+    conn.executemany(
+        "INSERT INTO users (id, name, email) VALUES (?, ?, ?)",
+        [(i, f"user{i}", f"user{i}@example.com") for i in range(1, users + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO cities (id, name, country) VALUES (?, ?, ?)",
+        [(i, f"city{i}", "XX") for i in range(1, cities + 1)],
+    )
+    start = date(2024, 1, 1)
+    conn.executemany(
+        "INSERT INTO travels (id, name, start_date, end_date) VALUES (?, ?, ?, ?)",
+        [(i, f"travel{i}", start, start + timedelta(days=14)) for i in range(1, travels + 1)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO users_travels (user_id, travel_id) VALUES (?, ?)",
+        [(rng.randint(1, users), t) for t in range(1, travels + 1) for _ in range(4)],
+    )
+    moment = datetime(2024, 1, 1, 8)
+    for travel_id in range(1, travels + 1):
+        conn.executemany(
+            "INSERT INTO transports (type, company, price, start_datetime, start_location, end_datetime,"
+            " end_location, travel_id, start_city_id, end_city_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("train", "co", rng.uniform(10, 500), moment + timedelta(hours=h * 7), "a",
+                 moment + timedelta(hours=h * 7 + 3), "b", travel_id, rng.randint(1, cities), rng.randint(1, cities))
+                for h in range(items)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO activities (name, location, start_datetime, price, duration, travel_id, city_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [("act", "loc", moment + timedelta(hours=h * 5), rng.uniform(0, 100), 90, travel_id, rng.randint(1, cities))
+             for h in range(items)],
+        )
+        conn.executemany(
+            "INSERT INTO accommodations (name, location, price, start_date, end_date, travel_id, city_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [("hotel", "loc", rng.uniform(50, 300), start + timedelta(days=d), start + timedelta(days=d + 1),
+              travel_id, rng.randint(1, cities)) for d in range(items // 5 + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO expenses (description, amount, datetime, user_id, travel_id) VALUES (?, ?, ?, ?, ?)",
+            [("gasto", rng.uniform(1, 200), moment + timedelta(hours=h), rng.randint(1, users), travel_id)
+             for h in range(items)],
+        )
+    # Los INSERT directos no pasan por la app: los totales de ``travel_budget`` se arman como en la migración.
+    conn.execute(
+        "INSERT INTO travel_budget (travel_id, accommodations, transports, activities, expenses)"
+        " SELECT travels.id,"
+        " (SELECT coalesce(sum(price), 0) FROM accommodations WHERE travel_id = travels.id),"
+        " (SELECT coalesce(sum(price), 0) FROM transports WHERE travel_id = travels.id),"
+        " (SELECT coalesce(sum(price), 0) FROM activities WHERE travel_id = travels.id),"
+        " (SELECT coalesce(sum(amount), 0) FROM expenses WHERE travel_id = travels.id)"
+        " FROM travels"
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
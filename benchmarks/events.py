@@ -0,0 +1,96 @@
+"""Reparto de ``GET /travels/{id}/events`` a muchos suscriptores inactivos de un mismo viaje.
+
+Para cada cantidad de ``--subscribers`` conecta suscriptores al lector del proceso (sin HTTP: mide el reparto,
+no el servidor) y mide ``kb_per_subscriber``, la memoria de Python que agrega cada uno mientras espera, y, sobre
+``--events`` escrituras, la mediana de ``fanout_ms``: desde el commit hasta que todos recibieron el evento, con
+``us_per_subscriber`` el mismo tiempo repartido entre ellos.
+
+Uso: python -m benchmarks.events [--subscribers 100 1000 10000] [--events 20]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from sqlalchemy import create_engine
+
+
+async def _measure(subscribers: int, events: int) -> dict[str, Any]:
+    from app.database import commit, dispose_engine, open_session
+    from app.events import log_events, travel_events
+    from app.settings import EventSettings
+
+    # Sin latidos ni sondeo durante la medición: cada tanda la dispara el commit.
+    await travel_events.start(EventSettings(poll_ms=60_000, heartbeat_s=3600))
+    delivered = 0
+    everyone = asyncio.Event()
+
+    async def consume() -> None:
+        nonlocal delivered
+        async for chunk in travel_events.subscribe(1):
+            if chunk.startswith(b"id: "):
+                delivered += 1
+                if delivered == subscribers:
+                    everyone.set()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(consume()) for _ in range(subscribers)]
+    while travel_events.subscribers < subscribers:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+    added = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    samples = []
+    for event_id in range(events):
+        delivered = 0
+        everyone.clear()
+        async with open_session() as session:
+            await log_events(session, [{"travel_id": 1, "entity": "expense", "entity_id": event_id, "action": "created"}])
+            started = time.perf_counter()
+            await commit(session)
+        await asyncio.wait_for(everyone.wait(), 60)
+        samples.append(time.perf_counter() - started)
+
+    await travel_events.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await dispose_engine()
+    fanout = statistics.median(samples)
+    return {
+        "kb_per_subscriber": round(added / subscribers / 1024, 2),
+        "fanout_ms": round(fanout * 1000, 2),
+        "us_per_subscriber": round(fanout / subscribers * 1e6, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("app.sql").setLevel(logging.ERROR)
+    from app.models import Base
+
+    # Un solo directorio: el engine de la app fija la ruta absoluta de ``test.sqlite3`` al crearse.
+    os.chdir(tempfile.mkdtemp())
+    report: dict[str, Any] = {}
+    for subscribers in args.subscribers:
+        if os.path.exists("test.sqlite3"):
+            os.remove("test.sqlite3")
+        Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+        report[f"subscribers={subscribers}"] = asyncio.run(_measure(subscribers, args.events))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
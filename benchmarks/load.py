@@ -0,0 +1,340 @@
+"""Carga sobre cada endpoint de la API: latencias p50/p95/p99 y requests por segundo, en JSON.
+
+Siembra un dataset sintético, recorre una vez todos los escenarios con el cliente de pruebas de Litestar
+(falla si alguno no responde 2xx) y luego lanza ``--requests`` requests por escenario con ``--concurrency``
+tareas concurrentes. Con ``--baseline`` compara contra un resultado guardado y termina con error si algún
+endpoint empeoró más que ``--tolerance``.
+
+Uso: python -m benchmarks.load [--travels 200] [--requests 200] [--concurrency 8] [--output r.json]
+     python -m benchmarks.load --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import seed
+
+
+@dataclass
+class State:
+    rng: random.Random
+    travels: int
+    users: int
+    cities: int
+    items: int
+    # Ids creados durante la corrida, que los escenarios DELETE consumen sin tocar el dataset sembrado.
+    created: dict[str, list[int]] = field(default_factory=dict)
+    members: list[tuple[int, int]] = field(default_factory=list)
+    sequence: int = 0
+
+    def travel(self) -> int:
+        return self.rng.randint(1, self.travels)
+
+    def user(self) -> int:
+        return self.rng.randint(1, self.users)
+
+    def city(self) -> int:
+        return self.rng.randint(1, self.cities)
+
+    def item(self, per_travel: Optional[int] = None) -> int:
+        return self.rng.randint(1, self.travels * (per_travel or self.items))
+
+    def unique(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+    def take(self, pool: str, count: int = 1) -> list[int]:
+        ids = self.created.get(pool, [])
+        taken, self.created[pool] = ids[:count], ids[count:]
+        return taken
+
+
+Request = dict[str, Any]
+
+
+@dataclass
+class Scenario:
+    method: str
+    route: str
+    build: Callable[[State], Request]
+    # Guarda en ``State.created[pool]`` los ids que devuelve la respuesta.
+    pool: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+def _city(state: State) -> dict[str, Any]:
+    return {"name": f"bench{state.unique()}", "country": "XX"}
+
+
+def _user(state: State) -> dict[str, Any]:
+    n = state.unique()
+    return {"name": f"bench{n}", "email": f"bench{n}@example.com"}
+
+
+def _travel(state: State) -> dict[str, Any]:
+    return {"name": f"bench{state.unique()}", "start_date": "2024-03-01", "end_date": "2024-03-10"}
+
+
+def _transport(state: State) -> dict[str, Any]:
+    return {
+        "type": "bus", "company": "bench", "price": 25.0, "start_datetime": "2024-03-02T08:00:00", "start_location": "a",
+        "end_datetime": "2024-03-02T12:00:00", "end_location": "b", "travel_id": state.travel(),
+        "start_city_id": state.city(), "end_city_id": state.city(),
+    }
+
+
+def _accommodation(state: State) -> dict[str, Any]:
+    return {
+        "name": "bench", "location": "loc", "price": 80.0, "start_date": "2024-03-02", "end_date": "2024-03-04",
+        "travel_id": state.travel(), "city_id": state.city(),
+    }
+
+
+def _activity(state: State) -> dict[str, Any]:
+    return {
+        "name": "bench", "location": "loc", "start_datetime": "2024-03-03T10:00:00", "price": 15.0, "duration": 60,
+        "travel_id": state.travel(), "city_id": state.city(),
+    }
+
+
+def _expense(state: State) -> dict[str, Any]:
+    return {
+        "description": "bench", "amount": 12.5, "datetime": "2024-03-03T13:00:00", "user_id": state.user(),
+        "travel_id": state.travel(),
+    }
+
+
+BULK_SIZE = 20
+
+# Recurso -> (cuerpo de creación, campo para PATCH, id sembrado al azar).
+RESOURCES: dict[str, tuple[Callable[[State], dict[str, Any]], dict[str, Any], Callable[[State], int]]] = {
+    "users": (_user, {"name": "patched"}, State.user),
+    "cities": (_city, {"name": "patched"}, State.city),
+    "travels": (_travel, {"description": "patched"}, State.travel),
+    "transports": (_transport, {"price": 30.0}, State.item),
+    "accommodations": (_accommodation, {"price": 90.0}, lambda state: state.item(state.items // 5 + 1)),
+    "activities": (_activity, {"price": 20.0}, State.item),
+    "expenses": (_expense, {"amount": 15.0}, State.item),
+}
+# /cities no tiene GET por id.
+WITH_DETAIL = {"users", "travels", "transports", "accommodations", "activities", "expenses"}
+
+
+def _crud(resource: str) -> list[Scenario]:
+    body, patch, seeded = RESOURCES[resource]
+    scenarios = [Scenario("GET", f"/{resource}", lambda state: {"url": f"/{resource}", "params": {"limit": 20}})]
+    if resource in WITH_DETAIL:
+        scenarios.append(Scenario("GET", f"/{resource}/{{id}}", lambda state: {"url": f"/{resource}/{seeded(state)}"}))
+    return scenarios + [
+        Scenario("POST", f"/{resource}", lambda state: {"url": f"/{resource}", "json": body(state)}, pool=resource),
+        Scenario("PATCH", f"/{resource}/{{id}}", lambda state: {"url": f"/{resource}/{seeded(state)}", "json": patch}),
+        Scenario(
+            "POST", f"/{resource}/bulk",
+            lambda state: {"url": f"/{resource}/bulk", "json": [body(state) for _ in range(BULK_SIZE)]},
+            pool=f"{resource}/bulk",
+        ),
+        Scenario(
+            "PATCH", f"/{resource}/bulk",
+            lambda state: {"url": f"/{resource}/bulk", "json": [{"id": i, **patch} for i in {seeded(state) for _ in range(BULK_SIZE)}]},
+        ),
+        Scenario("DELETE", f"/{resource}/{{id}}", lambda state: {"url": f"/{resource}/{state.take(resource)[0]}"}),
+        Scenario(
+            "DELETE", f"/{resource}/bulk",
+            lambda state: {"url": f"/{resource}/bulk", "json": state.take(f"{resource}/bulk", BULK_SIZE)},
+        ),
+    ]
+
+
+def _import(state: State) -> Request:
+    lines = "\n".join(json.dumps(_expense(state)) for _ in range(BULK_SIZE))
+    return {"url": "/imports/expenses", "params": {"job": f"bench-{state.unique()}"}, "content": lines}
+
+
+def _add_member(state: State) -> Request:
+    # Los usuarios sembrados nunca se borran: siempre existen.
+    # Cada par una sola vez, para que el DELETE correspondiente siempre encuentre la membresía.
+    while (pair := (state.travel(), state.user())) in state.members:
+        pass
+    state.members.append(pair)
+    travel_id, user_id = pair
+    return {"url": f"/travels/{travel_id}/users", "params": {"user_ids": [user_id]}}
+
+
+def _remove_member(state: State) -> Request:
+    travel_id, user_id = state.members.pop()
+    return {"url": f"/travels/{travel_id}/users/{user_id}"}
+
+
+def _sub(path: str, params: Optional[dict[str, Any]] = None) -> Scenario:
+    return Scenario("GET", f"/travels/{{id}}/{path}", lambda state: {"url": f"/travels/{state.travel()}/{path}", "params": params or {}})
+
+
+SCENARIOS: list[Scenario] = [
+    *(scenario for resource in RESOURCES for scenario in _crud(resource)),
+    Scenario("GET", "/users/{id}/travels", lambda state: {"url": f"/users/{state.user()}/travels"}),
+    Scenario("GET", "/users/{id}/export", lambda state: {"url": f"/users/{state.user()}/export", "params": {"resource": "expenses"}}),
+    Scenario("GET", "/travels/export", lambda state: {"url": "/travels/export"}),
+    _sub("users"),
+    _sub("itinerary"),
+    _sub("transports"),
+    _sub("accommodations"),
+    _sub("activities"),
+    _sub("expenses"),
+    _sub("expenses/summary"),
+    _sub("settlement"),
+    _sub("budget"),
+    _sub("conflicts"),
+    Scenario("POST", "/travels/{id}/users", _add_member),
+    Scenario("DELETE", "/travels/{id}/users/{user_id}", _remove_member),
+    Scenario(
+        "GET", "/activities?city_id&after&before",
+        lambda state: {"url": "/activities", "params": {"city_id": state.city(), "after": "2024-01-02T00:00:00", "before": "2024-01-09T00:00:00"}},
+    ),
+    Scenario("POST", "/imports/{resource}", _import),
+    Scenario("GET", "/cache/stats", lambda state: {"url": "/cache/stats"}),
+    Scenario("GET", "/metrics", lambda state: {"url": "/metrics"}),
+]
+
+
+def _collect(state: State, pool: str, response: Any) -> None:
+    body = response.json()
+    ids = body["ids"] if "ids" in body else [body["id"]] if "id" in body else []
+    state.created.setdefault(pool, []).extend(ids)
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) < 2:
+        latencies = latencies * 2
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {f"p{p}_ms": round(cuts[p - 1] * 1000, 2) for p in (50, 95, 99)}
+
+
+async def _run(client: Any, scenario: Scenario, state: State, requests: int, concurrency: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            kwargs = scenario.build(state)
+            started = time.perf_counter()
+            response = await client.request(scenario.method, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.pool:
+                _collect(state, scenario.pool, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"requests": requests, "errors": errors, "rps": round(requests / elapsed, 1), **_percentiles(latencies)}
+
+
+async def run(travels: int, items: int, requests: int, concurrency: int, cache: bool) -> dict[str, Any]:
+    from litestar.testing import AsyncTestClient
+
+    from app import create_app
+    from app.models import Base
+    from app.settings import AppSettings, CacheSettings
+
+    if os.path.exists("test.sqlite3"):
+        os.remove("test.sqlite3")
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    conn = sqlite3.connect("test.sqlite3")
+    seed(conn, travels, items)
+    conn.close()
+
+    # Mismos tamaños que calcula ``seed``.
+    state = State(random.Random(7), travels, travels // 2 + 1, max(travels // 10, 10), items)
+    results: dict[str, Any] = {}
+    # Sin ``--cache`` se mide la base de datos: un LRU de 0 entradas descarta todo lo que guarda.
+    settings = AppSettings(cache=CacheSettings(max_entries=CacheSettings().max_entries if cache else 0))
+    async with AsyncTestClient(create_app(settings)) as client:
+        for scenario in SCENARIOS:
+            response = await client.request(scenario.method, **scenario.build(state))
+            if response.status_code >= 400:
+                raise SystemExit(f"{scenario.name}: {response.status_code} {response.text[:500]}")
+            if scenario.pool:
+                _collect(state, scenario.pool, response)
+        # Cada DELETE consume lo que creó su POST, que corre antes con la misma cantidad de requests.
+        for scenario in SCENARIOS:
+            results[scenario.name] = await _run(client, scenario, state, requests, concurrency)
+    return results
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> dict[str, Any]:
+    """Cambio relativo de p95 y rps por endpoint; regresión si alguno empeora más que ``tolerance``."""
+    diff: dict[str, dict[str, float]] = {}
+    regressions: list[str] = []
+    for name, result in current["endpoints"].items():
+        if (base := baseline["endpoints"].get(name)) is None:
+            continue
+        p95 = result["p95_ms"] / max(base["p95_ms"], 1e-3) - 1
+        rps = result["rps"] / max(base["rps"], 1e-3) - 1
+        diff[name] = {"p95": round(p95, 3), "rps": round(rps, 3)}
+        if p95 > tolerance or rps < -tolerance:
+            regressions.append(name)
+    # Con otra configuración las cifras no son comparables; se informa pero no se impide.
+    config = [key for key, value in current["config"].items() if baseline["config"].get(key) != value]
+    return {"config_differs": config, "diff": diff, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--travels", type=int, default=200)
+    parser.add_argument("--items", type=int, default=10, help="transportes, actividades y gastos por viaje")
+    parser.add_argument("--requests", type=int, default=200, help="requests por escenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="medir con la caché de respuestas activa")
+    parser.add_argument("--output", help="guarda el resultado en este archivo")
+    parser.add_argument("--baseline", help="resultado anterior contra el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="empeoramiento relativo tolerado")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(tempfile.mkdtemp())
+    # Un log por request del cliente de pruebas pesaría más que la request misma.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    endpoints = asyncio.run(run(args.travels, args.items, args.requests, args.concurrency, args.cache))
+    report: dict[str, Any] = {
+        "config": {
+            "travels": args.travels, "items": args.items, "requests": args.requests,
+            "concurrency": args.concurrency, "cache": args.cache, "db_mode": os.getenv("DB_MODE", "async"),
+        },
+        "endpoints": endpoints,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if baseline is not None:
+        report["baseline"] = compare(report, baseline, args.tolerance)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if baseline is not None and report["baseline"]["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
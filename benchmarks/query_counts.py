@@ -0,0 +1,85 @@
+"""Verifica que cada endpoint de lectura emite un número fijo de consultas, sin importar las filas.
+
+Uso: python -m benchmarks.query_counts [--sizes 5 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import seed
+
+ENDPOINTS = [
+    "/travels",
+    "/travels/1",
+    "/travels/1/users",
+    "/travels/1/itinerary",
+    "/travels/1/transports",
+    "/travels/1/accommodations",
+    "/travels/1/activities",
+    "/travels/1/expenses",
+    "/travels/1/budget",
+    "/travels/1/conflicts",
+    "/transports",
+    "/transports/1",
+    "/accommodations",
+    "/accommodations/1",
+    "/activities",
+    "/activities/1",
+    "/expenses",
+    "/users",
+    "/users/1/travels",
+    "/cities",
+    "/routes?from=1&to=2",
+]
+
+
+def count_queries(travels: int) -> dict[str, int]:
+    from litestar.testing import TestClient
+
+    from app import app
+    from app.database import engine
+    from app.models import Base
+    from app.query_counter import QueryCounter
+    from app.routing import route_graph
+
+    if os.path.exists("test.sqlite3"):
+        os.remove("test.sqlite3")
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    conn = sqlite3.connect("test.sqlite3")
+    seed(conn, travels, items=10)
+    conn.close()
+
+    # Se mide la base de datos, no la caché de respuestas: cada tamaño parte con la caché vacía.
+    asyncio.run(app.stores.get("response_cache").delete_all())
+    # Ni el grafo de rutas del tamaño anterior: la base se regeneró por fuera de la app.
+    route_graph.touch(None)
+    counts: dict[str, int] = {}
+    with TestClient(app) as client:
+        for path in ENDPOINTS:
+            with QueryCounter(engine) as queries:
+                response = client.get(path)
+            response.raise_for_status()
+            counts[path] = queries.count
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50])
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    results = {size: count_queries(size) for size in args.sizes}
+    unstable = [path for path in ENDPOINTS if len({results[size][path] for size in args.sizes}) > 1]
+    print(json.dumps({"queries": results, "unstable": unstable}, indent=2))
+    sys.exit(1 if unstable else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Planes de consulta y tiempos antes y después de la migración de índices.
+
+Uso: python -m benchmarks.query_plans [--travels 2000] [--items 25] [--repeat 200]
+"""
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from advanced_alchemy.alembic.commands import AlembicCommands
+from advanced_alchemy.extensions.litestar import AlembicSyncConfig
+from litestar.contrib.sqlalchemy.plugins import SQLAlchemySyncConfig
+
+from app.models import Base
+from benchmarks.dataset import seed
+
+ROOT = Path(__file__).resolve().parent.parent
+INITIAL_REVISION = "3d07bb4b6cba"
+
+QUERIES = {
+    "travel_expenses": "SELECT * FROM expenses WHERE travel_id = :travel_id ORDER BY id LIMIT 51",
+    "travel_transports_timeline": "SELECT * FROM transports WHERE travel_id = :travel_id ORDER BY start_datetime",
+    "travel_activities_timeline": "SELECT * FROM activities WHERE travel_id = :travel_id ORDER BY start_datetime",
+    "travel_accommodations": "SELECT * FROM accommodations WHERE travel_id = :travel_id ORDER BY start_date",
+    "travel_members": "SELECT user_id FROM users_travels WHERE travel_id = :travel_id",
+    "user_expenses": "SELECT * FROM expenses WHERE user_id = :user_id",
+    "transports_from_city": "SELECT * FROM transports WHERE start_city_id = :city_id",
+    "activities_in_city": "SELECT * FROM activities WHERE city_id = :city_id",
+    "activities_in_city_next_week": "SELECT * FROM activities WHERE city_id = :city_id"
+    " AND start_datetime > :after AND start_datetime < :before ORDER BY id LIMIT 51",
+    "expenses_by_date_page": "SELECT * FROM expenses WHERE (datetime, id) > (:after, 0)"
+    " ORDER BY datetime, id LIMIT 51",
+}
+
+# Rango de fechas de los filtros ``after``/``before`` (el dataset empieza el 2024-01-01).
+WEEK = {"after": "2024-01-03 00:00:00", "before": "2024-01-10 00:00:00"}
+
+
+def migrate(db_path: Path, revision: str) -> None:
+    config = SQLAlchemySyncConfig(
+        connection_string=f"sqlite:///{db_path}",
+        metadata=Base.metadata,
+        alembic_config=AlembicSyncConfig(
+            script_location=str(ROOT / "migrations"),
+            script_config=str(ROOT / "alembic.ini"),
+            target_metadata=Base.metadata,
+        ),
+    )
+    AlembicCommands(sqlalchemy_config=config).upgrade(revision)
+    config.get_engine().dispose()
+
+
+def measure(conn: sqlite3.Connection, repeat: int, travels: int) -> dict[str, dict[str, object]]:
+    rng = random.Random(7)
+    results: dict[str, dict[str, object]] = {}
+    for name, sql in QUERIES.items():
+        params = {"travel_id": travels // 2, "user_id": 3, "city_id": 5, **WEEK}
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            params = {"travel_id": rng.randint(1, travels), "user_id": rng.randint(1, travels // 2), "city_id": rng.randint(1, 10), **WEEK}
+            conn.execute(sql, params).fetchall()
+        elapsed = time.perf_counter() - started
+        results[name] = {"plan": plan, "avg_ms": round(elapsed / repeat * 1000, 4)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--travels", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=25, help="transportes, actividades y gastos por viaje")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite3"
+        migrate(db_path, INITIAL_REVISION)
+        conn = sqlite3.connect(db_path)
+        seed(conn, args.travels, args.items)
+        before = measure(conn, args.repeat, args.travels)
+        conn.close()
+
+        migrate(db_path, "head")
+        conn = sqlite3.connect(db_path)
+        conn.execute("ANALYZE")
+        after = measure(conn, args.repeat, args.travels)
+        conn.close()
+
+    report = {
+        name: {
+            "before": before[name],
+            "after": after[name],
+            "speedup": round(before[name]["avg_ms"] / max(after[name]["avg_ms"], 1e-9), 1),
+        }
+        for name in QUERIES
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Planificador de rutas: carga del grafo, A* contra Dijkstra y latencia de ``GET /routes``.
+
+Siembra ``--legs`` transportes entre ``--cities`` ciudades a lo largo de 30 días y mide:
+``load_ms``, la carga completa del grafo; ``refresh_ms``, releer un transporte cambiado; y por objetivo
+(``price``/``time``) la mediana de: ``bounds_ms``, la cota de un destino nuevo (se paga una vez por destino);
+``astar_ms`` y ``dijkstra_ms``, ``plan`` con la cota y sin ella (se verifica que den el mismo costo); y
+``endpoint_ms``, la request completa, que con el grafo cargado no consulta la base.
+
+Uso: python -m benchmarks.routes [--cities 500] [--legs 100000] [--queries 200]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import create_engine
+
+
+def seed_legs(conn: sqlite3.Connection, cities: int, legs: int) -> None:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    conn.executemany("INSERT INTO cities (id, name, country) VALUES (?, ?, 'XX')", [(i, f"c{i}") for i in range(1, cities + 1)])
+    conn.execute("INSERT INTO travels (id, name, start_date, end_date) VALUES (1, 't', '2024-01-01', '2024-01-31')")
+    rows = []
+    for _ in range(legs):
+        a, b = rng.sample(range(1, cities + 1), 2)
+        departure = start + timedelta(minutes=rng.randrange(30 * 24 * 60))
+        minutes = rng.randint(30, 600)
+        rows.append((rng.uniform(5, 50) + minutes / 10, str(departure), str(departure + timedelta(minutes=minutes)), a, b))
+    conn.executemany(
+        "INSERT INTO transports (type, company, price, start_datetime, start_location, end_datetime, end_location,"
+        " travel_id, start_city_id, end_city_id) VALUES ('train', 'co', ?, ?, 'a', ?, 'b', 1, ?, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def _cost(legs: Any, optimize: str) -> float:
+    return round(sum(leg.price for leg in legs), 6) if optimize == "price" else legs[-1].arrives
+
+
+def _median_ms(samples: list[float]) -> float:
+    return round(statistics.median(samples) * 1000, 3)
+
+
+async def run(cities: int, queries: int) -> dict[str, Any]:
+    from litestar.testing import AsyncTestClient
+
+    from app import create_app
+    from app.database import dispose_engine, open_session
+    from app.routing import RouteGraph
+    from app.settings import AppSettings
+
+    class Dijkstra(RouteGraph):
+        # Sin cota: solo se descartan las ciudades que no llegan al destino.
+        def _lower_bounds(self, destination: int, optimize: Any) -> dict[int, float]:
+            return dict.fromkeys(super()._lower_bounds(destination, optimize), 0.0)
+
+    report: dict[str, Any] = {}
+    graph, plain = RouteGraph(), Dijkstra()
+    async with open_session() as session:
+        started = time.perf_counter()
+        await graph.refresh(session, max_age=3600)
+        report["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        report["legs"] = len(graph)
+        await plain.refresh(session, max_age=3600)
+        graph.touch([1])
+        started = time.perf_counter()
+        await graph.refresh(session, max_age=3600)
+        report["refresh_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    rng = random.Random(7)
+    pairs = [tuple(rng.sample(range(1, cities + 1), 2)) for _ in range(queries)]
+    depart_after = datetime(2024, 1, 10)
+    for optimize in ("price", "time"):
+        bounds, astar, dijkstra = [], [], []
+        for origin, destination in pairs:
+            started = time.perf_counter()
+            graph._lower_bounds(destination, optimize)
+            bounds.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            found = graph.plan(origin, destination, optimize, depart_after, min_connection=30)
+            astar.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            expected = plain.plan(origin, destination, optimize, depart_after, min_connection=30)
+            dijkstra.append(time.perf_counter() - started)
+            assert (found is None) == (expected is None), (origin, destination)
+            if found is not None:
+                assert abs(_cost(found, optimize) - _cost(expected, optimize)) < 1e-6, (origin, destination, optimize)
+        report[optimize] = {"bounds_ms": _median_ms(bounds), "astar_ms": _median_ms(astar), "dijkstra_ms": _median_ms(dijkstra)}
+
+    settings = AppSettings(profile="prod")
+    async with AsyncTestClient(create_app(settings)) as client:
+        for optimize in ("price", "time"):
+            samples = []
+            for origin, destination in pairs:
+                params = {"from": origin, "to": destination, "optimize": optimize, "depart_after": depart_after.isoformat()}
+                started = time.perf_counter()
+                response = await client.get("/routes", params=params)
+                samples.append(time.perf_counter() - started)
+                assert response.status_code in (200, 404), response.text
+            report[optimize]["endpoint_ms"] = _median_ms(samples)
+    await dispose_engine()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--legs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from app.models import Base
+
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    conn = sqlite3.connect("test.sqlite3")
+    seed_legs(conn, args.cities, args.legs)
+    conn.close()
+    print(json.dumps(asyncio.run(run(args.cities, args.queries)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Latencia de ``GET /search`` sobre un índice grande, con términos comunes, raros y prefijos.
+
+Siembra ``--rows`` actividades con texto de un vocabulario con frecuencias tipo Zipf (unas pocas palabras
+aparecen en casi todas las filas, la mayoría en muy pocas) y mide p50/p95 de cada consulta, además de qué
+fracción se pudo ordenar por relevancia dentro de ``SEARCH_BUDGET_MS``.
+
+Uso: python -m benchmarks.search [--rows 100000] [--requests 50] [--budget-ms 100]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy import create_engine
+
+QUERIES = {
+    "común": "tour",
+    "común, dos palabras": "tour city",
+    "raro": "w4321",
+    "prefijo": "w43",
+    "común y raro": "tour w4321",
+    "sin coincidencias exactas": "tour nowhere",
+}
+COMMON = ["tour", "city", "museum", "walk", "food", "night", "temple", "market"]
+
+
+def seed_search(conn: sqlite3.Connection, rows: int, cities: int = 100) -> None:
+    rng = random.Random(42)
+    vocabulary = [f"w{i}" for i in range(20_000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    conn.executemany(
+        "INSERT INTO cities (id, name, country) VALUES (?, ?, ?)", [(i, f"city{i}", "XX") for i in range(1, cities + 1)]
+    )
+    conn.execute("INSERT INTO travels (id, name, start_date, end_date) VALUES (1, 't', '2024-01-01', '2024-01-02')")
+    for start in range(0, rows, 10_000):
+        batch = []
+        for _ in range(min(10_000, rows - start)):
+            words = rng.choices(vocabulary, weights, k=8)
+            batch.append((
+                f"{rng.choice(COMMON)} {words[0]}", " ".join([rng.choice(COMMON), *words[1:]]), words[1],
+                rng.randint(1, cities),
+            ))
+        conn.executemany(
+            "INSERT INTO activities (name, description, location, start_datetime, price, duration, travel_id, city_id)"
+            " VALUES (?, ?, ?, '2024-01-01 10:00:00', 10, 60, 1, ?)",
+            batch,
+        )
+    conn.commit()
+    # Un índice recién cargado queda en muchos segmentos; ``optimize`` los une como lo haría el automerge con el uso.
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--budget-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from litestar.testing import TestClient
+
+    from app import create_app
+    from app.models import Base
+    from app.settings import AppSettings, SearchSettings
+
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    started = time.perf_counter()
+    conn = sqlite3.connect("test.sqlite3")
+    seed_search(conn, args.rows)
+    conn.close()
+    report: dict[str, Any] = {"rows": args.rows, "seed_s": round(time.perf_counter() - started, 1), "queries": {}}
+
+    settings = AppSettings(profile="prod", search=SearchSettings(budget_ms=args.budget_ms))
+    with TestClient(create_app(settings)) as client:
+        for name, query in QUERIES.items():
+            samples, ranked, hits = [], 0, 0
+            for _ in range(args.requests):
+                begin = time.perf_counter()
+                response = client.get("/search", params={"q": query})
+                samples.append(time.perf_counter() - begin)
+                response.raise_for_status()
+                ranked += response.json()["ranked"]
+                hits = len(response.json()["items"])
+            samples.sort()
+            report["queries"][name] = {
+                "q": query,
+                "p50_ms": round(statistics.median(samples) * 1000, 2),
+                "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 2),
+                "ranked": round(ranked / args.requests, 2),
+                "hits": hits,
+            }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
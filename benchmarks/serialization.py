@@ -0,0 +1,108 @@
+"""Listados por el camino del DTO (entidades ORM) contra el de filas (``paginate_rows`` + ``row_struct``).
+
+Arma una app mínima con los dos handlers por recurso sobre el mismo dataset y mide la mediana de cada
+request completa (consulta, armado y serialización) para distintos tamaños de página.
+
+Uso: python -m benchmarks.serialization [--requests 50] [--limits 50 500]
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import seed
+
+
+def build_app() -> Any:
+    from litestar import Litestar, get
+    from litestar.di import Provide
+
+    from app.database import db_plugin
+    from app.dtos import (
+        AccommodationReadDTO,
+        AccommodationRow,
+        ActivityReadDTO,
+        ActivityRow,
+        ExpenseReadDTO,
+        ExpenseRow,
+        UserReadDTO,
+        UserRow,
+    )
+    from app.pagination import Page, Pagination, paginate, paginate_rows, provide_pagination
+    from app.repositories import provide_accommodation_repo, provide_activity_repo, provide_expense_repo, provide_user_repo
+
+    def handlers(resource: str, dto: Any, row: Any, provide_repo: Any) -> list[Any]:
+        dependencies = {"repo": Provide(provide_repo)}
+
+        @get(f"/dto/{resource}", return_dto=dto, dependencies=dependencies)
+        async def via_dto(repo: Any, pagination: Pagination) -> Page[dto.model_type]:  # type: ignore[name-defined]
+            return await paginate(repo, pagination)
+
+        @get(f"/rows/{resource}", dependencies=dependencies)
+        async def via_rows(repo: Any, pagination: Pagination) -> Page[row]:  # type: ignore[valid-type]
+            return await paginate_rows(repo, row, pagination)
+
+        return [via_dto, via_rows]
+
+    return Litestar(
+        [
+            *handlers("users", UserReadDTO, UserRow, provide_user_repo),
+            *handlers("accommodations", AccommodationReadDTO, AccommodationRow, provide_accommodation_repo),
+            *handlers("activities", ActivityReadDTO, ActivityRow, provide_activity_repo),
+            *handlers("expenses", ExpenseReadDTO, ExpenseRow, provide_expense_repo),
+        ],
+        plugins=[db_plugin],
+        dependencies={"pagination": Provide(provide_pagination)},
+    )
+
+
+def _median_ms(client: Any, path: str, limit: int, requests: int) -> float:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(path, params={"limit": limit}).raise_for_status()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 500])
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from litestar.testing import TestClient
+
+    from app.models import Base
+
+    Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+    conn = sqlite3.connect("test.sqlite3")
+    # Suficientes filas para llenar la página más grande en todos los recursos.
+    seed(conn, travels=max(args.limits) * 2, items=10)
+    conn.close()
+
+    report: dict[str, dict[str, Any]] = {}
+    with TestClient(build_app()) as client:
+        for resource in ("users", "accommodations", "activities", "expenses"):
+            for limit in args.limits:
+                # Las dos respuestas deben ser idénticas; si no, la comparación no vale.
+                assert client.get(f"/dto/{resource}", params={"limit": limit}).content == client.get(
+                    f"/rows/{resource}", params={"limit": limit}
+                ).content, resource
+                dto = _median_ms(client, f"/dto/{resource}", limit, args.requests)
+                rows = _median_ms(client, f"/rows/{resource}", limit, args.requests)
+                report[f"{resource}?limit={limit}"] = {"dto_ms": dto, "rows_ms": rows, "speedup": round(dto / rows, 1)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
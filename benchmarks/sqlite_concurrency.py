@@ -0,0 +1,94 @@
+"""Lecturas y escrituras concurrentes con el perfil "default" de SQLite contra "production" (WAL + pragmas).
+
+Uso: python -m benchmarks.sqlite_concurrency [--seconds 5] [--readers 8] [--writers 2]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.database import make_engine
+from app.models import Base, Expense
+from app.settings import DatabaseSettings
+from benchmarks.dataset import seed
+
+TRAVELS = 200
+
+
+def run(profile: str, seconds: float, readers: int, writers: int) -> dict[str, float]:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    conn = sqlite3.connect(path)
+    seed(conn, TRAVELS, items=10)
+    conn.close()
+
+    engine = make_engine(DatabaseSettings(mode="sync", url=f"sqlite:///{path}", profile=profile))
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        done = 0
+        while time.perf_counter() < deadline:
+            with engine.connect() as connection:
+                connection.execute(select(Expense).where(Expense.travel_id == rng.randint(1, TRAVELS))).all()
+            done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            row = {"description": "bench", "amount": 1.0, "datetime": datetime(2024, 1, 1), "user_id": 1,
+                   "travel_id": rng.randint(1, TRAVELS)}
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(Expense), row)
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {
+        "reads_per_s": round(counts["reads"] / seconds),
+        "writes_per_s": round(counts["writes"] / seconds),
+        "write_errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    report = {profile: run(profile, args.seconds, args.readers, args.writers) for profile in ("default", "production")}
+    report["gain"] = {
+        key: round(report["production"][key] / max(report["default"][key], 1), 1)
+        for key in ("reads_per_s", "writes_per_s")
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
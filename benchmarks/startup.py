@@ -0,0 +1,85 @@
+"""Arranque en frío: cada medición corre en un proceso nuevo, sin módulos ya importados.
+
+- ``import_models``: ``import app.models`` (lo que pagan las migraciones y la CLI).
+- ``create_app``: importar y armar la app con ``create_app``.
+- ``first_response``: lo anterior más el lifespan y la primera request, con el cliente de pruebas.
+- ``serve``: desde lanzar ``python -m app`` hasta que responde por HTTP.
+
+Uso: python -m benchmarks.startup [--runs 5] [--workers 1]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    "import_models": "import app.models",
+    "create_app": "from app import create_app; create_app()",
+    "first_response": (
+        "from litestar.testing import TestClient\n"
+        "from app import create_app\n"
+        "with TestClient(create_app()) as client:\n"
+        "    client.get('/metrics').raise_for_status()"
+    ),
+}
+
+
+def _timed(snippet: str) -> float:
+    # El tiempo se toma dentro del proceso hijo, sin contar el arranque del intérprete.
+    code = f"import time\nstarted = time.perf_counter()\n{snippet}\nprint(time.perf_counter() - started)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=ROOT).stdout
+    return float(output.split()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(workers: int, timeout: float = 60) -> float:
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": ROOT, "APP_PROFILE": "prod"}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app", "--port", str(port), "--workers", str(workers)],
+        env=env, cwd=tempfile.mkdtemp(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1):
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"python -m app no respondió en {timeout} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    return {"median_s": round(statistics.median(samples), 3), "min_s": round(min(samples), 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    report = {name: _summary([_timed(snippet) for _ in range(args.runs)]) for name, snippet in SNIPPETS.items()}
+    report["serve"] = {"workers": args.workers, **_summary([_serve(args.workers) for _ in range(args.runs)])}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
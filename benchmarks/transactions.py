@@ -0,0 +1,156 @@
+"""Transacciones de los endpoints de escritura: ``auto_commit`` por repositorio contra una transacción por request.
+
+Recorre ``--requests`` veces, de a una, cada escenario POST/PATCH/DELETE de ``benchmarks.load``, primero con los
+repositorios confirmando cada escritura por su cuenta (``auto_commit=True``, como antes) y luego con la transacción
+única del handler. Por endpoint reporta la media por request de ``transactions`` (BEGIN), ``checkouts`` (conexiones
+pedidas al pool; con aiosqlite y el perfil "default" cada una es una conexión y un hilo nuevos), ``commits`` (los
+COMMIT que escribieron algo) y ``fsyncs``, más la mediana de ``ms``.
+
+``fsyncs`` es ``commits`` por lo que cuesta cada uno en disco según el perfil, medido en Linux con SQLite 3.40
+interceptando ``fsync``: 4 con el journal por defecto y ``synchronous=FULL``; ninguno con WAL y
+``synchronous=NORMAL``, que solo sincroniza en los checkpoints. Un COMMIT que no escribió no sincroniza nada.
+
+Uso: python -m benchmarks.transactions [--profile default|production] [--requests 50] [--travels 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from sqlalchemy import create_engine, event
+
+from benchmarks.dataset import seed
+
+FSYNCS_PER_COMMIT = {"default": 4, "production": 0}
+WRITES = ("POST", "PATCH", "DELETE")
+
+
+class Counter:
+    def __init__(self, engine: Any) -> None:
+        self.counts = dict.fromkeys(("transactions", "checkouts", "commits"), 0)
+        self._wrote = False
+        engine = getattr(engine, "sync_engine", engine)
+        event.listen(engine, "begin", self._begin)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "before_cursor_execute", self._execute)
+        event.listen(engine, "commit", self._commit)
+        event.listen(engine, "rollback", self._rollback)
+
+    def reset(self) -> dict[str, int]:
+        counts, self.counts = self.counts, dict.fromkeys(self.counts, 0)
+        return counts
+
+    def _begin(self, conn: Any) -> None:
+        self.counts["transactions"] += 1
+
+    def _checkout(self, *args: Any) -> None:
+        self.counts["checkouts"] += 1
+
+    def _execute(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+            self._wrote = True
+
+    def _commit(self, conn: Any) -> None:
+        self.counts["commits"] += self._wrote
+        self._wrote = False
+
+    def _rollback(self, conn: Any) -> None:
+        self._wrote = False
+
+
+def _auto_commit(enabled: bool) -> None:
+    """Con ``enabled`` los repositorios vuelven a confirmar cada escritura, como antes de la transacción por request."""
+    import app.repositories as repositories
+
+    build = getattr(repositories._build_repo, "__wrapped__", repositories._build_repo)
+
+    def build_auto_commit(*args: Any, **kwargs: Any) -> Any:
+        repo = build(*args, **kwargs)
+        getattr(repo, "_repository", repo).auto_commit = True
+        return repo
+
+    build_auto_commit.__wrapped__ = build  # type: ignore[attr-defined]
+    repositories._build_repo = build_auto_commit if enabled else build
+
+
+async def run(travels: int, requests: int, fsyncs_per_commit: int) -> dict[str, Any]:
+    from litestar.testing import AsyncTestClient
+
+    from app import create_app
+    from app.database import dispose_engine, engine
+    from app.settings import AppSettings, CacheSettings
+    from benchmarks.load import SCENARIOS, State, _collect
+
+    counter = Counter(engine)
+    state = State(random.Random(7), travels, travels // 2 + 1, max(travels // 10, 10), 10)
+    results: dict[str, Any] = {}
+    application = create_app(AppSettings(profile="prod", cache=CacheSettings(max_entries=0)))
+    # Sin el lector de eventos: sus consultas de fondo se contarían como de la request.
+    application.on_startup.clear()
+    async with AsyncTestClient(application) as client:
+        for scenario in SCENARIOS:
+            if scenario.method not in WRITES:
+                continue
+            totals = dict.fromkeys(counter.counts, 0)
+            samples = []
+            for _ in range(requests):
+                kwargs = scenario.build(state)
+                counter.reset()
+                started = time.perf_counter()
+                response = await client.request(scenario.method, **kwargs)
+                samples.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    raise SystemExit(f"{scenario.name}: {response.status_code} {response.text[:500]}")
+                if scenario.pool:
+                    _collect(state, scenario.pool, response)
+                for key, value in counter.reset().items():
+                    totals[key] += value
+            result = {key: round(value / requests, 2) for key, value in totals.items()}
+            result["fsyncs"] = round(result["commits"] * fsyncs_per_commit, 2)
+            result["ms"] = round(statistics.median(samples) * 1000, 2)
+            results[scenario.name] = result
+    await dispose_engine()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(FSYNCS_PER_COMMIT), default="default")
+    parser.add_argument("--requests", type=int, default=50, help="requests por escenario")
+    parser.add_argument("--travels", type=int, default=50)
+    args = parser.parse_args()
+
+    # El engine de la app se arma al importar ``app.database``: el perfil se fija antes.
+    os.environ["DB_PROFILE"] = args.profile
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from app.models import Base
+
+    # Un solo directorio: el engine de la app fija la ruta absoluta de ``test.sqlite3`` al crearse.
+    os.chdir(tempfile.mkdtemp())
+    modes: dict[str, Any] = {}
+    for mode in ("auto_commit", "unit_of_work"):
+        if os.path.exists("test.sqlite3"):
+            os.remove("test.sqlite3")
+        Base.metadata.create_all(create_engine("sqlite:///test.sqlite3"))
+        conn = sqlite3.connect("test.sqlite3")
+        seed(conn, args.travels, 10)
+        conn.close()
+        _auto_commit(mode == "auto_commit")
+        modes[mode] = asyncio.run(run(args.travels, args.requests, FSYNCS_PER_COMMIT[args.profile]))
+
+    saved = {
+        name: {key: round(before[key] - modes["unit_of_work"][name][key], 2) for key in ("transactions", "checkouts", "commits", "fsyncs")}
+        for name, before in modes["auto_commit"].items()
+    }
+    print(json.dumps({"profile": args.profile, **modes, "saved": saved}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
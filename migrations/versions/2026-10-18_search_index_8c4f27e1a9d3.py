@@ -0,0 +1,101 @@
+# type: ignore
+"""search index
+
+Revision ID: 8c4f27e1a9d3
+Revises: 5b1e0c9d42a7
+Create Date: 2026-10-18 02:06:17.532904+00:00
+
+"""
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC
+from sqlalchemy import Text  # noqa: F401
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = '8c4f27e1a9d3'
+down_revision = '5b1e0c9d42a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+# Tabla FTS5 y triggers tal como los define ``app.models.SEARCH_DDL`` en esta revisión.
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE search_index USING fts5(kind, name, place, body, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(0.0, 10.0, 4.0, 1.0)')",
+    "CREATE TRIGGER cities_search_insert AFTER INSERT ON cities BEGIN INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3, 'city', new.name, new.country, ''); END",
+    "CREATE TRIGGER cities_search_update AFTER UPDATE OF name, country ON cities BEGIN DELETE FROM search_index WHERE rowid = old.id * 3; INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3, 'city', new.name, new.country, ''); DELETE FROM search_index WHERE rowid IN (SELECT c.id * 3 + 1 FROM activities c WHERE c.city_id = new.id); INSERT INTO search_index (rowid, kind, name, place, body) SELECT c.id * 3 + 1, 'activity', c.name, c.location || ' ' || new.name || ' ' || new.country, coalesce(c.description, '') FROM activities c WHERE c.city_id = new.id; DELETE FROM search_index WHERE rowid IN (SELECT c.id * 3 + 2 FROM accommodations c WHERE c.city_id = new.id); INSERT INTO search_index (rowid, kind, name, place, body) SELECT c.id * 3 + 2, 'accommodation', c.name, c.location || ' ' || new.name || ' ' || new.country, coalesce(c.description, '') || ' ' || coalesce(c.observations, '') FROM accommodations c WHERE c.city_id = new.id; END",
+    "CREATE TRIGGER cities_search_delete AFTER DELETE ON cities BEGIN DELETE FROM search_index WHERE rowid = old.id * 3; END",
+    "CREATE TRIGGER activities_search_insert AFTER INSERT ON activities BEGIN INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3 + 1, 'activity', new.name, new.location || ' ' || coalesce((SELECT name || ' ' || country FROM cities WHERE id = new.city_id), ''), coalesce(new.description, '')); END",
+    "CREATE TRIGGER activities_search_update AFTER UPDATE OF name, description, location, city_id ON activities BEGIN DELETE FROM search_index WHERE rowid = old.id * 3 + 1; INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3 + 1, 'activity', new.name, new.location || ' ' || coalesce((SELECT name || ' ' || country FROM cities WHERE id = new.city_id), ''), coalesce(new.description, '')); END",
+    "CREATE TRIGGER activities_search_delete AFTER DELETE ON activities BEGIN DELETE FROM search_index WHERE rowid = old.id * 3 + 1; END",
+    "CREATE TRIGGER accommodations_search_insert AFTER INSERT ON accommodations BEGIN INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3 + 2, 'accommodation', new.name, new.location || ' ' || coalesce((SELECT name || ' ' || country FROM cities WHERE id = new.city_id), ''), coalesce(new.description, '') || ' ' || coalesce(new.observations, '')); END",
+    "CREATE TRIGGER accommodations_search_update AFTER UPDATE OF name, description, location, observations, city_id ON accommodations BEGIN DELETE FROM search_index WHERE rowid = old.id * 3 + 2; INSERT INTO search_index (rowid, kind, name, place, body) VALUES (new.id * 3 + 2, 'accommodation', new.name, new.location || ' ' || coalesce((SELECT name || ' ' || country FROM cities WHERE id = new.city_id), ''), coalesce(new.description, '') || ' ' || coalesce(new.observations, '')); END",
+    "CREATE TRIGGER accommodations_search_delete AFTER DELETE ON accommodations BEGIN DELETE FROM search_index WHERE rowid = old.id * 3 + 2; END",
+]
+SEARCH_TRIGGERS = [
+    f"{table}_search_{event}" for table in ("cities", "activities", "accommodations") for event in ("insert", "update", "delete")
+]
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    for statement in SEARCH_DDL:
+        op.execute(statement)
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    for trigger in SEARCH_TRIGGERS:
+        op.execute(f"DROP TRIGGER {trigger}")
+    op.execute("DROP TABLE search_index")
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+    # Las filas existentes; de acá en adelante las agregan los triggers.
+    op.execute(
+        "INSERT INTO search_index (rowid, kind, name, place, body) "
+        "SELECT id * 3, 'city', name, country, '' FROM cities"
+    )
+    op.execute(
+        "INSERT INTO search_index (rowid, kind, name, place, body) "
+        "SELECT a.id * 3 + 1, 'activity', a.name, a.location || ' ' || coalesce(c.name || ' ' || c.country, ''), "
+        "coalesce(a.description, '') FROM activities a LEFT JOIN cities c ON c.id = a.city_id"
+    )
+    op.execute(
+        "INSERT INTO search_index (rowid, kind, name, place, body) "
+        "SELECT a.id * 3 + 2, 'accommodation', a.name, a.location || ' ' || coalesce(c.name || ' ' || c.country, ''), "
+        "coalesce(a.description, '') || ' ' || coalesce(a.observations, '') "
+        "FROM accommodations a LEFT JOIN cities c ON c.id = a.city_id"
+    )
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""